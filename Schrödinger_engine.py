@@ -1,5 +1,11 @@
+import copy
+import math
+
 import numpy as np
-from numpy.fft import fft, ifft
+
+import fft_backends
+import global_propagators
+import potentials
 
 # =========================================================
 # COMPATIBILIDADE NUMPY 2.x
@@ -8,180 +14,1074 @@ if not hasattr(np, "trapz"):
     np.trapz = np.trapezoid
 
 # =========================================================
-# PARÂMETROS
+# PARÂMETROS PADRÃO
 # =========================================================
 L = 100.0
 N = 1024
-dx = L / N
-x = np.linspace(-L / 2, L / 2, N)
-
-# Coordenada radial (r deve ser sempre positivo)
-r = np.abs(x)
-
-dt = 0.05
-barreira_width = 2.0
-barreira_center = 10.0
 V_INFINITY = 1e6
-_is_hard_wall = False
+# Fração de max(V) abaixo da qual V conta como fora das barreiras (Regions):
+# gaussianas e Eckart nunca chegam a zero na malha
+SUPPORT_TOL = 1e-3
+
 
 # =========================================================
-# FUNÇÃO DE ONDA INICIAL
+# INTEGRADORES (COMPOSIÇÕES DO PASSO DE STRANG)
 # =========================================================
-x0 = -20.0
-sigma = 2.0
-k0 = 3.0
+def _triple_jump(weights, order):
+    """
+    Composição simétrica S(z1·dt) S(z0·dt) S(z1·dt) de um esquema de
+    ordem `order` (Yoshida/Suzuki): o resultado tem ordem order + 2.
+    """
+    z1 = 1.0 / (2.0 - 2.0 ** (1.0 / (order + 1)))
+    z0 = 1.0 - 2.0 * z1
+    return tuple(z * w for z in (z1, z0, z1) for w in weights)
 
-norm_factor = 1.0 / np.sqrt(sigma * np.sqrt(np.pi))
-psi0 = (
-        norm_factor
-        * np.exp(-0.5 * ((x - x0) / sigma) ** 2)
-        * np.exp(1j * k0 * x)
-)
 
-# =========================================================
-# ESPAÇO DE MOMENTO E POTENCIAL
-# =========================================================
-k = 2 * np.pi * np.fft.fftfreq(N, d=dx)
-evolution_kinetic = np.exp(-1j * (k ** 2 / 2) * dt)
-V = np.zeros(N)
+# Frações de dt de cada sub-passo de Strang, por integrador
+INTEGRATORS = {
+    "strang": (1.0,),
+    "yoshida4": _triple_jump((1.0,), 2),
+    "suzuki6": _triple_jump(_triple_jump((1.0,), 2), 4),
+}
+INTEGRATOR_ORDER = {"strang": 2, "yoshida4": 4, "suzuki6": 6}
 
+# Propagadores de exp(-iHdt) inteiro (sem splitting), ver global_propagators
+GLOBAL_PROPAGATORS = {
+    "chebyshev": global_propagators.chebyshev,
+    "krylov": global_propagators.krylov,
+}
 
-def _barrier_mask():
+# Quantos dt distintos (evolve_adaptive) guardam propagadores em cache
+_MAX_CACHED_DT = 8
+
+
+def gaussian_packet(x, x0, sigma, k0):
+    """
+    Pacote de onda gaussiano normalizado centrado em x0 com momento k0.
+    """
+    norm_factor = 1.0 / np.sqrt(sigma * np.sqrt(np.pi))
     return (
-            (x > (barreira_center - barreira_width / 2)) &
-            (x < (barreira_center + barreira_width / 2))
+            norm_factor
+            * np.exp(-0.5 * ((x - x0) / sigma) ** 2)
+            * np.exp(1j * k0 * x)
     )
 
 
-def set_barrier_height(V0: float):
-    global V, _is_hard_wall
-    V[:] = 0.0
-    mask = _barrier_mask()
+# =========================================================
+# MALHA
+# =========================================================
+class Grid:
+    """
+    Malha espacial x ∈ [-L/2, L/2] e o espaço de momento associado.
+    Imutável: mudar L ou N significa criar um novo Grid.
+    """
 
-    if V0 >= V_INFINITY:
-        V[mask] = V_INFINITY
-        _is_hard_wall = True
-    else:
-        V[mask] = V0
-        _is_hard_wall = False
+    def __init__(self, L: float = L, N: int = N):
+        self.L = float(L)
+        self.N = int(N)
+        self.dx = self.L / self.N
+        self.x = np.linspace(-self.L / 2, self.L / 2, self.N)
 
+        # Coordenada radial (r deve ser sempre positivo)
+        self.r = np.abs(self.x)
 
-set_barrier_height(2.0)
+        self.k = 2 * np.pi * np.fft.fftfreq(self.N, d=self.dx)
 
+        # Peso de quadratura de cada ponto (∫f dx ≈ Σ f·weights)
+        self.weights = self.dx
+        self.jacobian = None
 
-# =========================================================
-# ENGINES
-# =========================================================
-def evolve_step_1d(psi: np.ndarray) -> np.ndarray:
-    psi = psi * np.exp(-1j * V * (dt / 2))
-    psi_k = fft(psi)
-    psi_k *= evolution_kinetic
-    psi = ifft(psi_k)
-    psi = psi * np.exp(-1j * V * (dt / 2))
-    if _is_hard_wall:
-        psi[_barrier_mask()] = 0.0
-    return psi
+        for arr in (self.x, self.r, self.k):
+            arr.flags.writeable = False
 
+    @property
+    def is_mapped(self) -> bool:
+        return self.jacobian is not None
 
-def evolve_step_3d_radial(u: np.ndarray) -> np.ndarray:
+    @property
+    def key(self) -> tuple:
+        """Identifica a malha por valor (chave do cache de potentials)."""
+        return (type(self).__name__, self.L, self.N)
+
+
+_erf = np.vectorize(math.erf, otypes=[float])
+
+
+class MappedGrid(Grid):
     """
-    Evolui a função auxiliar u(r) = r*psi(r).
+    Malha não-uniforme x = x(ξ), com ξ uniforme e periódico em [-L/2, L/2):
+    perto de cada centro em `centers` (barreiras, coletor) os pontos ficam
+    até `ratio` vezes mais densos, numa faixa de ~width, e longe deles
+    ficam esparsos.
+
+    A densidade de pontos é ρ(x) = 1 + (ratio - 1)·Σ exp(-((x - c)/width)²),
+    e ξ(x) ∝ ∫ρ dx é analítico (erf), invertido por Newton até a precisão
+    de máquina: um mapa suave mantém a convergência espectral.
+
+    k e dx referem-se a ξ; jacobian = dx/dξ em cada ponto e weights =
+    jacobian·dξ. A cinética -½ d²/dx² = -½ J⁻¹ ∂ξ J⁻¹ ∂ξ não é diagonal
+    em k, então a malha só roda com os integradores globais
+    (chebyshev/krylov), na forma simétrica de global_propagators.
     """
-    u = u * np.exp(-1j * V * (dt / 2))
-    u_k = fft(u)
-    u_k *= evolution_kinetic
-    u = ifft(u_k)
-    u = u * np.exp(-1j * V * (dt / 2))
 
-    # FIX: Condição de contorno na origem (x=0) e não no índice 0
-    # O índice do centro do array (onde x=0 e r=0) é N//2
-    center_idx = N // 2
-    u[center_idx] = 0.0
+    def __init__(self, L: float = L, N: int = N, centers=(), width: float = 2.0,
+                 ratio: float = 4.0):
+        super().__init__(L, N)
+        self.centers = tuple(float(c) for c in np.atleast_1d(centers))
+        self.width = float(width)
+        self.ratio = float(ratio)
 
-    # Para consistência visual, zeramos u onde r=0 (evita picos numéricos)
-    u[r < 1e-10] = 0.0
+        # ξ_j = -L/2 + j·dξ: o mesmo período L/N que o FFT assume
+        edges = self._stretch(np.array([-self.L / 2, self.L / 2]))
+        self._scale = self.L / (edges[1] - edges[0])
+        self._offset = edges[0]
+        xi = -self.L / 2 + np.arange(self.N) * self.dx
 
-    if _is_hard_wall:
-        u[_barrier_mask()] = 0.0
+        x = xi.copy()
+        for _ in range(100):
+            step = (self.xi_of(x) - xi) / (self._scale * self.density(x))
+            x -= step
+            if np.max(np.abs(step)) < 1e-13 * self.L:
+                break
 
-    return u
+        self.x = x
+        self.r = np.abs(self.x)
+        self.jacobian = 1.0 / (self._scale * self.density(self.x))
+        self.weights = self.jacobian * self.dx
 
+        for arr in (self.x, self.r, self.jacobian, self.weights):
+            arr.flags.writeable = False
 
-def evolve_step(psi: np.ndarray, mode="1D") -> np.ndarray:
-    if mode == "1D":
-        return evolve_step_1d(psi)
-    elif mode == "3D_RADIAL":
-        return evolve_step_3d_radial(psi)
-    return psi
+    @property
+    def key(self) -> tuple:
+        return super().key + (self.centers, self.width, self.ratio)
+
+    def density(self, x) -> np.ndarray:
+        """Densidade relativa de pontos ρ(x) (1 longe dos centros)."""
+        x = np.asarray(x, dtype=float)
+        rho = np.ones_like(x)
+        for c in self.centers:
+            rho += (self.ratio - 1.0) * np.exp(-((x - c) / self.width) ** 2)
+        return rho
+
+    def _stretch(self, x) -> np.ndarray:
+        # ∫ρ dx a menos de uma constante
+        out = np.array(x, dtype=float)
+        for c in self.centers:
+            out += (self.ratio - 1.0) * self.width * np.sqrt(np.pi) / 2 * _erf((x - c) / self.width)
+        return out
+
+    def xi_of(self, x) -> np.ndarray:
+        """Coordenada uniforme ξ(x) ∈ [-L/2, L/2]."""
+        return -self.L / 2 + self._scale * (self._stretch(x) - self._offset)
 
 
 # =========================================================
-# CÁLCULOS FÍSICOS
+# SIMULAÇÃO
 # =========================================================
-def calculate_transmission(psi: np.ndarray):
-    prob = np.abs(psi) ** 2
-    left_mask = x < (barreira_center - barreira_width / 2)
-    right_mask = x > (barreira_center + barreira_width / 2)
-    R = np.sum(prob[left_mask]) * dx
-    T = np.sum(prob[right_mask]) * dx
-    return T * 100.0, R * 100.0
+class Simulation:
+    """
+    Motor split-step autocontido: possui a malha, o potencial, os
+    propagadores e o estado (psi, tempo). Instâncias não compartilham
+    nada, então várias configurações podem rodar no mesmo processo.
+    """
 
+    def __init__(self, grid: Grid = None, dt: float = 0.05,
+                 barreira_center: float = 10.0, barreira_width: float = 2.0,
+                 x0: float = -20.0, sigma: float = 2.0, k0: float = 3.0,
+                 V0: float = 2.0, fft_backend=None, integrator: str = "strang"):
+        self._grid = grid if grid is not None else Grid()
+        self.fft_backend = fft_backend
+        self.integrator = integrator
 
-# --- ADICIONAR NO FINAL DE Schrödinger_engine.py ---
+        # Erro por passo dos integradores chebyshev/krylov
+        self.propagator_tol = global_propagators.DEFAULT_TOL
 
-def set_double_barrier(v0, width, gap):
+        self.barreira_center = barreira_center
+        self.barreira_width = barreira_width
+
+        # Pacote inicial
+        self.x0 = x0
+        self.sigma = sigma
+        self.k0 = k0
+
+        # Propagadores e índice de regiões em cache, invalidados por versão
+        self._version = 0
+        self._cache = {}
+        self._hamiltonians = {}
+        self._regions = None
+
+        # Região do coletor (sink) como intervalo aberto (início, fim)
+        self._sink = None
+
+        # Camadas absorventes nas bordas (desligadas com largura 0)
+        self.absorber_width = 0.0
+        self.absorber_strength = 0.0
+
+        self._dt = float(dt)
+        self._V = np.zeros(self.grid.N)
+        self._potential = None
+        self._is_hard_wall = False
+
+        self.set_barrier_height(V0)
+
+        self.psi = self.psi0
+        self.time = 0.0
+
+    # -----------------------------------------------------
+    # Malha
+    # -----------------------------------------------------
+    @property
+    def grid(self):
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: Grid):
+        # Nova malha: o potencial antigo não faz mais sentido
+        self._grid = grid
+        self.set_potential(np.zeros(grid.N))
+
+    @property
+    def x(self):
+        return self.grid.x
+
+    @property
+    def r(self):
+        return self.grid.r
+
+    @property
+    def k(self):
+        return self.grid.k
+
+    @property
+    def dx(self):
+        return self.grid.dx
+
+    @property
+    def N(self):
+        return self.grid.N
+
+    @property
+    def L(self):
+        return self.grid.L
+
+    @property
+    def fft_backend(self):
+        return self._fft_backend
+
+    @fft_backend.setter
+    def fft_backend(self, backend):
+        """Aceita um nome ('numpy', 'scipy', 'pyfftw'), None ou uma instância."""
+        if backend is None or isinstance(backend, str):
+            backend = fft_backends.get_backend(backend)
+        self._fft_backend = backend
+
+    @property
+    def dt(self):
+        return self._dt
+
+    @dt.setter
+    def dt(self, value):
+        self._dt = float(value)
+        self._invalidate()
+
+    @property
+    def integrator(self):
+        return self._integrator
+
+    @integrator.setter
+    def integrator(self, name: str):
+        """
+        'strang' (2ª ordem), 'yoshida4' ou 'suzuki6' (INTEGRATORS), ou um
+        propagador global 'chebyshev' / 'krylov' (GLOBAL_PROPAGATORS).
+        """
+        if name not in INTEGRATORS and name not in GLOBAL_PROPAGATORS:
+            options = ", ".join(list(INTEGRATORS) + list(GLOBAL_PROPAGATORS))
+            raise ValueError(f"Integrador desconhecido: {name!r} (use {options})")
+        self._integrator = name
+
+    @property
+    def psi0(self):
+        """Função de onda inicial (nova cópia a cada acesso)."""
+        return gaussian_packet(self.x, self.x0, self.sigma, self.k0)
+
+    def make_packets(self, k0=None, sigma=None, x0=None) -> np.ndarray:
+        """
+        Lote (B, N) de pacotes gaussianos. Cada argumento pode ser escalar
+        ou vetor; os omitidos usam os valores da simulação.
+        """
+        params = np.broadcast_arrays(
+            self.k0 if k0 is None else k0,
+            self.sigma if sigma is None else sigma,
+            self.x0 if x0 is None else x0,
+        )
+        k0, sigma, x0 = (np.atleast_1d(p)[:, np.newaxis] for p in params)
+        return gaussian_packet(self.x, x0, sigma, k0)
+
+    # -----------------------------------------------------
+    # Potencial
+    # -----------------------------------------------------
+    def _barrier_mask(self):
+        x = self.x
+        return (
+                (x > (self.barreira_center - self.barreira_width / 2)) &
+                (x < (self.barreira_center + self.barreira_width / 2))
+        )
+
+    @property
+    def V(self):
+        """Potencial atual (somente leitura: use set_potential para alterar)."""
+        return self._V
+
+    @V.setter
+    def V(self, value):
+        self.set_potential(value)
+
+    @property
+    def potential(self):
+        """Descritor (potentials.Potential) do V atual, ou None se V veio de um array."""
+        return self._potential
+
+    def set_potential(self, V):
+        """
+        Substitui o potencial. Pontos com V >= V_INFINITY viram parede rígida.
+        Toda alteração de V passa por aqui e invalida os propagadores.
+
+        V pode ser (N,) ou uma pilha (B, N): cada linha é o potencial de
+        um pacote do lote (varredura de barreiras).
+
+        V também pode ser um descritor de potentials (Rectangle, Gaussian,
+        Sum, Stack, ...). Aí V na malha, os propagadores e as regiões vêm
+        de potentials.CACHE, compartilhado entre simulações: voltar a um
+        potencial já usado (na mesma malha, dt e absorvedor) não recalcula nada.
+        """
+        if isinstance(V, potentials.Potential):
+            descriptor = V
+            V = potentials.CACHE.get_or_build(
+                (descriptor, self.grid.key, "V"), lambda: self._evaluate(descriptor))
+        else:
+            descriptor = None
+            V = np.array(V, dtype=float)
+            V.flags.writeable = False
+        if V.shape[-1:] != (self.N,):
+            raise ValueError(f"Potencial com forma {V.shape} incompatível com N={self.N}")
+        self._V = V
+        self._potential = descriptor
+        self._is_hard_wall = bool(np.any(V >= V_INFINITY))
+        self._invalidate()
+
+    def _evaluate(self, descriptor) -> np.ndarray:
+        # Morse e paredes ficam em V_INFINITY: a fase nesses pontos é zerada
+        V = np.minimum(descriptor(self.x), V_INFINITY)
+        V.flags.writeable = False
+        return V
+
+    def _heights(self, V0, make):
+        """Descritor make(altura), ou um Stack com uma linha por altura de um vetor V0."""
+        V0 = np.asarray(V0, dtype=float)
+        if V0.ndim == 0:
+            return make(V0)
+        return potentials.Stack(tuple(make(v) for v in V0.ravel()))
+
+    def set_barrier_height(self, V0):
+        """
+        Barreira retangular única. V0 pode ser um vetor de alturas:
+        nesse caso V vira uma pilha (B, N), uma linha por altura.
+        """
+        self.set_potential(self._heights(V0, lambda v: potentials.Rectangle(
+            self.barreira_center, self.barreira_width, v)))
+
+    def set_double_barrier_potential(self, v0, width, gap):
+        """
+        Define o potencial V(x) como uma barreira dupla.
+        v0: Altura das barreiras.
+        width: Largura de cada barreira.
+        gap: Distância entre as duas barreiras.
+        v0 vetorial gera uma pilha (B, N), como em set_barrier_height.
+        """
+        self.set_potential(self._heights(v0, lambda v: potentials.double_barrier(
+            self.barreira_center, width, gap, v)))
+
+    # Cria duas barreiras separadas por um 'gap' (Poço Quântico): padrões
+    # de interferência e ressonância (Fabry-Pérot). Nome antigo.
+    set_double_barrier = set_double_barrier_potential
+
+    @property
+    def sink(self):
+        """Intervalo (início, fim) do coletor, ou None."""
+        return self._sink
+
+    def set_sink(self, center=None, width=None):
+        """
+        Marca a região do coletor (centro ± largura/2) no índice de
+        regiões. Sem argumentos remove o coletor.
+        """
+        if center is None:
+            self._sink = None
+        else:
+            self._sink = (center - width / 2, center + width / 2)
+        self._invalidate()
+
+    def set_absorber(self, width: float, strength: float = 5.0):
+        """
+        Liga um potencial absorvente complexo (CAP) -iW(x) nas duas bordas,
+        com W crescendo quadraticamente de 0 até strength ao longo de
+        width unidades de comprimento. width = 0 desliga.
+
+        Sem as camadas, o FFT é periódico e o pacote transmitido reentra
+        pela esquerda. A probabilidade absorvida em cada lado é somada
+        em evolve_n(absorbed=...) e entra em T e R (calculate_transmission).
+        """
+        if width < 0 or width > self.L / 2:
+            raise ValueError(f"Largura do absorvedor fora de [0, L/2]: {width}")
+        self.absorber_width = float(width)
+        self.absorber_strength = float(strength)
+        self._invalidate()
+
+    @property
+    def has_absorber(self) -> bool:
+        return self.absorber_width > 0 and self.absorber_strength > 0
+
+    def absorber_profile(self) -> np.ndarray:
+        """W(x) >= 0 do potencial absorvente (zeros sem absorvedor)."""
+        W = np.zeros(self.N)
+        if self.has_absorber:
+            inner = self.L / 2 - self.absorber_width
+            depth = np.clip((np.abs(self.x) - inner) / self.absorber_width, 0.0, 1.0)
+            W = self.absorber_strength * depth ** 2
+        return W
+
+    def new_absorbed(self, psi: np.ndarray = None) -> np.ndarray:
+        """Acumulador (2, ...) de probabilidade absorvida: [esquerda, direita]."""
+        batch = np.shape(psi)[:-1] if psi is not None else self.V.shape[:-1]
+        return np.zeros((2,) + batch)
+
+    @property
+    def regions(self) -> "Regions":
+        """Índice de regiões (fatias de x) do potencial atual."""
+        regions = self._regions
+        if regions is None or regions.version != self._version:
+            regions = self._shared(lambda: Regions(self), "regions", self._sink,
+                                   self.absorber_width, self.absorber_strength,
+                                   self.barreira_center, self.barreira_width)
+            self._regions = regions
+        return regions
+
+    # -----------------------------------------------------
+    # Propagadores
+    # -----------------------------------------------------
+    def _invalidate(self):
+        self._version += 1
+        self._cache.clear()
+        self._hamiltonians.clear()
+
+    def _shared(self, build, *key):
+        """
+        build() para um V sem descritor. Com descritor, o objeto vem de
+        potentials.CACHE, chaveado por (descritor, malha, *key), e recebe
+        a versão desta simulação (uma cópia rasa: os arrays são os mesmos).
+        """
+        if self._potential is None:
+            return build()
+        obj = copy.copy(potentials.CACHE.get_or_build((self._potential, self.grid.key) + key, build))
+        obj.version = self._version
+        return obj
+
+    def _propagators(self, dt: float = None) -> "_Propagators":
+        """
+        Fatores de fase do split-step para (V, malha) atuais e o passo dt
+        (padrão: self.dt). Só são recalculados quando a versão muda; até
+        _MAX_CACHED_DT passos diferentes ficam em cache ao mesmo tempo.
+        """
+        if self.grid.is_mapped:
+            raise ValueError("Malha mapeada exige um integrador global (chebyshev ou krylov)")
+        dt = self._dt if dt is None else float(dt)
+        cache = self._cache
+        prop = cache.get(dt)
+        if prop is None or prop.version != self._version:
+            if prop is None and len(cache) >= _MAX_CACHED_DT:
+                del cache[next(iter(cache))]
+            prop = self._shared(lambda: _Propagators(self, dt), "propagators", dt,
+                                self.absorber_width, self.absorber_strength)
+            cache[dt] = prop
+        return prop
+
+    def hamiltonian(self, mode="1D", W: np.ndarray = None) -> "global_propagators.Hamiltonian":
+        """
+        H = T + V - iW para os propagadores globais. A parede rígida vira
+        condição de Dirichlet. W extra (ex.: coletor) se soma ao CAP; sem
+        ele o resultado fica em cache até a próxima mudança de versão.
+        """
+        if W is not None:
+            return global_propagators.Hamiltonian(self, mode, W, wall_level=V_INFINITY)
+        H = self._hamiltonians.get(mode)
+        if H is None:
+            H = global_propagators.Hamiltonian(self, mode, wall_level=V_INFINITY)
+            self._hamiltonians[mode] = H
+        return H
+
+    @property
+    def evolution_kinetic(self):
+        return self._propagators().kinetic
+
+    def phase_factors(self, mode="1D", dt: float = None) -> "_Scheme":
+        """
+        Fatores (kinetic, inner, half, full) do integrador split-step atual,
+        os mesmos que evolve_n aplica, em cache até a próxima mudança. Para
+        laços próprios que dobram algo a mais nas fases (ex.: coletores por
+        linha em quantum_photosynthesis.PhotosynthesisEnsemble).
+        """
+        if self._integrator in GLOBAL_PROPAGATORS:
+            raise ValueError(f"{self._integrator} não é um integrador split-step")
+        return self._propagators(dt).scheme(self._integrator, radial=mode == "3D_RADIAL")
+
+    # -----------------------------------------------------
+    # Engines
+    # -----------------------------------------------------
+    def _split_step(self, psi: np.ndarray, half: np.ndarray, kinetic: np.ndarray) -> np.ndarray:
+        # FFT no último eixo: um lote (B, N) passa numa única chamada.
+        # Os buffers intermediários são nossos, então o backend pode
+        # sobrescrevê-los; a saída é sempre um array novo.
+        fft = self.fft_backend
+        psi_k = fft.fft(psi * half, overwrite_x=True)
+        psi_k *= kinetic
+        return fft.ifft(psi_k, overwrite_x=True) * half
+
+    def evolve_step_1d(self, psi: np.ndarray) -> np.ndarray:
+        if self._integrator != "strang":
+            return self.evolve_n(psi, 1, mode="1D")
+        prop = self._propagators()
+        return self._split_step(psi, prop.half, prop.kinetic)
+
+    def evolve_step_3d_radial(self, u: np.ndarray) -> np.ndarray:
+        """
+        Evolui a função auxiliar u(r) = r*psi(r).
+        A condição u(0) = 0 já está embutida em half_radial.
+        """
+        if self._integrator != "strang":
+            return self.evolve_n(u, 1, mode="3D_RADIAL")
+        prop = self._propagators()
+        return self._split_step(u, prop.half_radial, prop.kinetic)
+
+    def evolve_step(self, psi: np.ndarray, mode="1D") -> np.ndarray:
+        if mode == "1D":
+            return self.evolve_step_1d(psi)
+        elif mode == "3D_RADIAL":
+            return self.evolve_step_3d_radial(psi)
+        return psi
+
+    def evolve_n(self, psi: np.ndarray, n_steps: int, mode="1D",
+                 out: np.ndarray = None, snapshot_every: int = 0,
+                 absorbed: np.ndarray = None,
+                 probe_index=None, probe_out: np.ndarray = None,
+                 dt: float = None):
+        """
+        Evolui n_steps passos de Strang de uma vez.
+
+        A meia-fase final de um passo e a inicial do seguinte viram uma
+        única fase completa exp(-iVdt), então a sequência aplicada é
+        V/2 · K · (V · K)^(n-1) · V/2: metade das multiplicações de
+        evolve_step em laço, com o mesmo resultado. Com um integrador de
+        ordem maior (self.integrator), cada passo é a composição dos
+        sub-passos de Strang de INTEGRATORS, fundidos da mesma forma.
+
+        out: buffer de saída (pode ser o próprio psi para evoluir in-place).
+        snapshot_every: se > 0, devolve também (n_steps // k, ...) estados
+        tirados a cada k passos.
+        absorbed: acumulador de new_absorbed(); recebe a probabilidade
+        removida pelas camadas absorventes em cada lado.
+        probe_index / probe_out: grava psi nos índices probe_index (P,)
+        após cada passo, em probe_out (n_steps, ..., P). É o que os
+        detectores de fluxo usam sem pagar por snapshots completos.
+        dt: passo desta chamada (padrão: self.dt), sem alterar self.dt.
+        """
+        if mode not in ("1D", "3D_RADIAL"):
+            raise ValueError(f"Modo desconhecido: {mode!r}")
+        if self._integrator in GLOBAL_PROPAGATORS:
+            return self._evolve_global(psi, n_steps, mode, out, snapshot_every,
+                                       absorbed, probe_index, probe_out, dt)
+        prop = self._propagators(dt)
+        scheme = prop.scheme(self._integrator, radial=mode == "3D_RADIAL")
+        half, full = scheme.half, scheme.full
+
+        # Um pacote com pilha de potenciais vira um lote (B, N)
+        shape = np.broadcast_shapes(np.shape(psi), half.shape)
+        if out is None:
+            out = np.array(np.broadcast_to(psi, shape), dtype=complex)
+        elif out is not psi:
+            np.copyto(out, psi)
+
+        snapshots = None
+        if snapshot_every > 0:
+            snapshots = np.empty((n_steps // snapshot_every,) + out.shape, dtype=complex)
+
+        if n_steps <= 0:
+            return out if snapshots is None else (out, snapshots)
+
+        # A cinética é unitária: toda perda de norma vem das fases com
+        # |half| < 1, então somar a perda em cada multiplicação é exato
+        track = absorbed is not None and prop.loss_half is not None
+        if track:
+            layers = (self.regions.absorber_left, self.regions.absorber_right)
+
+            def absorb(a, loss):
+                for side, layer in enumerate(layers):
+                    absorbed[side] += np.sum(np.abs(a[..., layer]) ** 2 * loss[layer], axis=-1) * self.dx
+
+        if probe_out is not None:
+            probe_index = np.asarray(probe_index)
+            probe_half = half[..., probe_index]
+
+        fft = self.fft_backend
+        buf = out
+        if track:
+            absorb(buf, prop.loss_half)
+        buf *= half
+        for i in range(n_steps):
+            for j, kinetic in enumerate(scheme.kinetic):
+                if j:
+                    buf *= scheme.inner[j - 1]
+                buf = fft.fft(buf, overwrite_x=True)
+                buf *= kinetic
+                buf = fft.ifft(buf, overwrite_x=True)
+
+            # Estado físico após o passo i = buf * half
+            if snapshots is not None and (i + 1) % snapshot_every == 0:
+                np.multiply(buf, half, out=snapshots[(i + 1) // snapshot_every - 1])
+            if probe_out is not None:
+                np.multiply(buf[..., probe_index], probe_half, out=probe_out[i])
+            last = i == n_steps - 1
+            if track:
+                absorb(buf, prop.loss_half if last else prop.loss_full)
+            buf *= half if last else full
+
+        np.copyto(out, buf)
+        return out if snapshots is None else (out, snapshots)
+
+    def _evolve_global(self, psi, n_steps, mode, out, snapshot_every,
+                       absorbed, probe_index, probe_out, dt):
+        """
+        evolve_n com chebyshev/krylov: cada passo é exp(-iH dt) com erro
+        <= propagator_tol, então dt pode ser muito maior que no split-step.
+
+        A perda de norma de cada passo é exata; a divisão entre as camadas
+        esquerda e direita segue ∫W|ψ|² nas duas pontas do passo. Numa
+        MappedGrid a propagação é feita em φ = √J·ψ, em que H é hermitiano.
+        """
+        H = self.hamiltonian(mode)
+        dt = self._dt if dt is None else float(dt)
+
+        shape = np.broadcast_shapes(np.shape(psi), H.V.shape)
+        if out is None:
+            out = np.array(np.broadcast_to(psi, shape), dtype=complex)
+        elif out is not psi:
+            np.copyto(out, psi)
+        H.project(out)
+
+        snapshots = None
+        if snapshot_every > 0:
+            snapshots = np.empty((n_steps // snapshot_every,) + out.shape, dtype=complex)
+
+        track = absorbed is not None and self.has_absorber
+        if track:
+            layers = (self.regions.absorber_left, self.regions.absorber_right)
+
+            sqrt_W = np.sqrt(H.W)
+
+            def rates(a):
+                return [self.region_probability(a * sqrt_W, layer) for layer in layers]
+
+        for i in range(n_steps):
+            if track:
+                norm_before = self.region_probability(out, slice(None))
+                rate_before = rates(out)
+            self.propagate(H, out, dt, out=out)
+            if track:
+                lost = norm_before - self.region_probability(out, slice(None))
+                share = [a + b for a, b in zip(rate_before, rates(out))]
+                total = share[0] + share[1]
+                total = np.where(total > 0, total, 1.0)
+                for side in range(2):
+                    absorbed[side] += lost * share[side] / total
+
+            if snapshots is not None and (i + 1) % snapshot_every == 0:
+                snapshots[(i + 1) // snapshot_every - 1] = out
+            if probe_out is not None:
+                probe_out[i] = out[..., probe_index]
+
+        return out if snapshots is None else (out, snapshots)
+
+    def propagate(self, H, psi: np.ndarray, dt: float = None, out: np.ndarray = None):
+        """
+        exp(-iH dt) psi com H de hamiltonian() e o integrador global atual
+        (krylov para qualquer H; chebyshev só hermitiano). Numa MappedGrid
+        converte para φ = √J·ψ e de volta.
+        """
+        propagate = GLOBAL_PROPAGATORS.get(self._integrator, global_propagators.krylov)
+        dt = self._dt if dt is None else float(dt)
+        if out is None:
+            out = np.array(psi, dtype=complex)
+        elif out is not psi:
+            np.copyto(out, psi)
+        if H.sqrt_jacobian is None:
+            return propagate(H, out, dt, self.propagator_tol, out=out)
+        out *= H.sqrt_jacobian
+        propagate(H, out, dt, self.propagator_tol, out=out)
+        out /= H.sqrt_jacobian
+        return out
+
+    def evolve_adaptive(self, psi: np.ndarray, duration: float, tol: float = 1e-6,
+                        mode="1D", out: np.ndarray = None, absorbed: np.ndarray = None,
+                        dt_min: float = None, dt_max: float = None):
+        """
+        Evolui psi por um tempo `duration` com passo controlado por erro
+        (step-doubling): cada tentativa compara um passo h com dois de h/2
+        e é aceita se ||ψ_h - ψ_h/2|| <= tol (pior linha de um lote),
+        ficando com ψ_h/2.
+
+        h só é dobrado ou cortado pela metade a partir de self.dt, então os
+        passos usados são dt·2^m e os propagadores de cada um ficam em
+        cache; apenas o último passo é encurtado para terminar em duration.
+        Barreiras altas e a parede rígida deixam de exigir um dt pequeno
+        na simulação inteira: o passo só cai onde o erro aparece.
+
+        dt_min / dt_max: limites do passo (padrão dt/1024 e 16·dt). No
+        passo mínimo a tentativa é aceita mesmo acima de tol.
+        Devolve (psi, info), info = {"steps", "rejected", "dt"}, com
+        "dt" o último passo aceito (bom ponto de partida para a próxima chamada).
+        """
+        if self._integrator in GLOBAL_PROPAGATORS:
+            raise ValueError(f"{self._integrator} já controla o erro por passo (propagator_tol)")
+        order = INTEGRATOR_ORDER[self._integrator]
+        dt_min = self._dt / 1024 if dt_min is None else dt_min
+        dt_max = self._dt * 16 if dt_max is None else dt_max
+
+        shape = np.broadcast_shapes(np.shape(psi), self.V.shape)
+        if out is None:
+            out = np.array(np.broadcast_to(psi, shape), dtype=complex)
+        elif out is not psi:
+            np.copyto(out, psi)
+
+        h = min(self._dt, dt_max)
+        t = 0.0
+        steps = rejected = 0
+        last_dt = h
+        trial_absorbed = None
+        while duration - t > 1e-12 * max(duration, 1.0):
+            step = min(h, duration - t)
+            coarse = self.evolve_n(out, 1, mode=mode, dt=step)
+            if absorbed is not None:
+                trial_absorbed = np.zeros_like(absorbed)
+            fine = self.evolve_n(out, 2, mode=mode, dt=step / 2, absorbed=trial_absorbed)
+
+            error = np.sqrt(np.max(self.region_probability(fine - coarse, slice(None))))
+            if error <= tol or step <= dt_min:
+                np.copyto(out, fine)
+                if absorbed is not None:
+                    absorbed += trial_absorbed
+                t += step
+                steps += 1
+                last_dt = step
+            else:
+                rejected += 1
+
+            # Erro local ~ h^(ordem+1): dobra com folga, corta quando estoura
+            if error * 2.0 ** (order + 1) < 0.5 * tol:
+                h = min(2 * h, dt_max)
+            elif error > tol:
+                h = max(h / 2, dt_min)
+
+        return out, {"steps": steps, "rejected": rejected, "dt": last_dt}
+
+    # -----------------------------------------------------
+    # Estado
+    # -----------------------------------------------------
+    def reset(self) -> np.ndarray:
+        """Restaura psi para o pacote inicial e zera o relógio."""
+        self.psi = self.psi0
+        self.time = 0.0
+        return self.psi
+
+    def advance(self, n_steps: int = 1, mode="1D") -> np.ndarray:
+        """Evolui o estado interno (self.psi) por n_steps passos."""
+        self.psi = self.evolve_n(self.psi, n_steps, mode=mode)
+        self.time += n_steps * self.dt
+        return self.psi
+
+    # -----------------------------------------------------
+    # Cálculos físicos
+    # -----------------------------------------------------
+    def calculate_transmission(self, psi: np.ndarray, absorbed: np.ndarray = None):
+        """
+        (T, R) em %. Para um lote (B, N) devolve dois vetores de tamanho B.
+        T é a probabilidade à direita da última barreira e R à esquerda
+        da primeira; com absorbed (de evolve_n), somam-se a elas o que as
+        camadas absorventes da direita e da esquerda já removeram.
+        """
+        regions = self.regions
+        T = self.region_probability(psi, regions.right)
+        R = self.region_probability(psi, regions.left)
+        if absorbed is not None:
+            T = T + absorbed[1]
+            R = R + absorbed[0]
+        return T * 100.0, R * 100.0
+
+    def well_occupancy(self, psi: np.ndarray):
+        """Probabilidade (%) presa entre as barreiras (poço/gap)."""
+        wells = self.regions.wells
+        return sum(self.region_probability(psi, well) for well in wells) * 100.0
+
+    def region_probability(self, psi: np.ndarray, region: slice):
+        """∫|psi|² dx sobre uma fatia de Regions (por linha, em lotes)."""
+        weights = self.grid.weights
+        if np.ndim(weights):
+            return np.sum(np.abs(psi[..., region]) ** 2 * weights[region], axis=-1)
+        return np.sum(np.abs(psi[..., region]) ** 2, axis=-1) * weights
+
+    def norm(self, psi: np.ndarray):
+        """∫|psi|² dx (por linha, em lotes)."""
+        return np.trapz(np.abs(psi) ** 2, self.x, axis=-1)
+
+    def normalize(self, psi: np.ndarray, mode="1D") -> np.ndarray:
+        """
+        FIX: Correção na normalização 3D.
+        Se estamos evoluindo u(r), a probabilidade |u|^2 já contém o fator geométrico r^2.
+        Portanto, a integral é simplesmente ∫|u|^2 dr.
+        """
+        prob = np.abs(psi) ** 2
+
+        # Em ambos os casos (1D psi ou 3D u), integramos a densidade direta
+        # Lotes (B, N) são normalizados linha a linha
+        norm = np.trapz(prob, self.x, axis=-1)
+        norm = np.where(norm > 0, norm, 1.0)
+
+        psi /= np.sqrt(norm)[..., np.newaxis]
+
+        return psi
+
+
+class Regions:
     """
-    Cria duas barreiras separadas por um 'gap' (Poço Quântico).
-    Isso gera padrões de interferência e ressonância (Fabry-Pérot).
+    Índice das regiões da malha como fatias de x, para que T, R e o
+    recorte das curvas sejam reduções sobre views em vez de máscaras
+    recriadas a cada quadro:
+
+        left | barriers[0] | wells[0] | barriers[1] | ... | right
+
+    As barreiras são os trechos contíguos com V > SUPPORT_TOL·max(V). A
+    parede rígida fica fora do máximo; numa pilha (B, N) vale a união das
+    linhas. interaction vai do início da primeira barreira ao fim da
+    última. Sem barreira, vale a posição nominal
+    barreira_center ± barreira_width/2. sink é a fatia do coletor ou None;
+    absorber_left/absorber_right são as camadas absorventes (vazias sem CAP),
+    contidas em left e right.
     """
-    global V, barreira_center, barreira_width
-    V = np.zeros_like(x)
 
-    # Muro 1 (Esquerda)
-    start1 = barreira_center - gap / 2 - width
-    end1 = barreira_center - gap / 2
+    __slots__ = ("version", "left", "barriers", "wells", "interaction", "right", "sink",
+                 "absorber_left", "absorber_right")
 
-    # Muro 2 (Direita)
-    start2 = barreira_center + gap / 2
-    end2 = barreira_center + gap / 2 + width
+    def __init__(self, sim: Simulation):
+        self.version = sim._version
+        n = sim.N
 
-    mask = ((x >= start1) & (x <= end1)) | ((x >= start2) & (x <= end2))
-    V[mask] = v0
-# No final do arquivo Schrödinger_engine.py
+        V = sim.V
+        finite = V[V < V_INFINITY]
+        peak = finite.max() if finite.size else 0.0
+        support = (V > SUPPORT_TOL * peak) & (V > 0)
+        if support.ndim > 1:
+            support = support.any(axis=tuple(range(support.ndim - 1)))
+        if not support.any():
+            support = sim._barrier_mask()
 
-def set_double_barrier_potential(v0, width, gap):
+        # Bordas dos trechos contíguos: inícios nos índices pares, fins nos ímpares
+        edges = np.flatnonzero(np.diff(support, prepend=False, append=False))
+        starts, ends = edges[0::2].tolist(), edges[1::2].tolist()
+
+        self.barriers = tuple(slice(a, b) for a, b in zip(starts, ends))
+        self.wells = tuple(slice(b, a) for b, a in zip(ends[:-1], starts[1:]))
+        if self.barriers:
+            self.left = slice(0, starts[0])
+            self.interaction = slice(starts[0], ends[-1])
+            self.right = slice(ends[-1], n)
+        else:
+            self.left = slice(0, n)
+            self.interaction = self.right = slice(n, n)
+
+        self.sink = None
+        if sim._sink is not None:
+            start, end = sim._sink
+            self.sink = slice(int(np.searchsorted(sim.x, start, side="right")),
+                              int(np.searchsorted(sim.x, end, side="left")))
+
+        inner = sim.L / 2 - sim.absorber_width if sim.has_absorber else sim.L
+        self.absorber_left = slice(0, int(np.searchsorted(sim.x, -inner, side="right")))
+        self.absorber_right = slice(int(np.searchsorted(sim.x, inner, side="left")), n)
+
+
+class _Propagators:
     """
-    Define o potencial V(x) como uma barreira dupla.
-    v0: Altura das barreiras.
-    width: Largura de cada barreira.
-    gap: Distância entre as duas barreiras.
+    Fatores de fase pré-calculados para uma versão da Simulation e um dt.
+
+    A parede rígida e a origem radial são pontos onde psi deve ser zero
+    após cada passo; como a multiplicação pela fase do potencial também é
+    diagonal, basta zerar a fase nesses pontos em vez de aplicar uma
+    máscara separada a cada passo.
     """
-    global V
-    V = np.zeros_like(x)
 
-    # Limites da primeira barreira (esquerda)
-    b1_start = barreira_center - gap / 2 - width
-    b1_end = barreira_center - gap / 2
+    __slots__ = ("version", "dt", "kinetic", "wall",
+                 "half", "full", "half_radial", "full_radial",
+                 "loss_half", "loss_full", "_V", "_k2", "_zero_radial", "_schemes")
 
-    # Limites da segunda barreira (direita)
-    b2_start = barreira_center + gap / 2
-    b2_end = barreira_center + gap / 2 + width
+    def __init__(self, sim: Simulation, dt: float):
+        self.version = sim._version
+        self.dt = dt
+        self.kinetic = np.exp(-1j * (sim.k ** 2 / 2) * dt)
 
-    # Aplica o potencial onde estão as barreiras
-    mask = ((x >= b1_start) & (x <= b1_end)) | ((x >= b2_start) & (x <= b2_end))
-    V[mask] = v0
-def normalize(psi: np.ndarray, mode="1D") -> np.ndarray:
+        self.wall = sim.V >= V_INFINITY
+        self.half = np.exp(-1j * sim.V * (dt / 2))
+        self.half[self.wall] = 0.0
+
+        # Potencial absorvente V - iW: fator real exp(-W dt/2) na meia-fase.
+        # loss_* = fração de |psi|² removida por uma meia-fase / fase completa.
+        self.loss_half = self.loss_full = None
+        if sim.has_absorber:
+            damping = np.exp(-sim.absorber_profile() * (dt / 2))
+            self.half *= damping
+            self.loss_half = 1.0 - damping ** 2
+            self.loss_full = 1.0 - damping ** 4
+
+        # FIX: Condição de contorno na origem (x=0) e não no índice 0
+        # O índice do centro do array (onde x=0 e r=0) é N//2
+        self.half_radial = self.half.copy()
+        self.half_radial[..., sim.N // 2] = 0.0
+        self.half_radial[..., sim.r < 1e-10] = 0.0
+
+        # Fases completas exp(-iVdt) para os passos fundidos de evolve_n
+        self.full = self.half ** 2
+        self.full_radial = self.half_radial ** 2
+
+        for arr in (self.kinetic, self.half, self.full,
+                    self.half_radial, self.full_radial,
+                    self.loss_half, self.loss_full):
+            if arr is not None:
+                arr.flags.writeable = False
+
+        # Para montar as composições de ordem maior sob demanda
+        self._V = sim.V
+        self._k2 = sim.k ** 2 / 2
+        self._zero_radial = self.half_radial == 0
+        self._schemes = {
+            ("strang", False): _Scheme((self.kinetic,), (), self.half, self.full),
+            ("strang", True): _Scheme((self.kinetic,), (), self.half_radial, self.full_radial),
+        }
+
+    def scheme(self, integrator: str, radial: bool = False) -> "_Scheme":
+        """Fatores da composição `integrator` (ver INTEGRATORS), em cache."""
+        key = (integrator, radial)
+        scheme = self._schemes.get(key)
+        if scheme is None:
+            scheme = self._compose(INTEGRATORS[integrator], radial)
+            self._schemes[key] = scheme
+        return scheme
+
+    def _compose(self, weights, radial: bool) -> "_Scheme":
+        # Sub-passos de Strang com dt_j = w_j·dt. As meias-fases vizinhas
+        # se fundem em exp(-iV(w_j + w_j+1)dt/2). O amortecimento do CAP
+        # fica só nas pontas do passo (half/full, com o dt inteiro): os
+        # pesos negativos da composição o transformariam em ganho, e dentro
+        # das camadas basta a 2ª ordem.
+        zero = self._zero_radial if radial else self.wall
+        def phase(w):
+            p = np.exp(-1j * self._V * (w * self.dt))
+            p[zero] = 0.0
+            p.flags.writeable = False
+            return p
+
+        kinetic = tuple(np.exp(-1j * self._k2 * (w * self.dt)) for w in weights)
+        inner = tuple(phase((a + b) / 2) for a, b in zip(weights[:-1], weights[1:]))
+
+        base_half = self.half_radial if radial else self.half
+        base_full = self.full_radial if radial else self.full
+        # Troca a fase de V/2 da ponta pela de w_0·V/2, mantendo o amortecimento
+        correction = np.exp(-1j * self._V * ((weights[0] - 1) * self.dt / 2))
+        half = base_half * correction
+        full = base_full * correction ** 2
+        for arr in kinetic + (half, full):
+            arr.flags.writeable = False
+        return _Scheme(kinetic, inner, half, full)
+
+
+class _Scheme:
     """
-    FIX: Correção na normalização 3D.
-    Se estamos evoluindo u(r), a probabilidade |u|^2 já contém o fator geométrico r^2.
-    Portanto, a integral é simplesmente ∫|u|^2 dr.
+    Um passo de evolve_n: half · K_0 · inner_0 · K_1 · ... · K_s-1 · half,
+    com full = half² entre passos consecutivos.
     """
-    prob = np.abs(psi) ** 2
 
-    # Em ambos os casos (1D psi ou 3D u), integramos a densidade direta
-    norm = np.trapz(prob, x)
+    __slots__ = ("kinetic", "inner", "half", "full")
+
+    def __init__(self, kinetic, inner, half, full):
+        self.kinetic = kinetic
+        self.inner = inner
+        self.half = half
+        self.full = full
+
+
+# =========================================================
+# API DE MÓDULO (COMPATIBILIDADE)
+# =========================================================
+# As funções abaixo delegam para uma simulação padrão, para que o código
+# antigo (eng.evolve_step, eng.V, eng.x, ...) continue funcionando.
+# Código novo deve criar a sua própria Simulation.
+_default = Simulation()
+
+_DEFAULT_ATTRS = {
+    "x", "r", "k", "dx", "dt", "V", "evolution_kinetic", "psi0",
+    "barreira_width", "barreira_center", "_is_hard_wall",
+    "x0", "sigma", "k0", "regions",
+}
+
+
+def __getattr__(name):
+    if name in _DEFAULT_ATTRS:
+        return getattr(_default, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def default_simulation() -> Simulation:
+    return _default
+
+
+def _barrier_mask():
+    return _default._barrier_mask()
+
+
+def set_barrier_height(V0: float):
+    _default.set_barrier_height(V0)
+
+
+def set_double_barrier(v0, width, gap):
+    _default.set_double_barrier(v0, width, gap)
+
+
+def set_double_barrier_potential(v0, width, gap):
+    _default.set_double_barrier_potential(v0, width, gap)
 
-    if norm > 0:
-        psi /= np.sqrt(norm)
 
-    return psi
\ No newline at end of file
+def evolve_step_1d(psi: np.ndarray) -> np.ndarray:
+    return _default.evolve_step_1d(psi)
+
+
+def evolve_step_3d_radial(u: np.ndarray) -> np.ndarray:
+    return _default.evolve_step_3d_radial(u)
+
+
+def evolve_step(psi: np.ndarray, mode="1D") -> np.ndarray:
+    return _default.evolve_step(psi, mode=mode)
+
+
+def calculate_transmission(psi: np.ndarray, absorbed: np.ndarray = None):
+    return _default.calculate_transmission(psi, absorbed)
+
+
+def normalize(psi: np.ndarray, mode="1D") -> np.ndarray:
+    return _default.normalize(psi, mode=mode)
@@ -0,0 +1,688 @@
+"""
+=========================================================
+BATCH RUNNER (HEADLESS)
+---------------------------------------------------------
+Roda uma simulação sem PyQt6, o mais rápido que a CPU permitir,
+e grava as séries temporais e o estado final num .npz.
+
+Uso:
+    python -m batch_runner --spec run.json --out result.npz
+    python -m batch_runner --mode DOUBLE_BARRIER --V0 3 --gap 5 --steps 10000
+    python -m batch_runner --potential csv --potential_file V.csv --absorber_width 10
+
+Os campos do spec JSON são os de RunSpec; flags na linha de
+comando sobrescrevem o arquivo. O modo 3D_RADIAL roda no motor
+radial (radial_engine, r ∈ [0, L/2], ℓ = 0), como na GUI.
+=========================================================
+"""
+
+import argparse
+import json
+import os
+from dataclasses import dataclass, asdict, fields
+
+import numpy as np
+
+import Schrödinger_engine as eng
+import checkpoint
+import flux_detectors
+import potentials
+import quantum_photosynthesis as bio_eng
+import radial_engine as rad_eng
+import stationary
+import trajectory
+
+MODES = ("1D", "3D_RADIAL", "DOUBLE_BARRIER", "BIO_QUANTUM")
+POTENTIALS = ("barrier", "double_barrier", "hard_wall", "gaussian", "eckart", "morse",
+              "kronig_penney", "csv", "none")
+# tdse = evolução temporal; stationary = matriz de transferência (só 1D)
+SOLVERS = ("tdse", "stationary")
+INTEGRATORS = tuple(eng.INTEGRATORS) + tuple(eng.GLOBAL_PROPAGATORS)
+# Meia-largura do pacote (em sigmas) que deve caber antes da rede de Kronig-Penney
+PACKET_SIGMAS = 3.0
+
+
+# =========================================================
+# ESPECIFICAÇÃO
+# =========================================================
+@dataclass
+class RunSpec:
+    mode: str = "1D"
+    potential: str = None  # None = derivado do modo
+    solver: str = "tdse"
+    V0: float = 2.0
+    width: float = 2.0
+    gap: float = 15.0
+    # kronig_penney: cells barreiras de largura width, uma a cada width + gap,
+    # centradas na barreira (x0 recua se a rede alcançar o pacote, ver packet_x0);
+    # csv: arquivo com as colunas x e V (potentials.from_csv)
+    cells: int = 5
+    potential_file: str = None
+    energy: float = 4.5
+    sigma: float = 2.0
+    # 3D_RADIAL: x0 > 0 é o raio inicial do pacote; senão vale o r0 do
+    # motor radial, e sigma é limitado a r0/3, como na GUI
+    x0: float = -20.0
+    N: int = 1024
+    L: float = 100.0
+    dt: float = 0.05
+    steps: int = 2000
+    sample_every: int = 10
+    fft_backend: str = None
+
+    # Integrador (eng.INTEGRATORS ou eng.GLOBAL_PROPAGATORS; estes aceitam
+    # dt grandes com erro <= propagator_tol). Com adaptive_tol > 0 cada intervalo
+    # de sample_every passos vira evolve_adaptive com essa tolerância; o
+    # fluxo não é medido nesse modo (T_flux/R_flux = NaN)
+    integrator: str = "strang"
+    adaptive_tol: float = 0.0
+    propagator_tol: float = 1e-12
+
+    # Malha mapeada (eng.MappedGrid): pontos grid_ratio vezes mais densos
+    # numa faixa ~grid_width em volta das barreiras e do coletor; 1 = uniforme.
+    # Exige um integrador global (chebyshev/krylov)
+    grid_ratio: float = 1.0
+    grid_width: float = 2.0
+
+    # Camadas absorventes (CAP) nas bordas; 0 = desligado
+    absorber_width: float = 0.0
+    absorber_strength: float = 5.0
+
+    # Detectores de fluxo (None = a detector_margin da região de interação)
+    # e parada antecipada quando a probabilidade residual entre eles < converge_tol
+    flux_left: float = None
+    flux_right: float = None
+    detector_margin: float = flux_detectors.DEFAULT_MARGIN
+    converge_tol: float = 0.0  # 0 = sempre roda os steps passos
+
+    # Bio-Quantum
+    sink_strength: float = 0.05
+    sink_width: float = 15.0
+
+    # Gravação de ψ(x, t) com run(record=...): um quadro a cada record_every
+    # passos (0 = a cada sample_every), em record_dtype
+    record_every: int = 0
+    record_dtype: str = "complex64"
+
+    # Checkpoint com run(checkpoint_path=...): a cada checkpoint_every passos
+    # (arredondado para a amostra seguinte) e ao fim; 0 = só ao fim
+    checkpoint_every: int = 0
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Modo desconhecido: {self.mode!r} (opções: {', '.join(MODES)})")
+        if self.potential is None:
+            self.potential = "double_barrier" if self.mode == "DOUBLE_BARRIER" else "barrier"
+        if self.potential not in POTENTIALS:
+            raise ValueError(f"Potencial desconhecido: {self.potential!r} (opções: {', '.join(POTENTIALS)})")
+        if self.potential == "csv" and not self.potential_file:
+            raise ValueError("potential csv exige potential_file")
+        if self.cells < 1:
+            raise ValueError("cells deve ser >= 1")
+        if self.sample_every < 1:
+            raise ValueError("sample_every deve ser >= 1")
+        if self.converge_tol < 0:
+            raise ValueError("converge_tol deve ser >= 0")
+        if self.integrator not in INTEGRATORS:
+            raise ValueError(f"Integrador desconhecido: {self.integrator!r} "
+                             f"(opções: {', '.join(INTEGRATORS)})")
+        if self.adaptive_tol < 0:
+            raise ValueError("adaptive_tol deve ser >= 0")
+        if self.adaptive_tol > 0 and self.integrator in eng.GLOBAL_PROPAGATORS:
+            raise ValueError(f"adaptive_tol não vale para {self.integrator} (use propagator_tol)")
+        if self.adaptive_tol > 0 and self.mode == "BIO_QUANTUM":
+            raise ValueError("adaptive_tol não vale para o modo BIO_QUANTUM")
+        if self.grid_ratio < 1:
+            raise ValueError("grid_ratio deve ser >= 1")
+        if self.grid_ratio > 1 and self.integrator not in eng.GLOBAL_PROPAGATORS:
+            raise ValueError("grid_ratio > 1 exige integrator chebyshev ou krylov")
+        if self.record_every < 0:
+            raise ValueError("record_every deve ser >= 0")
+        if self.checkpoint_every < 0:
+            raise ValueError("checkpoint_every deve ser >= 0")
+        if self.record_dtype not in trajectory.DTYPES:
+            raise ValueError(f"record_dtype desconhecido: {self.record_dtype!r} "
+                             f"(opções: {', '.join(trajectory.DTYPES)})")
+        if self.solver not in SOLVERS:
+            raise ValueError(f"Solver desconhecido: {self.solver!r} (opções: {', '.join(SOLVERS)})")
+        if self.solver == "stationary" and self.mode not in ("1D", "DOUBLE_BARRIER"):
+            raise ValueError("O solver stationary só vale para os modos 1D e DOUBLE_BARRIER")
+        if self.mode == "3D_RADIAL" and (self.integrator != "strang" or self.adaptive_tol > 0):
+            raise ValueError("O modo 3D_RADIAL usa o motor radial (Strang, passo fixo): "
+                             "integrator strang e adaptive_tol = 0")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunSpec":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Campos desconhecidos no spec: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+
+def build_simulation(spec: RunSpec) -> eng.Simulation:
+    """
+    Simulation configurada pelo spec (malha, pacote e potencial); no modo
+    3D_RADIAL, uma rad_eng.RadialSimulation (build_radial_simulation).
+    """
+    if spec.mode == "3D_RADIAL":
+        return build_radial_simulation(spec)
+    sim = eng.Simulation(
+        grid=eng.Grid(L=spec.L, N=spec.N),
+        dt=spec.dt,
+        barreira_width=spec.width,
+        x0=spec.x0,
+        sigma=spec.sigma,
+        k0=np.sqrt(2 * spec.energy),
+        V0=0.0,
+        fft_backend=spec.fft_backend,
+        integrator=spec.integrator,
+    )
+    sim.propagator_tol = spec.propagator_tol
+    if spec.grid_ratio > 1:
+        sim.grid = eng.MappedGrid(L=spec.L, N=spec.N, centers=grid_centers(spec, sim),
+                                  width=spec.grid_width, ratio=spec.grid_ratio)
+    if spec.absorber_width > 0:
+        sim.set_absorber(spec.absorber_width, spec.absorber_strength)
+    descriptor = spec_potential(spec, sim)
+    if descriptor is not None:
+        sim.set_potential(descriptor)
+    sim.x0 = packet_x0(spec, sim)
+    return sim
+
+
+def build_radial_simulation(spec: RunSpec) -> rad_eng.RadialSimulation:
+    """
+    Motor radial do modo 3D_RADIAL, montado como na GUI: os N pontos
+    cobrem r ∈ [0, L/2] e o potencial do spec vira uma casca em
+    barreira_center (o mesmo centro do 1D).
+    """
+    sim = rad_eng.RadialSimulation(rad_eng.RadialGrid(R=spec.L / 2, N=spec.N), dt=spec.dt,
+                                   barreira_width=spec.width, k0=np.sqrt(2 * spec.energy), V0=0.0)
+    if spec.x0 > 0:
+        sim.r0 = spec.x0
+    sim.sigma = min(spec.sigma, sim.r0 / 3)
+    if spec.absorber_width > 0:
+        sim.set_absorber(spec.absorber_width, spec.absorber_strength)
+    descriptor = spec_potential(spec, sim)
+    if descriptor is not None:
+        sim.set_potential(np.minimum(descriptor(sim.r), eng.V_INFINITY))
+    return sim
+
+
+def spec_potential(spec: RunSpec, sim: eng.Simulation, V0: float = None):
+    """
+    Descritor (potentials) do potencial do spec, com altura V0 (padrão:
+    spec.V0), centrado em sim.barreira_center; None para "none". width é
+    a largura característica (σ da gaussiana, a do Eckart, 1/α do Morse,
+    espelhado para a parede ficar de frente para o pacote).
+    """
+    V0 = spec.V0 if V0 is None else V0
+    c, w = sim.barreira_center, spec.width
+    if spec.potential == "barrier":
+        return potentials.Rectangle(c, w, V0)
+    if spec.potential == "hard_wall":
+        return potentials.Rectangle(c, w, eng.V_INFINITY)
+    if spec.potential == "double_barrier":
+        return potentials.double_barrier(c, w, spec.gap, V0)
+    if spec.potential == "gaussian":
+        return potentials.Gaussian(c, w, V0)
+    if spec.potential == "eckart":
+        return potentials.Eckart(c, w, V0)
+    if spec.potential == "morse":
+        return potentials.Morse(c, -w, V0)
+    if spec.potential == "kronig_penney":
+        return potentials.KronigPenney(c, spec.cells, w + spec.gap, w, V0)
+    if spec.potential == "csv":
+        return potentials.from_csv(spec.potential_file)
+    return None
+
+
+def packet_x0(spec: RunSpec, sim: eng.Simulation, x0=None, sigma=None):
+    """
+    Centro do pacote (padrão: spec.x0, spec.sigma; aceita vetores do lote).
+    Uma rede de Kronig-Penney longa passa da posição padrão do pacote:
+    x0 recua até o pacote (PACKET_SIGMAS·sigma) e o detector da esquerda
+    ficarem antes da primeira barreira. ValueError se a rede, o pacote e
+    os detectores não couberem entre os absorvedores.
+    """
+    x0 = spec.x0 if x0 is None else x0
+    sigma = spec.sigma if sigma is None else sigma
+    if spec.potential != "kronig_penney":
+        return x0
+    lattice = spec_potential(spec, sim)
+    first = lattice.centers()[0] - lattice.width / 2
+    last = lattice.centers()[-1] + lattice.width / 2
+    x0 = np.minimum(x0, first - spec.detector_margin - PACKET_SIGMAS * sigma)
+    if (np.any(x0 - PACKET_SIGMAS * sigma <= sim.x[0] + sim.absorber_width)
+            or last + spec.detector_margin >= sim.x[-1] - sim.absorber_width):
+        raise ValueError(f"a rede de Kronig-Penney ocupa [{first:.1f}, {last:.1f}] e não deixa espaço "
+                         "para o pacote e os detectores: reduza cells ou gap, ou aumente L")
+    return x0 if np.ndim(x0) else float(x0)
+
+
+def check_resumable(spec: RunSpec, saved: dict):
+    """ValueError se o spec difere do salvo num checkpoint além de RESUMABLE_FIELDS."""
+    current = asdict(spec)
+    changed = sorted(name for name in current
+                     if name not in RESUMABLE_FIELDS and saved.get(name) != current[name])
+    if changed:
+        raise ValueError("checkpoint de outro spec (campos diferentes: " + ", ".join(changed) + ")")
+
+
+def replay_simulation(reader: trajectory.TrajectoryReader) -> eng.Simulation:
+    """
+    Simulation com a malha e o potencial de uma trajetória gravada, para
+    exibir e medir os quadros. Gravações de run() guardam o RunSpec e são
+    refeitas por build_simulation (inclusive MappedGrid e CAP); as demais
+    usam uma malha uniforme com o V gravado (primeira linha, num lote).
+    """
+    try:
+        spec = RunSpec.from_dict(reader.parameters)
+    except (TypeError, ValueError):
+        spec = None
+    if spec is not None and spec.N == reader.meta["N"]:
+        return build_simulation(spec)
+    if reader.meta["mapped"]:
+        raise ValueError("trajetória numa MappedGrid sem RunSpec: a malha não pode ser refeita")
+    sim = eng.Simulation(grid=eng.Grid(L=reader.meta["L"], N=reader.meta["N"]), dt=reader.dt, V0=0.0)
+    sim.set_potential(reader.V.reshape(-1, sim.N)[0])
+    return sim
+
+
+def grid_centers(spec: RunSpec, sim: eng.Simulation):
+    """Onde a malha mapeada concentra pontos: barreiras e coletor."""
+    c = sim.barreira_center
+    centers = []
+    if spec.potential in ("barrier", "hard_wall", "gaussian", "eckart", "morse"):
+        centers.append(c)
+    elif spec.potential == "double_barrier":
+        offset = spec.gap / 2 + spec.width / 2
+        centers += [c - offset, c + offset]
+    elif spec.potential == "kronig_penney":
+        centers += spec_potential(spec, sim).centers().tolist()
+    if spec.mode == "BIO_QUANTUM":
+        # Mesma posição padrão de QuantumPhotosynthesis
+        centers.append(c + spec.width * 2)
+    return centers
+
+
+def build_monitor(spec: RunSpec, sim: eng.Simulation, psi: np.ndarray):
+    """Par de detectores de fluxo configurado pelo spec."""
+    return flux_detectors.ScatteringMonitor(
+        sim, psi, tol=spec.converge_tol,
+        left=spec.flux_left, right=spec.flux_right, margin=spec.detector_margin,
+    )
+
+
+# =========================================================
+# EXECUÇÃO
+# =========================================================
+def stationary_transmission(specs):
+    """
+    T e R (%) de cada spec pela matriz de transferência, médios sobre o
+    espectro do pacote (o que o TDSE mediria), sem evolução temporal.
+    """
+    T = np.empty(len(specs))
+    R = np.empty(len(specs))
+    for i, spec in enumerate(specs):
+        sim = build_simulation(spec)
+        segments = stationary.segments_from_potential(sim)
+        T[i], R[i] = stationary.packet_transmission(segments, sim.k0, spec.sigma)
+    return T * 100.0, R * 100.0
+
+
+# Campos que podem mudar ao retomar um checkpoint (steps maior estende a execução)
+RESUMABLE_FIELDS = ("steps", "checkpoint_every")
+
+
+def run(spec: RunSpec, record: str = None, checkpoint_path: str = None,
+        resume: bool = False) -> dict:
+    """
+    Executa o spec e devolve um dict pronto para np.savez:
+    t, T, R, norm, efficiency, T_flux, R_flux (séries a cada sample_every
+    passos), steps (passos realmente rodados), psi (estado final), x, V
+    e o spec em JSON.
+
+    Com converge_tol > 0 a execução para na primeira amostra em que o
+    espalhamento convergiu (fora do modo BIO_QUANTUM). Com
+    solver="stationary" as séries têm uma única amostra assintótica.
+
+    record: diretório de uma trajetória (trajectory.TrajectoryWriter) que
+    recebe psi a cada record_every passos, em streaming. Ignorado com
+    solver="stationary".
+
+    checkpoint_path: .npz (checkpoint.py) regravado a cada checkpoint_every
+    passos e na última amostra. Com resume=True e o arquivo existente, a
+    execução continua dele em vez de recomeçar: o spec deve ser o mesmo,
+    a menos de RESUMABLE_FIELDS.
+
+    No modo 3D_RADIAL (motor radial) x é r, T é a probabilidade fora da
+    casca e R a que ficou dentro; record e checkpoint_path não são
+    suportados (os formatos descrevem a malha do motor 1D).
+    """
+    if spec.mode == "3D_RADIAL" and (record or checkpoint_path):
+        raise ValueError("record e checkpoint não valem para o modo 3D_RADIAL (motor radial)")
+    sim = build_simulation(spec)
+    if spec.solver == "stationary":
+        T, R = stationary_transmission([spec])
+        nan = np.array([np.nan])
+        return {
+            "t": np.array([np.inf]), "T": T, "R": R, "norm": np.ones(1), "efficiency": nan,
+            "T_flux": nan, "R_flux": nan, "steps": np.array(0),
+            "psi": sim.psi0, "x": np.asarray(sim.x), "V": np.asarray(sim.V),
+            "spec": np.array(spec.to_json()),
+        }
+
+    phys_mode = "3D_RADIAL" if spec.mode == "3D_RADIAL" else "1D"
+
+    bio = None
+    if spec.mode == "BIO_QUANTUM":
+        bio = bio_eng.QuantumPhotosynthesis(sim)
+        bio.sink_strength = spec.sink_strength
+        bio.sink_width = spec.sink_width
+        psi = bio.psi
+    else:
+        psi = sim.normalize(sim.psi0, mode=phys_mode)
+
+    # Com camadas absorventes a norma deve cair: o que sai entra em T/R
+    absorbed = sim.new_absorbed(psi) if sim.has_absorber else None
+    renormalize = bio is None and absorbed is None
+
+    monitor = build_monitor(spec, sim, psi) if bio is None else None
+    early_stop = monitor is not None and spec.converge_tol > 0
+    adaptive = spec.adaptive_tol > 0
+
+    n_samples = spec.steps // spec.sample_every + 1
+    t = np.empty(n_samples)
+    T = np.empty(n_samples)
+    R = np.empty(n_samples)
+    norm = np.empty(n_samples)
+    efficiency = np.full(n_samples, np.nan)
+    T_flux = np.full(n_samples, np.nan)
+    R_flux = np.full(n_samples, np.nan)
+
+    def sample(i, psi):
+        t[i] = sim.time
+        T[i], R[i] = sim.calculate_transmission(psi, absorbed)
+        norm[i] = np.trapz(np.abs(psi) ** 2, sim.x)
+        if monitor is not None and not adaptive:
+            T_flux[i], R_flux[i] = monitor.T * 100.0, monitor.R * 100.0
+        if bio is not None:
+            efficiency[i] = bio.get_efficiency_percent()
+        elif renormalize:
+            # Como na GUI: 1D/3D renormalizam (a norma registrada é a de antes)
+            sim.normalize(psi, mode=phys_mode)
+
+    def advance(psi, n):
+        if bio is not None:
+            for _ in range(n):
+                psi = bio.evolve_step()
+        elif adaptive:
+            sim.evolve_adaptive(psi, n * sim.dt, spec.adaptive_tol, mode=phys_mode,
+                                out=psi, absorbed=absorbed)
+            monitor.check(psi)
+        else:
+            monitor.advance(psi, n, mode=phys_mode, absorbed=absorbed)
+        sim.time += n * sim.dt
+        return psi
+
+    writer = None
+    record_every = spec.record_every or spec.sample_every
+    if record:
+        writer = trajectory.TrajectoryWriter(record, sim, mode=phys_mode, stride=record_every,
+                                             dtype=spec.record_dtype, parameters=asdict(spec))
+        writer.append(psi)
+
+    def step(psi, n, done):
+        """advance em pedaços que terminam em cada quadro a gravar."""
+        while n > 0:
+            m = n if writer is None else min(n, record_every - done % record_every)
+            psi = advance(psi, m)
+            n -= m
+            done += m
+            if writer is not None and done % record_every == 0:
+                writer.append(psi)
+        return psi
+
+    series = {"t": t, "T": T, "R": R, "norm": norm, "efficiency": efficiency,
+              "T_flux": T_flux, "R_flux": R_flux}
+    checkpoint_samples = -(-spec.checkpoint_every // spec.sample_every) or n_samples
+
+    def save(i):
+        arrays = {name: values[:i + 1] for name, values in series.items()}
+        if monitor is not None:
+            arrays.update({"monitor_" + name: value for name, value in monitor.state().items()})
+        checkpoint.save_checkpoint(checkpoint_path, sim, psi, mode=phys_mode, absorbed=absorbed,
+                                   bio=bio, descriptor=asdict(spec), arrays=arrays,
+                                   state={"sample": i, "steps": steps_run})
+
+    steps_run = 0
+    first = 1
+    stopped = False  # parou por convergência (inclusive antes do checkpoint retomado)
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        if record:
+            raise ValueError("record não pode ser combinado com resume")
+        saved = checkpoint.load_checkpoint(checkpoint_path)
+        check_resumable(spec, saved.descriptor)
+        psi = saved.restore(sim, bio)
+        if absorbed is not None:
+            absorbed[...] = saved.absorbed
+        if monitor is not None:
+            monitor.restore({name[8:]: value for name, value in saved.arrays.items()
+                             if name.startswith("monitor_")})
+        done = min(saved.state["sample"] + 1, n_samples)
+        for name, values in series.items():
+            values[:done] = saved.arrays[name][:done]
+        steps_run = saved.state["steps"]
+        first = done
+        if early_stop and monitor.converged:
+            n_samples = first
+            stopped = True
+    else:
+        sample(0, psi)
+
+    try:
+        for i in range(first, n_samples):
+            psi = step(psi, spec.sample_every, steps_run)
+            steps_run += spec.sample_every
+            sample(i, psi)
+            stopped = early_stop and bool(monitor.converged)
+            if checkpoint_path and (i % checkpoint_samples == 0 or stopped or i == n_samples - 1):
+                save(i)
+            if stopped:
+                n_samples = i + 1
+                break
+        # Passos que sobram quando steps não é múltiplo de sample_every
+        rest = spec.steps % spec.sample_every
+        if rest and not stopped:
+            psi = step(psi, rest, steps_run)
+            steps_run += rest
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return {
+        "t": t[:n_samples], "T": T[:n_samples], "R": R[:n_samples],
+        "norm": norm[:n_samples], "efficiency": efficiency[:n_samples],
+        "T_flux": T_flux[:n_samples], "R_flux": R_flux[:n_samples],
+        "steps": np.array(steps_run),
+        "psi": psi, "x": np.asarray(sim.x), "V": np.asarray(sim.V),
+        "spec": np.array(spec.to_json()),
+    }
+
+
+# Campos que podem variar de linha para linha dentro de um lote (B, N)
+BATCH_FIELDS = ("V0", "energy", "sigma", "x0", "sink_strength", "sink_width")
+
+
+def batch_key(spec: RunSpec) -> str:
+    """Specs com a mesma chave podem ser evoluídos juntos por run_batch."""
+    data = asdict(spec)
+    for name in BATCH_FIELDS:
+        data.pop(name)
+    return json.dumps(data, sort_keys=True)
+
+
+def run_batch(specs) -> dict:
+    """
+    Evolui vários specs como um único lote (B, N): um pacote e um
+    potencial por linha, uma FFT por passo para todo o lote. Todos
+    devem ter a mesma batch_key. No modo BIO_QUANTUM cada linha tem o
+    seu coletor (bio_eng.PhotosynthesisEnsemble, só integradores
+    split-step).
+
+    Devolve os valores finais T, R, norm, efficiency (NaN fora do modo
+    BIO_QUANTUM), T_flux, R_flux e steps (vetores de tamanho B). Com
+    converge_tol > 0 o lote para quando todas as linhas convergiram;
+    steps é o passo em que cada uma convergiu (ou o total rodado).
+    """
+    specs = list(specs)
+    first = specs[0]
+    if any(batch_key(spec) != batch_key(first) for spec in specs):
+        raise ValueError("run_batch exige specs que só diferem em " + ", ".join(BATCH_FIELDS))
+    if first.mode == "3D_RADIAL":
+        raise ValueError("run_batch não vale para o modo 3D_RADIAL (motor radial): use run")
+    if first.mode == "BIO_QUANTUM" and first.integrator in eng.GLOBAL_PROPAGATORS:
+        raise ValueError(f"run_batch no modo BIO_QUANTUM exige um integrador split-step, não {first.integrator}")
+    nan = np.full(len(specs), np.nan)
+    if first.solver == "stationary":
+        T, R = stationary_transmission(specs)
+        return {"T": T, "R": R, "norm": np.ones(len(specs)), "efficiency": nan,
+                "T_flux": nan, "R_flux": nan, "steps": np.zeros(len(specs), dtype=int)}
+
+    sim = build_simulation(first)
+    column = lambda name: np.array([getattr(spec, name) for spec in specs], dtype=float)
+
+    # Uma linha de V por spec (só V0 muda dentro do lote); o Stack é uma
+    # chave do cache de potentials, então repetir o lote não recalcula V
+    if first.potential not in ("hard_wall", "csv", "none"):
+        sim.set_potential(potentials.Stack(tuple(spec_potential(first, sim, V0) for V0 in column("V0"))))
+
+    if first.mode == "BIO_QUANTUM":
+        # Pacotes sem renormalizar, como QuantumPhotosynthesis em run()
+        psi = sim.make_packets(k0=np.sqrt(2 * column("energy")),
+                               sigma=column("sigma"),
+                               x0=packet_x0(first, sim, column("x0"), column("sigma")))
+        ensemble = bio_eng.PhotosynthesisEnsemble(sim, sink_width=column("sink_width"),
+                                                  sink_strength=column("sink_strength"), psi=psi)
+        ensemble.evolve(first.steps)
+        sim.time += first.steps * sim.dt
+        T, R = sim.calculate_transmission(ensemble.psi, ensemble.absorbed)
+        return {
+            "T": T, "R": R, "norm": np.trapz(np.abs(ensemble.psi) ** 2, sim.x, axis=-1),
+            "efficiency": ensemble.get_efficiency_percent(),
+            "T_flux": nan, "R_flux": nan, "steps": np.full(len(specs), first.steps),
+        }
+
+    phys_mode = "1D"
+    psi = sim.make_packets(k0=np.sqrt(2 * column("energy")),
+                           sigma=column("sigma"),
+                           x0=packet_x0(first, sim, column("x0"), column("sigma")))
+    psi = sim.normalize(np.array(np.broadcast_to(psi, sim.V.shape[:-1] + psi.shape[-1:])),
+                        mode=phys_mode)
+    absorbed = sim.new_absorbed(psi) if sim.has_absorber else None
+    monitor = build_monitor(first, sim, psi)
+    converged_at = np.full(len(specs), first.steps)
+
+    # Mesmo ritmo de renormalização de run()
+    done = 0
+    while done < first.steps:
+        n = min(first.sample_every, first.steps - done)
+        if first.adaptive_tol > 0:
+            sim.evolve_adaptive(psi, n * sim.dt, first.adaptive_tol, mode=phys_mode,
+                                out=psi, absorbed=absorbed)
+            monitor.check(psi)
+        else:
+            monitor.advance(psi, n, mode=phys_mode, absorbed=absorbed)
+        done += n
+        if first.converge_tol > 0:
+            converged_at = np.where(monitor.converged & (converged_at > done), done, converged_at)
+            if monitor.converged.all():
+                break
+        if done < first.steps and absorbed is None:
+            sim.normalize(psi, mode=phys_mode)
+    sim.time += done * sim.dt
+
+    T, R = sim.calculate_transmission(psi, absorbed)
+    norm = np.trapz(np.abs(psi) ** 2, sim.x, axis=-1)
+    T_flux, R_flux = monitor.T * 100.0, monitor.R * 100.0
+    if first.adaptive_tol > 0:
+        T_flux = R_flux = np.full(len(specs), np.nan)
+    return {
+        "T": T, "R": R, "norm": norm, "efficiency": nan,
+        "T_flux": T_flux, "R_flux": R_flux,
+        "steps": np.minimum(converged_at, done),
+    }
+
+
+def save_result(result: dict, path: str):
+    np.savez_compressed(path, **result)
+
+
+# =========================================================
+# CLI
+# =========================================================
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    """--spec arquivo.json e uma flag por campo de RunSpec."""
+    parser.add_argument("--spec", help="arquivo JSON com os campos de RunSpec")
+    for f in fields(RunSpec):
+        kind = f.type if f.type in (int, float) else str
+        choices = {"mode": MODES, "potential": POTENTIALS, "solver": SOLVERS,
+                   "integrator": INTEGRATORS, "record_dtype": trajectory.DTYPES}.get(f.name)
+        parser.add_argument(f"--{f.name}", type=kind, choices=choices, default=None)
+
+
+def spec_from_args(args) -> RunSpec:
+    """RunSpec do arquivo --spec, sobrescrito pelas flags presentes."""
+    data = {}
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as fh:
+            data.update(json.load(fh))
+    for f in fields(RunSpec):
+        value = getattr(args, f.name)
+        if value is not None:
+            data[f.name] = value
+    return RunSpec.from_dict(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m batch_runner",
+        description="Roda uma simulação de tunelamento sem interface gráfica.",
+    )
+    add_spec_arguments(parser)
+    parser.add_argument("--out", default="result.npz", help="arquivo .npz de saída")
+    parser.add_argument("--record", help="diretório onde gravar a trajetória ψ(x, t)")
+    parser.add_argument("--checkpoint", help="arquivo .npz de checkpoint (ver --checkpoint_every)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continua do --checkpoint, se existir, em vez de recomeçar")
+    parser.add_argument("--quiet", action="store_true", help="não imprime o resumo")
+    args = parser.parse_args(argv)
+
+    spec = spec_from_args(args)
+    result = run(spec, record=args.record, checkpoint_path=args.checkpoint, resume=args.resume)
+    save_result(result, args.out)
+
+    if not args.quiet:
+        steps = int(result["steps"])
+        if spec.solver == "stationary":
+            print(f"{spec.mode}: matriz de transferência (média sobre o pacote)")
+        else:
+            stopped = " (convergiu)" if steps < spec.steps else ""
+            print(f"{spec.mode}: {steps} passos{stopped}, t = {steps * spec.dt:.2f}")
+        print(f"  T = {result['T'][-1]:.2f}%  R = {result['R'][-1]:.2f}%  norma = {result['norm'][-1]:.4f}")
+        if spec.mode != "BIO_QUANTUM" and spec.solver == "tdse" and spec.adaptive_tol == 0:
+            print(f"  fluxo: T = {result['T_flux'][-1]:.2f}%  R = {result['R_flux'][-1]:.2f}%")
+        if spec.mode == "BIO_QUANTUM":
+            print(f"  eficiência = {result['efficiency'][-1]:.2f}%")
+        print(f"  -> {args.out}")
+        if args.record and spec.solver == "tdse":
+            print(f"  trajetória -> {args.record}")
+
+
+if __name__ == "__main__":
+    main()
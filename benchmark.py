@@ -0,0 +1,315 @@
+"""
+=========================================================
+BENCHMARKS DO MOTOR
+---------------------------------------------------------
+Uso:
+    python benchmark.py fft [--sizes 1024 4096 16384 65536] [--steps 200]
+    python benchmark.py integrators [--dts 0.2 0.1 0.05] [--time 8]
+    python benchmark.py propagators [--targets 1e-4 1e-6 1e-8] [--time 8]
+    python benchmark.py grid [--sizes 192 256 384 512] [--ratio 4]
+    python benchmark.py cartesian [--shapes 256x256 512x512 64x64x64] [--steps 50]
+    python benchmark.py potentials [--sizes 4096 65536] [--count 8] [--passes 4]
+
+fft: passos/s de Simulation.evolve_n para cada backend FFT
+disponível. O espaçamento da malha é mantido fixo, então L
+cresce junto com N.
+
+integrators: erro final x custo (FFTs e segundos) de cada
+integrador, com dt fixo e com passo adaptativo, contra uma
+referência suzuki6 com dt pequeno. A barreira é gaussiana: numa
+barreira retangular o erro é dominado pelas componentes de k alto
+da descontinuidade e nenhuma ordem converge limpa.
+
+propagators: split-step x chebyshev/krylov com a mesma precisão,
+na barreira retangular padrão. Para cada erro alvo, o dt do
+split-step é reduzido à metade até atingi-lo; os propagadores
+globais usam tol = alvo com um passo só e com dt = 1.
+
+grid: erro da malha uniforme x MappedGrid no mesmo N, numa barreira
+gaussiana estreita (largura 0.2), contra uma malha uniforme de 4096
+pontos (interpolação de Fourier). Ambas são periódicas em L/N e
+usam chebyshev; a mapeada paga em passos o seu menor espaçamento.
+
+cartesian: passos/s do motor 2D/3D (cartesian_engine) por malha,
+backend e precisão, e a memória dos arrays do tamanho da malha
+(psi e as duas fases de V). Espaçamento fixo, como em fft.
+
+potentials: custo por visita de set_potential + os fatores de fase
+do integrador (yoshida4) + o índice de regiões, numa varredura que passa
+`passes` vezes pelos mesmos `count` potenciais (rede de
+Kronig-Penney com rampa). "array" recalcula tudo a cada visita;
+"descritor" usa potentials.CACHE e só paga na primeira passada.
+=========================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import Schrödinger_engine as eng
+import cartesian_engine as cart_eng
+import fft_backends
+import potentials
+
+
+def _steps_per_second(sim: eng.Simulation, n_steps: int, repeats: int = 3) -> float:
+    psi = sim.psi0
+    sim.evolve_n(psi, 2)  # aquece planos e caches
+
+    best = np.inf
+    for _ in range(repeats):
+        buf = psi.copy()
+        t0 = time.perf_counter()
+        sim.evolve_n(buf, n_steps, out=buf)
+        best = min(best, time.perf_counter() - t0)
+    return n_steps / best
+
+
+def bench_fft_backends(sizes, n_steps: int):
+    backends = fft_backends.available_backends()
+    rows = []
+    for n in sizes:
+        grid = eng.Grid(L=eng.L * n / eng.N, N=n)
+        for name in backends:
+            sim = eng.Simulation(grid=grid, fft_backend=name)
+            rows.append((n, name, _steps_per_second(sim, n_steps)))
+    return rows
+
+
+def _integrator_sim(integrator: str, dt: float, V0: float) -> eng.Simulation:
+    sim = eng.Simulation(dt=dt, integrator=integrator)
+    sim.set_potential(V0 * np.exp(-((sim.x - sim.barreira_center) / 1.5) ** 2))
+    return sim
+
+
+def bench_integrators(dts, duration: float, V0: float = 2.0, tols=(1e-4, 1e-6)):
+    """(integrador, passo, FFTs, erro, segundos) para dt fixos e adaptativos."""
+    ref_sim = _integrator_sim("suzuki6", 0.0025, V0)
+    ref = ref_sim.evolve_n(ref_sim.normalize(ref_sim.psi0), int(round(duration / ref_sim.dt)))
+
+    def error(psi):
+        return np.sqrt(np.sum(np.abs(psi - ref) ** 2) * ref_sim.dx)
+
+    rows = []
+    for name, weights in eng.INTEGRATORS.items():
+        # Cada sub-passo de Strang custa uma FFT e uma IFFT
+        ffts_per_step = 2 * len(weights)
+        for dt in dts:
+            sim = _integrator_sim(name, dt, V0)
+            psi = sim.normalize(sim.psi0)
+            n_steps = int(round(duration / dt))
+            t0 = time.perf_counter()
+            psi = sim.evolve_n(psi, n_steps)
+            elapsed = time.perf_counter() - t0
+            rows.append((name, f"dt={dt:g}", n_steps * ffts_per_step, error(psi), elapsed))
+        for tol in tols:
+            sim = _integrator_sim(name, max(dts), V0)
+            t0 = time.perf_counter()
+            psi, info = sim.evolve_adaptive(sim.normalize(sim.psi0), duration, tol)
+            elapsed = time.perf_counter() - t0
+            # Cada tentativa = 1 passo h + 2 passos h/2
+            ffts = 3 * (info["steps"] + info["rejected"]) * ffts_per_step
+            rows.append((name, f"tol={tol:g}", ffts, error(psi), elapsed))
+    return rows
+
+
+def _print_integrator_table(rows):
+    print(f"{'integrador':<10}  {'passo':<10}  {'FFTs':>8}  {'erro':>10}  {'s':>8}")
+    for name, step, ffts, err, elapsed in rows:
+        print(f"{name:<10}  {step:<10}  {ffts:>8}  {err:>10.2e}  {elapsed:>8.3f}")
+
+
+def bench_propagators(targets, duration: float, V0: float = 2.0, max_halvings: int = 12):
+    """(método, alvo, passo, FFTs, erro, segundos) com erro final <= alvo."""
+    ref_sim = eng.Simulation(V0=V0, dt=duration, integrator="chebyshev")
+    ref_sim.propagator_tol = 1e-14
+    ref = ref_sim.evolve_n(ref_sim.normalize(ref_sim.psi0), 1)
+
+    def timed(sim, n_steps):
+        psi = sim.normalize(sim.psi0)
+        t0 = time.perf_counter()
+        psi = sim.evolve_n(psi, n_steps)
+        elapsed = time.perf_counter() - t0
+        return np.sqrt(np.sum(np.abs(psi - ref) ** 2) * ref_sim.dx), elapsed
+
+    rows = []
+    for target in targets:
+        for name, weights in eng.INTEGRATORS.items():
+            dt = 0.1
+            for _ in range(max_halvings):
+                n_steps = int(round(duration / dt))
+                err, elapsed = timed(eng.Simulation(V0=V0, dt=dt, integrator=name), n_steps)
+                if err <= target:
+                    break
+                dt /= 2
+            rows.append((name, target, f"dt={dt:g}", 2 * len(weights) * n_steps, err, elapsed))
+
+        for name in eng.GLOBAL_PROPAGATORS:
+            for dt in (duration, 1.0):
+                sim = eng.Simulation(V0=V0, dt=dt, integrator=name)
+                sim.propagator_tol = target
+                applications = _count_applications(sim, int(round(duration / dt)))
+                err, elapsed = timed(sim, int(round(duration / dt)))
+                rows.append((name, target, f"dt={dt:g}", 2 * applications, err, elapsed))
+    return rows
+
+
+def _count_applications(sim: eng.Simulation, n_steps: int) -> int:
+    """Quantas vezes H é aplicado em n_steps passos (cada uma = 2 FFTs)."""
+    H = sim.hamiltonian()
+    start = H.applications
+    sim.evolve_n(sim.normalize(sim.psi0), n_steps)
+    return H.applications - start
+
+
+def bench_grid(sizes, ratio: float, duration: float = 11.0, V0: float = 8.0,
+               width: float = 0.2, focus: float = 1.5):
+    """(N, malha, erro L2, aplicações de H, segundos) em t = duration."""
+
+    def run(grid):
+        sim = eng.Simulation(grid=grid, dt=duration, integrator="chebyshev", k0=4.0, sigma=3.0)
+        sim.set_potential(V0 * np.exp(-0.5 * ((sim.x - sim.barreira_center) / width) ** 2))
+        t0 = time.perf_counter()
+        psi = sim.evolve_n(sim.psi0, 1)
+        return sim, psi, time.perf_counter() - t0
+
+    ref_sim, ref, _ = run(eng.MappedGrid(N=4096, ratio=1.0))
+    coefficients = np.fft.fft(ref) / ref_sim.N
+
+    def error(sim, psi):
+        exact = np.exp(1j * np.outer(sim.x + ref_sim.L / 2, ref_sim.k)) @ coefficients
+        return np.sqrt(sim.region_probability(psi - exact, slice(None)))
+
+    rows = []
+    for n in sizes:
+        for name, r in (("uniforme", 1.0), (f"mapeada x{ratio:g}", ratio)):
+            sim, psi, elapsed = run(eng.MappedGrid(N=n, centers=[10.0], width=focus, ratio=r))
+            rows.append((n, name, error(sim, psi), sim.hamiltonian().applications, elapsed))
+    return rows
+
+
+def bench_cartesian(shapes, n_steps: int, dtypes=("complex64", "complex128")):
+    """(malha, backend, dtype, passos/s, MB) para cada combinação."""
+    rows = []
+    for shape in shapes:
+        grid = cart_eng.CartesianGrid(tuple(eng.L * n / eng.N for n in shape), shape)
+        for name in fft_backends.available_backends():
+            for dtype in dtypes:
+                sim = cart_eng.CartesianSimulation(grid, dtype=dtype, fft_backend=name)
+                sim.add_rectangle((sim.x0[0] + 10.0, 0.0), (2.0, np.inf), 2.0)
+                psi = sim.psi0
+                sim.evolve_n(psi, 2, out=psi)  # aquece planos e fases
+                t0 = time.perf_counter()
+                sim.evolve_n(psi, n_steps, out=psi)
+                rate = n_steps / (time.perf_counter() - t0)
+                megabytes = 3 * psi.nbytes / 2 ** 20
+                rows.append(("x".join(map(str, shape)), name, dtype, rate, megabytes))
+    return rows
+
+
+def bench_potentials(sizes, count: int, passes: int, integrator: str = "yoshida4"):
+    """(N, caminho, ms por visita na 1ª passada, ms nas seguintes)."""
+    rows = []
+    for n in sizes:
+        sim = eng.Simulation(grid=eng.Grid(L=eng.L * n / eng.N, N=n), integrator=integrator)
+        sweep = [potentials.KronigPenney(sim.barreira_center, 6, 3.0, 1.0, V0)
+                 + potentials.LinearRamp(-10.0, 30.0, 0.0, -0.5)
+                 for V0 in np.linspace(0.5, 4.0, count)]
+
+        for name, as_input in (("array", lambda d: d(sim.x)), ("descritor", lambda d: d)):
+            potentials.CACHE.clear()
+            times = []
+            for _ in range(passes):
+                t0 = time.perf_counter()
+                for descriptor in sweep:
+                    sim.set_potential(as_input(descriptor))
+                    sim.phase_factors()
+                    sim.regions
+                times.append((time.perf_counter() - t0) / count * 1e3)
+            rows.append((n, name, times[0], np.mean(times[1:]) if passes > 1 else np.nan))
+    return rows
+
+
+def _print_potentials_table(rows):
+    print(f"{'N':>8}  {'caminho':<10}  {'1ª (ms)':>9}  {'depois (ms)':>11}")
+    for n, name, first, rest in rows:
+        print(f"{n:>8}  {name:<10}  {first:>9.3f}  {rest:>11.3f}")
+
+
+def _print_cartesian_table(rows):
+    print(f"{'malha':<12}  {'backend':<8}  {'dtype':<10}  {'steps/s':>9}  {'MB':>8}")
+    for shape, name, dtype, rate, megabytes in rows:
+        print(f"{shape:<12}  {name:<8}  {dtype:<10}  {rate:>9.1f}  {megabytes:>8.1f}")
+
+
+def _print_grid_table(rows):
+    print(f"{'N':>6}  {'malha':<14}  {'erro':>10}  {'H·ψ':>8}  {'s':>8}")
+    for n, name, err, applications, elapsed in rows:
+        print(f"{n:>6}  {name:<14}  {err:>10.2e}  {applications:>8}  {elapsed:>8.3f}")
+
+
+def _print_propagator_table(rows):
+    print(f"{'método':<10}  {'alvo':>8}  {'passo':<14}  {'FFTs':>8}  {'erro':>10}  {'s':>8}")
+    for name, target, step, ffts, err, elapsed in rows:
+        print(f"{name:<10}  {target:>8.0e}  {step:<14}  {ffts:>8}  {err:>10.2e}  {elapsed:>8.3f}")
+
+
+def _print_table(rows, header):
+    print(f"{header[0]:>8}  {header[1]:<10}  {header[2]:>12}")
+    for n, name, rate in rows:
+        print(f"{n:>8}  {name:<10}  {rate:>12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_fft = sub.add_parser("fft", help="passos/s por backend FFT")
+    p_fft.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096, 16384, 65536])
+    p_fft.add_argument("--steps", type=int, default=200)
+
+    p_int = sub.add_parser("integrators", help="erro x custo por integrador")
+    p_int.add_argument("--dts", type=float, nargs="+", default=[0.2, 0.1, 0.05])
+    p_int.add_argument("--time", type=float, default=8.0, help="tempo total simulado")
+    p_int.add_argument("--V0", type=float, default=2.0, help="altura da barreira gaussiana")
+
+    p_prop = sub.add_parser("propagators", help="split-step x chebyshev/krylov na mesma precisão")
+    p_prop.add_argument("--targets", type=float, nargs="+", default=[1e-4, 1e-6, 1e-8])
+    p_prop.add_argument("--time", type=float, default=8.0, help="tempo total simulado")
+    p_prop.add_argument("--V0", type=float, default=2.0, help="altura da barreira retangular")
+
+    p_grid = sub.add_parser("grid", help="malha uniforme x mapeada no mesmo N")
+    p_grid.add_argument("--sizes", type=int, nargs="+", default=[192, 256, 384, 512])
+    p_grid.add_argument("--ratio", type=float, default=4.0, help="adensamento na barreira")
+
+    p_cart = sub.add_parser("cartesian", help="passos/s do motor 2D/3D")
+    p_cart.add_argument("--shapes", nargs="+", default=["256x256", "512x512", "64x64x64"],
+                        help="malhas, ex.: 512x512 ou 128x128x128")
+    p_cart.add_argument("--steps", type=int, default=50)
+
+    p_pot = sub.add_parser("potentials", help="varredura que revisita potenciais: array x descritor")
+    p_pot.add_argument("--sizes", type=int, nargs="+", default=[4096, 65536])
+    p_pot.add_argument("--count", type=int, default=8, help="potenciais distintos")
+    p_pot.add_argument("--passes", type=int, default=4, help="passadas pela varredura")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "fft":
+        _print_table(bench_fft_backends(args.sizes, args.steps), ("N", "backend", "steps/s"))
+    elif args.command == "integrators":
+        _print_integrator_table(bench_integrators(args.dts, args.time, args.V0))
+    elif args.command == "propagators":
+        _print_propagator_table(bench_propagators(args.targets, args.time, args.V0))
+    elif args.command == "grid":
+        _print_grid_table(bench_grid(args.sizes, args.ratio))
+    elif args.command == "cartesian":
+        shapes = [tuple(int(n) for n in text.split("x")) for text in args.shapes]
+        _print_cartesian_table(bench_cartesian(shapes, args.steps))
+    elif args.command == "potentials":
+        _print_potentials_table(bench_potentials(args.sizes, args.count, args.passes))
+
+
+if __name__ == "__main__":
+    main()
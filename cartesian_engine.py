@@ -0,0 +1,436 @@
+"""
+=========================================================
+MOTOR CARTESIANO 2D / 3D
+---------------------------------------------------------
+Split-step de Strang numa malha retangular periódica de 2 ou
+3 dimensões, com fftn sobre os eixos espaciais:
+
+    ψ(t + dt) = e^{-iV dt/2} F⁻¹ e^{-i|k|² dt/2} F e^{-iV dt/2} ψ(t)
+
+fundido como em Simulation.evolve_n (V/2 · K · (V · K)^(n-1) · V/2).
+
+Obstáculos se somam ao potencial: retângulos (caixas em 3D),
+círculos (esferas), paredes com fendas e parede rígida
+(V >= V_INFINITY). Coletores são potenciais imaginários -iW
+em discos (bolas), e a probabilidade que eles removem é
+somada em evolve_n(captured=...).
+
+Memória: psi e as duas fases de V (meia e completa) são os
+únicos arrays do tamanho da malha; a fase cinética é o produto
+de fatores 1D por eixo. Com dtype=complex64 tudo ocupa metade,
+e as FFTs rodam in-place (overwrite_x) no backend multithread
+(scipy por padrão, ou o de SCHRODINGER_FFT_BACKEND).
+=========================================================
+"""
+
+import os
+
+import numpy as np
+
+import Schrödinger_engine as eng
+import fft_backends
+
+# Malha padrão do modo "3D Surface": x como no motor 1D, faixa de y
+L = (eng.L, 30.0)
+N = (512, 128)
+
+
+# =========================================================
+# MALHA
+# =========================================================
+class CartesianGrid:
+    """
+    Malha periódica x_i ∈ [-L_i/2, L_i/2) em 2 ou 3 eixos e os números
+    de onda associados. Imutável, como Grid.
+    """
+
+    def __init__(self, L=L, N=N):
+        if len(L) != len(N) or len(N) not in (2, 3):
+            raise ValueError(f"Malha cartesiana precisa de 2 ou 3 eixos (L={L}, N={N})")
+        self.L = tuple(float(length) for length in L)
+        self.N = tuple(int(n) for n in N)
+        self.ndim = len(self.N)
+        self.dx = tuple(length / n for length, n in zip(self.L, self.N))
+        self.axes = tuple(np.linspace(-length / 2, length / 2, n, endpoint=False)
+                          for length, n in zip(self.L, self.N))
+        self.k = tuple(2 * np.pi * np.fft.fftfreq(n, d=d) for n, d in zip(self.N, self.dx))
+
+        # Elemento de volume (∫f dV ≈ Σ f·cell)
+        self.cell = float(np.prod(self.dx))
+
+        for arr in self.axes + self.k:
+            arr.flags.writeable = False
+
+    @property
+    def mesh(self):
+        """Coordenadas abertas (x, y[, z]) que se expandem por broadcasting."""
+        return np.ix_(*self.axes)
+
+
+# =========================================================
+# SIMULAÇÃO
+# =========================================================
+class CartesianSimulation:
+    """
+    Motor 2D/3D com a mesma interface de evolução e medida que
+    Simulation (evolve_n, normalize, norm, calculate_transmission,
+    regions), então o SimulationWorker e a GUI o usam sem distinção.
+
+    T e R são medidos ao longo do eixo x: à direita do último obstáculo
+    e à esquerda do primeiro, integrando nos demais eixos.
+    """
+
+    def __init__(self, grid: CartesianGrid = None, dt: float = 0.05,
+                 dtype=np.complex64, fft_backend=None,
+                 x0=(-20.0, 0.0), sigma=(2.0, 4.0), k0=(3.0, 0.0)):
+        self._grid = grid if grid is not None else CartesianGrid()
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != "c":
+            raise ValueError(f"dtype precisa ser complexo, não {self.dtype}")
+        self.fft_backend = fft_backend
+
+        # Pacote inicial, um valor por eixo (eixos extras: centro 0, sem momento)
+        self.x0 = x0
+        self.sigma = sigma
+        self.k0 = k0
+
+        self._version = 0
+        self._propagators_cache = None
+        self._regions = None
+
+        self._dt = float(dt)
+        self._V = np.zeros(self.N, dtype=self.dtype.char.lower())
+        self._W = None
+
+        self.time = 0.0
+
+    # -----------------------------------------------------
+    # Malha
+    # -----------------------------------------------------
+    @property
+    def grid(self):
+        return self._grid
+
+    @property
+    def ndim(self):
+        return self._grid.ndim
+
+    @property
+    def N(self):
+        return self._grid.N
+
+    @property
+    def L(self):
+        return self._grid.L
+
+    @property
+    def x(self):
+        return self._grid.axes[0]
+
+    @property
+    def axes(self):
+        return self._grid.axes
+
+    @property
+    def _spatial(self):
+        return tuple(range(-self.ndim, 0))
+
+    @property
+    def fft_backend(self):
+        return self._fft_backend
+
+    @fft_backend.setter
+    def fft_backend(self, backend):
+        """
+        Nome, None ou instância (com fftn/ifftn). None usa a variável de
+        ambiente SCHRODINGER_FFT_BACKEND ou, sem ela, scipy (multithread)
+        se estiver instalado.
+        """
+        if backend is None and fft_backends.ENV_VAR not in os.environ:
+            try:
+                backend = fft_backends.ScipyBackend()
+            except ImportError:
+                pass
+        if backend is None or isinstance(backend, str):
+            backend = fft_backends.get_backend(backend)
+        self._fft_backend = backend
+
+    @property
+    def dt(self):
+        return self._dt
+
+    @dt.setter
+    def dt(self, value):
+        self._dt = float(value)
+        self._invalidate()
+
+    def _axis_values(self, values, default):
+        values = tuple(np.atleast_1d(values).tolist())
+        return values + (default,) * (self.ndim - len(values))
+
+    def make_packet(self, x0=None, sigma=None, k0=None) -> np.ndarray:
+        """
+        Pacote gaussiano normalizado, produto de pacotes 1D por eixo. Os
+        argumentos omitidos usam x0, sigma e k0 da simulação.
+        """
+        x0 = self._axis_values(self.x0 if x0 is None else x0, 0.0)
+        sigma = self.sigma if sigma is None else sigma
+        sigma = self._axis_values(sigma, np.atleast_1d(sigma)[-1])
+        k0 = self._axis_values(self.k0 if k0 is None else k0, 0.0)
+
+        psi = np.ones((1,) * self.ndim, dtype=self.dtype)
+        for coord, c, s, k in zip(self.grid.mesh, x0, sigma, k0):
+            psi = psi * eng.gaussian_packet(coord, c, s, k).astype(self.dtype)
+        return psi
+
+    @property
+    def psi0(self):
+        """Função de onda inicial (nova cópia a cada acesso)."""
+        return self.make_packet()
+
+    # -----------------------------------------------------
+    # Potencial e coletores
+    # -----------------------------------------------------
+    @property
+    def V(self):
+        """Potencial atual (somente leitura: use set_potential / add_*)."""
+        return self._V
+
+    def set_potential(self, V: np.ndarray):
+        """Substitui o potencial; pontos com V >= V_INFINITY viram parede rígida."""
+        V = np.array(V, dtype=self.dtype.char.lower())
+        if V.shape != self.N:
+            raise ValueError(f"Potencial com forma {V.shape} incompatível com N={self.N}")
+        V.flags.writeable = False
+        self._V = V
+        self._invalidate()
+
+    def clear(self):
+        """Remove todos os obstáculos e coletores."""
+        self._W = None
+        self.set_potential(np.zeros(self.N))
+
+    def _add(self, mask, V0):
+        self.set_potential(self._V + np.minimum(V0, eng.V_INFINITY) * mask)
+
+    def add_rectangle(self, center, size, V0: float):
+        """Retângulo (caixa em 3D) de altura V0; size = np.inf ocupa o eixo todo."""
+        center = self._axis_values(center, 0.0)
+        size = self._axis_values(size, np.inf)
+        mask = np.ones((1,) * self.ndim, dtype=bool)
+        for coord, c, s in zip(self.grid.mesh, center, size):
+            mask = mask & (np.abs(coord - c) <= s / 2)
+        self._add(mask, V0)
+
+    def _ball(self, center, radius):
+        center = self._axis_values(center, 0.0)
+        r2 = sum((coord - c) ** 2 for coord, c in zip(self.grid.mesh, center))
+        return r2 <= radius ** 2
+
+    def add_circle(self, center, radius: float, V0: float):
+        """Disco (esfera em 3D) de altura V0."""
+        self._add(self._ball(center, radius), V0)
+
+    def add_slits(self, x: float, thickness: float, V0: float, width: float,
+                  separation: float = 0.0, count: int = 2):
+        """
+        Parede perpendicular a x, em x ± thickness/2, com `count` fendas
+        de largura width ao longo de y, centradas em y = 0 e separadas
+        por separation (de centro a centro). Em 3D as fendas são faixas
+        que atravessam z.
+        """
+        mesh = self.grid.mesh
+        wall = np.abs(mesh[0] - x) <= thickness / 2
+        centers = (np.arange(count) - (count - 1) / 2) * separation
+        opening = np.zeros_like(mesh[1], dtype=bool)
+        for c in centers:
+            opening = opening | (np.abs(mesh[1] - c) < width / 2)
+        self._add(wall & ~opening, V0)
+
+    @property
+    def has_sink(self) -> bool:
+        return self._W is not None
+
+    def add_sink(self, center, radius: float, strength: float):
+        """
+        Coletor -iW, W = strength num disco (bola). O que ele remove de
+        |ψ|² é somado em evolve_n(captured=...).
+        """
+        W = self._W if self._W is not None else np.zeros(self.N, dtype=self.dtype.char.lower())
+        self._W = W + strength * self._ball(center, radius)
+        self._W.flags.writeable = False
+        self._invalidate()
+
+    def new_captured(self, psi: np.ndarray = None) -> np.ndarray:
+        """Acumulador da probabilidade capturada pelos coletores (um por linha do lote)."""
+        batch = np.shape(psi)[:-self.ndim] if psi is not None else ()
+        return np.zeros(batch)
+
+    # Sem camadas absorventes nas bordas: o domínio é periódico
+    has_absorber = False
+
+    def new_absorbed(self, psi: np.ndarray = None):
+        return None
+
+    @property
+    def regions(self) -> "AxisRegions":
+        """Fatias de x à esquerda, sobre e à direita dos obstáculos."""
+        regions = self._regions
+        if regions is None or regions.version != self._version:
+            regions = AxisRegions(self)
+            self._regions = regions
+        return regions
+
+    # -----------------------------------------------------
+    # Propagadores
+    # -----------------------------------------------------
+    def _invalidate(self):
+        self._version += 1
+        self._propagators_cache = None
+
+    def _propagators(self, dt: float = None) -> "_CartesianPropagators":
+        dt = self._dt if dt is None else float(dt)
+        prop = self._propagators_cache
+        if prop is None or prop.version != self._version or prop.dt != dt:
+            prop = _CartesianPropagators(self, dt)
+            self._propagators_cache = prop
+        return prop
+
+    # -----------------------------------------------------
+    # Evolução
+    # -----------------------------------------------------
+    def evolve_n(self, psi: np.ndarray, n_steps: int, out: np.ndarray = None,
+                 captured: np.ndarray = None, dt: float = None) -> np.ndarray:
+        """
+        n_steps passos de Strang fundidos. psi tem forma N ou (B, *N)
+        (lote nos eixos da frente). out pode ser o próprio psi (in-place);
+        captured (de new_captured) recebe o que os coletores removeram.
+        """
+        prop = self._propagators(dt)
+        if out is None:
+            out = np.array(psi, dtype=self.dtype)
+        elif out is not psi:
+            np.copyto(out, psi)
+        if n_steps <= 0:
+            return out
+
+        axes = self._spatial
+        track = captured is not None and prop.loss_half is not None
+
+        def capture(a, loss):
+            captured[...] += np.sum(np.abs(a) ** 2 * loss, axis=axes) * self.grid.cell
+
+        fft = self.fft_backend
+        buf = out
+        if track:
+            capture(buf, prop.loss_half)
+        buf *= prop.half
+        for i in range(n_steps):
+            buf = fft.fftn(buf, axes, overwrite_x=True)
+            for factor in prop.kinetic:
+                buf *= factor
+            buf = fft.ifftn(buf, axes, overwrite_x=True)
+            last = i == n_steps - 1
+            if track:
+                capture(buf, prop.loss_half if last else prop.loss_full)
+            buf *= prop.half if last else prop.full
+
+        if buf is not out:
+            np.copyto(out, buf)
+        return out
+
+    def evolve_step(self, psi: np.ndarray) -> np.ndarray:
+        return self.evolve_n(psi, 1)
+
+    # -----------------------------------------------------
+    # Medidas
+    # -----------------------------------------------------
+    def density(self, psi: np.ndarray) -> np.ndarray:
+        """|ψ|² na precisão real de dtype."""
+        prob = np.abs(psi)
+        np.square(prob, out=prob)
+        return prob
+
+    def norm(self, psi: np.ndarray):
+        """∫|ψ|² dV (por linha, em lotes)."""
+        return np.sum(self.density(psi), axis=self._spatial, dtype=float) * self.grid.cell
+
+    def normalize(self, psi: np.ndarray) -> np.ndarray:
+        norm = np.asarray(self.norm(psi))
+        norm = np.where(norm > 0, norm, 1.0)
+        psi /= np.sqrt(norm).astype(psi.real.dtype).reshape(norm.shape + (1,) * self.ndim)
+        return psi
+
+    def region_probability(self, psi: np.ndarray, region: slice):
+        """∫|ψ|² dV sobre uma fatia de x (todos os outros eixos)."""
+        index = (Ellipsis, region) + (slice(None),) * (self.ndim - 1)
+        return np.sum(self.density(psi[index]), axis=self._spatial, dtype=float) * self.grid.cell
+
+    def calculate_transmission(self, psi: np.ndarray, absorbed=None):
+        """(T, R) em %, como Simulation.calculate_transmission, ao longo de x."""
+        regions = self.regions
+        T = self.region_probability(psi, regions.right)
+        R = self.region_probability(psi, regions.left)
+        return T * 100.0, R * 100.0
+
+
+class AxisRegions:
+    """
+    left | interaction | right ao longo de x, onde interaction vai do
+    início ao fim dos obstáculos (V > 0 em qualquer y/z). Mesmos nomes
+    de Regions, para quem só colore ou mede por x.
+    """
+
+    __slots__ = ("version", "left", "interaction", "right")
+
+    def __init__(self, sim: CartesianSimulation):
+        self.version = sim._version
+        n = sim.N[0]
+        support = np.flatnonzero((sim.V > 0).any(axis=tuple(range(1, sim.ndim))))
+        if support.size:
+            self.left = slice(0, int(support[0]))
+            self.interaction = slice(int(support[0]), int(support[-1]) + 1)
+            self.right = slice(int(support[-1]) + 1, n)
+        else:
+            self.left = slice(0, n)
+            self.interaction = self.right = slice(n, n)
+
+
+class _CartesianPropagators:
+    """
+    Fases de uma versão da CartesianSimulation e um dt: half/full de V
+    (com parede rígida e coletores), do tamanho da malha, e a cinética
+    e^{-i|k|²dt/2} = Π_i e^{-ik_i²dt/2} como fatores 1D que se expandem
+    por broadcasting.
+    """
+
+    __slots__ = ("version", "dt", "kinetic", "half", "full", "loss_half", "loss_full")
+
+    def __init__(self, sim: CartesianSimulation, dt: float):
+        self.version = sim._version
+        self.dt = dt
+        ndim = sim.ndim
+        dtype = sim.dtype
+
+        self.kinetic = []
+        for axis, k in enumerate(sim.grid.k):
+            shape = [1] * ndim
+            shape[axis] = -1
+            self.kinetic.append(np.exp(-1j * (k ** 2 / 2) * dt).astype(dtype).reshape(shape))
+
+        half = np.exp(-1j * (dt / 2) * sim.V.astype(dtype))
+        half[sim.V >= eng.V_INFINITY] = 0.0
+
+        # Coletor: fator real exp(-W dt/2); loss_* = fração de |ψ|² removida
+        self.loss_half = self.loss_full = None
+        if sim.has_sink:
+            damping = np.exp(-(dt / 2) * sim._W)
+            half *= damping
+            self.loss_half = 1.0 - damping ** 2
+            self.loss_full = 1.0 - damping ** 4
+
+        self.half = half
+        self.full = half * half
+        for arr in self.kinetic + [self.half, self.full, self.loss_half, self.loss_full]:
+            if arr is not None:
+                arr.flags.writeable = False
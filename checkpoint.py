@@ -0,0 +1,165 @@
+"""
+=========================================================
+CHECKPOINTS (SALVAR / RETOMAR O ESTADO)
+---------------------------------------------------------
+Um checkpoint é um único .npz comprimido com tudo o que a
+evolução precisa para continuar exatamente de onde parou:
+
+    psi, tempo                 estado (complex128, sem perda)
+    V + descritor              potencial e o que o gerou (ex.: RunSpec)
+    dt, integrador, tol, FFT   chaves dos caches de propagadores
+    CAP, coletor, pacote       configuração da Simulation
+    absorbed                   probabilidade já absorvida pelo CAP
+    bio                        captured_energy e time da fotossíntese
+    arrays / state             extras do chamador (séries, detectores)
+
+O cabeçalho é JSON com formato e versão; load_checkpoint recusa
+arquivos de versão mais nova. A gravação é atômica (arquivo
+temporário + os.replace), então uma queda no meio da escrita
+deixa o checkpoint anterior intacto.
+
+Os propagadores não vão para o disco: são refeitos sob demanda
+a partir das chaves, o que custa uma FFT de k² e algumas exp,
+muito menos que reevoluir.
+=========================================================
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import Schrödinger_engine as eng
+
+FORMAT = "schrodinger-checkpoint"
+VERSION = 1
+
+
+@dataclass
+class Checkpoint:
+    header: dict
+    psi: np.ndarray
+    V: np.ndarray
+    absorbed: np.ndarray = None
+    arrays: dict = field(default_factory=dict)
+
+    @property
+    def time(self) -> float:
+        return self.header["time"]
+
+    @property
+    def mode(self) -> str:
+        return self.header["mode"]
+
+    @property
+    def descriptor(self) -> dict:
+        return self.header["descriptor"]
+
+    @property
+    def state(self) -> dict:
+        return self.header["state"]
+
+    def restore(self, sim: eng.Simulation, bio=None) -> np.ndarray:
+        """
+        Aplica o checkpoint a sim (e a bio, um QuantumPhotosynthesis sobre
+        sim) e devolve uma cópia de psi. A malha precisa ser a mesma; o
+        resto (dt, integrador, potencial, CAP, coletor) é restaurado, e V
+        só é reescrito se mudou, para não invalidar caches à toa.
+        """
+        h = self.header
+        grid = h["grid"]
+        if (sim.N, sim.L, sim.grid.is_mapped) != (grid["N"], grid["L"], grid["mapped"]):
+            raise ValueError(f"checkpoint de outra malha (N={grid['N']}, L={grid['L']}, "
+                             f"mapped={grid['mapped']})")
+
+        keys = h["propagators"]
+        if sim.dt != keys["dt"]:
+            sim.dt = keys["dt"]
+        sim.integrator = keys["integrator"]
+        sim.propagator_tol = keys["propagator_tol"]
+        if sim.fft_backend.name != keys["fft_backend"]:
+            sim.fft_backend = keys["fft_backend"]
+
+        if sim.V.shape != self.V.shape or not np.array_equal(sim.V, self.V):
+            sim.set_potential(self.V)
+        absorber = h["absorber"]
+        if (sim.absorber_width, sim.absorber_strength) != (absorber["width"], absorber["strength"]):
+            sim.set_absorber(absorber["width"], absorber["strength"])
+        sink = h["sink"]
+        if sink is None:
+            if sim.sink is not None:
+                sim.set_sink()
+        elif sim.sink is None or list(sim.sink) != sink:
+            sim.set_sink(0.5 * (sink[0] + sink[1]), sink[1] - sink[0])
+        for name, value in h["packet"].items():
+            setattr(sim, name, value)
+
+        psi = self.psi.copy()
+        sim.time = self.time
+        if bio is not None:
+            if "bio" not in h:
+                raise ValueError("checkpoint sem o estado da fotossíntese")
+            state = h["bio"]
+            bio.sink_strength = state["sink_strength"]
+            bio.captured_energy = state["captured_energy"]
+            bio.time = state["time"]
+            bio.psi = psi
+        return psi
+
+
+def save_checkpoint(path: str, sim: eng.Simulation, psi: np.ndarray, mode: str = "1D",
+                    absorbed: np.ndarray = None, bio=None, descriptor: dict = None,
+                    arrays: dict = None, state: dict = None):
+    """
+    Grava o estado de sim + psi em path (.npz).
+
+    descriptor: o que gerou o potencial (ex.: asdict(RunSpec)); V é salvo
+    de qualquer forma, comprimido (potenciais constantes por partes viram
+    poucos bytes). arrays/state: arrays e valores JSON do chamador, que
+    voltam em Checkpoint.arrays / Checkpoint.state.
+    """
+    header = {
+        "format": FORMAT, "version": VERSION,
+        "time": float(sim.time), "mode": mode,
+        "grid": {"N": sim.N, "L": sim.L, "mapped": sim.grid.is_mapped},
+        "propagators": {
+            "dt": sim.dt, "integrator": sim.integrator,
+            "propagator_tol": sim.propagator_tol, "fft_backend": sim.fft_backend.name,
+        },
+        "absorber": {"width": sim.absorber_width, "strength": sim.absorber_strength},
+        "sink": list(sim.sink) if sim.sink is not None else None,
+        "packet": {name: float(getattr(sim, name))
+                   for name in ("x0", "sigma", "k0", "barreira_center", "barreira_width")},
+        "descriptor": descriptor or {},
+        "state": state or {},
+    }
+    if bio is not None:
+        header["bio"] = {"captured_energy": float(bio.captured_energy), "time": float(bio.time),
+                         "sink_strength": float(bio.sink_strength)}
+
+    data = {"header": np.array(json.dumps(header)),
+            "psi": np.asarray(psi, dtype=complex), "V": np.asarray(sim.V)}
+    if absorbed is not None:
+        data["absorbed"] = absorbed
+    for name, value in (arrays or {}).items():
+        data["arr_" + name] = value
+
+    # np.savez acrescenta .npz a nomes sem extensão; o temporário já a tem
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **data)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """Lê um checkpoint de save_checkpoint (sem aplicá-lo; ver Checkpoint.restore)."""
+    with np.load(path) as data:
+        header = json.loads(str(data["header"]))
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path} não é um checkpoint ({FORMAT})")
+        if header["version"] > VERSION:
+            raise ValueError(f"versão {header['version']} do checkpoint é mais nova que a suportada ({VERSION})")
+        arrays = {name[4:]: data[name] for name in data.files if name.startswith("arr_")}
+        return Checkpoint(header=header, psi=data["psi"], V=data["V"],
+                          absorbed=data["absorbed"] if "absorbed" in data.files else None,
+                          arrays=arrays)
@@ -0,0 +1,244 @@
+"""
+=========================================================
+TRANSPORTE ASSISTIDO PELO AMBIENTE (DEPHASING)
+---------------------------------------------------------
+Eficiência de coleta da fotossíntese sob dephasing, pela
+média de trajetórias estocásticas: cada trajetória é uma
+linha de um PhotosynthesisEnsemble com um potencial de
+ruído clássico (ver quantum_photosynthesis), e a média de
+muitas reproduz a dinâmica de Lindblad sem guardar a
+matriz densidade (N² em vez de N).
+
+As trajetórias rodam em lotes (B, N), uma FFT por passo
+para o lote inteiro, e os lotes em paralelo num
+ProcessPoolExecutor. Média e variância da eficiência são
+acumuladas à medida que os lotes chegam (Welford/Chan), e
+a execução para quando o intervalo de confiança de 95%
+fica mais estreito que a tolerância.
+
+Uso:
+    python -m dephasing --mode BIO_QUANTUM --dephasing 0 0.05 0.2 1 \\
+        --correlation-length 2 --ci 0.5 --out enaqt.npz
+=========================================================
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict
+
+import numpy as np
+
+import batch_runner
+import quantum_photosynthesis as bio_eng
+
+# Quantil normal do intervalo de confiança de 95%
+Z_95 = 1.959963984540054
+
+
+# =========================================================
+# ESTATÍSTICA
+# =========================================================
+class RunningStats:
+    """
+    Média e variância acumuladas lote a lote (algoritmo de Chan para
+    juntar dois conjuntos; com lotes de 1 é o de Welford). Estável
+    mesmo com muitas trajetórias e eficiências quase iguais.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        n = values.size
+        if n == 0:
+            return
+        mean = values.mean()
+        m2 = np.sum((values - mean) ** 2)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Variância amostral (n - 1)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def half_width(self) -> float:
+        """Meia-largura do intervalo de confiança de 95% da média."""
+        return Z_95 * np.sqrt(self.variance / self.count) if self.count > 1 else np.inf
+
+
+# =========================================================
+# TRAJETÓRIAS
+# =========================================================
+def run_trajectories(spec: batch_runner.RunSpec, size: int, dephasing: float,
+                     correlation_length: float = 0.0, seed=None) -> np.ndarray:
+    """
+    size trajetórias do spec (modo BIO_QUANTUM) com dephasing γ; devolve
+    a eficiência final de cada uma, em %. Todas partem do mesmo pacote
+    e só diferem no ruído.
+    """
+    sim = batch_runner.build_simulation(spec)
+    # Pacote sem renormalizar, como QuantumPhotosynthesis em run()
+    psi0 = sim.make_packets(k0=np.sqrt(2 * spec.energy), sigma=spec.sigma,
+                            x0=batch_runner.packet_x0(spec, sim))
+    ensemble = bio_eng.PhotosynthesisEnsemble(
+        sim, sink_width=spec.sink_width, sink_strength=spec.sink_strength,
+        psi=np.broadcast_to(psi0, (size, sim.N)),
+        dephasing=dephasing, dephasing_length=correlation_length,
+        rng=np.random.default_rng(seed),
+    )
+    ensemble.evolve(spec.steps)
+    return ensemble.get_efficiency_percent()
+
+
+def _run_batch(spec_dict, size, dephasing, correlation_length, seed):
+    """Worker: um lote de trajetórias (argumentos serializáveis)."""
+    spec = batch_runner.RunSpec.from_dict(spec_dict)
+    return run_trajectories(spec, size, dephasing, correlation_length, seed)
+
+
+def dephased_efficiency(spec: batch_runner.RunSpec, dephasing: float,
+                        correlation_length: float = 0.0, ci: float = 0.5,
+                        batch: int = 32, min_trajectories: int = 64,
+                        max_trajectories: int = 4096, workers: int = None,
+                        seed=None, progress=None) -> dict:
+    """
+    Eficiência média sob dephasing γ, em %, com intervalo de confiança.
+
+    Roda lotes de batch trajetórias até a meia-largura do IC de 95% ficar
+    abaixo de ci (pontos percentuais), com pelo menos min_trajectories e
+    no máximo max_trajectories. workers > 1 roda os lotes em processos;
+    os que já estavam em andamento na parada entram na média. γ = 0 é
+    determinístico e roda uma trajetória só.
+
+    Cada lote tem a sua semente (SeedSequence(seed).spawn), então com
+    workers <= 1 o resultado é reprodutível.
+    """
+    if spec.mode != "BIO_QUANTUM":
+        raise ValueError("o dephasing só existe no modo BIO_QUANTUM")
+    if spec.solver != "tdse" or spec.integrator in bio_eng.eng.GLOBAL_PROPAGATORS:
+        raise ValueError("o dephasing exige o solver tdse com um integrador split-step")
+    if dephasing < 0 or correlation_length < 0:
+        raise ValueError("dephasing e correlation_length devem ser >= 0")
+
+    stats = RunningStats()
+    if dephasing == 0:
+        stats.add(run_trajectories(spec, 1, 0.0))
+        return _summary(stats, dephasing, correlation_length, converged=True)
+
+    seeds = iter(np.random.SeedSequence(seed).spawn(-(-max_trajectories // batch)))
+    sizes = iter([min(batch, max_trajectories - start)
+                  for start in range(0, max_trajectories, batch)])
+
+    def done():
+        return stats.count >= max_trajectories or (
+            stats.count >= min_trajectories and stats.half_width < ci)
+
+    def record(values):
+        stats.add(values)
+        if progress is not None:
+            progress(stats)
+
+    if workers is None or workers <= 1:
+        for size, child in zip(sizes, seeds):
+            record(run_trajectories(spec, size, dephasing, correlation_length, child))
+            if done():
+                break
+    else:
+        spec_dict = asdict(spec)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def submit():
+                size = next(sizes, None)
+                if size is None:
+                    return None
+                return pool.submit(_run_batch, spec_dict, size, dephasing,
+                                   correlation_length, next(seeds))
+
+            running = {f for f in (submit() for _ in range(workers)) if f is not None}
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result())
+                if done():
+                    for future in running:
+                        future.cancel()
+                    running = {f for f in running if not f.cancelled()}
+                    for future in running:
+                        record(future.result())
+                    break
+                running |= {f for f in (submit() for _ in finished) if f is not None}
+
+    return _summary(stats, dephasing, correlation_length,
+                    converged=stats.count >= min_trajectories and stats.half_width < ci)
+
+
+def _summary(stats: RunningStats, dephasing, correlation_length, converged) -> dict:
+    return {
+        "dephasing": dephasing, "correlation_length": correlation_length,
+        "efficiency": stats.mean, "std": np.sqrt(stats.variance) if stats.count > 1 else 0.0,
+        "ci": stats.half_width if stats.count > 1 else 0.0,
+        "trajectories": stats.count, "converged": converged,
+    }
+
+
+# =========================================================
+# CLI
+# =========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m dephasing",
+        description="Eficiência da fotossíntese sob dephasing, por média de trajetórias.",
+    )
+    batch_runner.add_spec_arguments(parser)
+    parser.add_argument("--dephasing", type=float, nargs="+", default=[0.0, 0.05, 0.2, 1.0],
+                        help="taxas de dephasing γ a varrer")
+    parser.add_argument("--correlation-length", type=float, default=0.0,
+                        help="comprimento de correlação espacial do ruído (0 = por ponto)")
+    parser.add_argument("--ci", type=float, default=0.5,
+                        help="meia-largura do IC de 95%% para parar, em pontos percentuais")
+    parser.add_argument("--batch", type=int, default=32, help="trajetórias por lote")
+    parser.add_argument("--min-trajectories", type=int, default=64)
+    parser.add_argument("--max-trajectories", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="arquivo .npz de saída")
+    args = parser.parse_args(argv)
+
+    spec = batch_runner.spec_from_args(args)
+    if spec.mode != "BIO_QUANTUM":
+        parser.error("o dephasing só existe no modo BIO_QUANTUM (use --mode BIO_QUANTUM)")
+
+    def progress(stats):
+        print(f"\r  {stats.count} trajetórias, {stats.mean:.3f} ± {stats.half_width:.3f} %",
+              end="", flush=True)
+
+    results = []
+    for gamma in args.dephasing:
+        t0 = time.perf_counter()
+        out = dephased_efficiency(spec, gamma, args.correlation_length, ci=args.ci,
+                                  batch=args.batch, min_trajectories=args.min_trajectories,
+                                  max_trajectories=args.max_trajectories,
+                                  workers=args.workers, seed=args.seed, progress=progress)
+        flag = "" if out["converged"] else "  (IC acima da tolerância)"
+        print(f"\rγ = {gamma:<8g} eficiência {out['efficiency']:7.3f} ± {out['ci']:.3f} %"
+              f"  ({out['trajectories']} trajetórias, {time.perf_counter() - t0:.1f} s){flag}")
+        results.append(out)
+
+    if args.out:
+        columns = {name: np.array([r[name] for r in results])
+                   for name in ("dephasing", "efficiency", "std", "ci", "trajectories", "converged")}
+        np.savez_compressed(args.out, spec=np.array(spec.to_json()),
+                            correlation_length=args.correlation_length, **columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+=========================================================
+FFT BACKENDS
+---------------------------------------------------------
+Transformadas usadas pelo motor split-step. fft/ifft atuam no
+último eixo, então lotes (B, N) passam numa única chamada;
+fftn/ifftn atuam nos eixos pedidos (malhas 2D/3D do
+cartesian_engine, com eixos de lote à frente).
+
+  numpy   -> numpy.fft (padrão e fallback, sempre disponível)
+  scipy   -> scipy.fft com workers= (multithread) e overwrite_x
+  pyfftw  -> planos FFTW pré-calculados, buffers alinhados in-place
+
+A escolha é feita por nome em get_backend() ou pela variável de
+ambiente SCHRODINGER_FFT_BACKEND.
+=========================================================
+"""
+
+import os
+import threading
+import warnings
+
+import numpy as np
+
+ENV_VAR = "SCHRODINGER_FFT_BACKEND"
+DEFAULT_BACKEND = "numpy"
+
+
+# =========================================================
+# BACKENDS
+# =========================================================
+class NumpyBackend:
+    """
+    numpy.fft: monothread, sempre aloca a saída.
+    """
+
+    name = "numpy"
+
+    def fft(self, a: np.ndarray, overwrite_x: bool = False) -> np.ndarray:
+        return np.fft.fft(a, axis=-1)
+
+    def ifft(self, a: np.ndarray, overwrite_x: bool = False) -> np.ndarray:
+        return np.fft.ifft(a, axis=-1)
+
+    def fftn(self, a: np.ndarray, axes, overwrite_x: bool = False) -> np.ndarray:
+        return np.fft.fftn(a, axes=axes)
+
+    def ifftn(self, a: np.ndarray, axes, overwrite_x: bool = False) -> np.ndarray:
+        return np.fft.ifftn(a, axes=axes)
+
+
+class ScipyBackend:
+    """
+    scipy.fft com paralelismo por workers (-1 = todos os núcleos).
+    Com overwrite_x=True o scipy pode reaproveitar o buffer de entrada.
+    """
+
+    name = "scipy"
+
+    def __init__(self, workers: int = -1):
+        import scipy.fft
+        self._sp = scipy.fft
+        self.workers = workers
+
+    def fft(self, a: np.ndarray, overwrite_x: bool = False) -> np.ndarray:
+        return self._sp.fft(a, axis=-1, overwrite_x=overwrite_x, workers=self.workers)
+
+    def ifft(self, a: np.ndarray, overwrite_x: bool = False) -> np.ndarray:
+        return self._sp.ifft(a, axis=-1, overwrite_x=overwrite_x, workers=self.workers)
+
+    def fftn(self, a: np.ndarray, axes, overwrite_x: bool = False) -> np.ndarray:
+        return self._sp.fftn(a, axes=axes, overwrite_x=overwrite_x, workers=self.workers)
+
+    def ifftn(self, a: np.ndarray, axes, overwrite_x: bool = False) -> np.ndarray:
+        return self._sp.ifftn(a, axes=axes, overwrite_x=overwrite_x, workers=self.workers)
+
+
+class PyFFTWBackend:
+    """
+    pyFFTW com um plano por (forma, dtype, eixos), criado na primeira chamada.
+
+    As transformadas rodam in-place num buffer alinhado do plano. Com
+    overwrite_x=True esse buffer é devolvido diretamente e só é válido até
+    a próxima chamada do mesmo backend na mesma thread; com False a saída
+    é copiada. Os planos são por thread, então o backend pode ser
+    compartilhado entre simulações rodando em threads diferentes.
+    """
+
+    name = "pyfftw"
+
+    def __init__(self, threads: int = None, planner_effort: str = "FFTW_MEASURE"):
+        import pyfftw
+        self._pyfftw = pyfftw
+        self.threads = threads if threads is not None else (os.cpu_count() or 1)
+        self.planner_effort = planner_effort
+        self._local = threading.local()
+
+    def _plan(self, shape, dtype, axes=(-1,)):
+        plans = getattr(self._local, "plans", None)
+        if plans is None:
+            plans = self._local.plans = {}
+
+        key = (shape, np.dtype(dtype), axes)
+        plan = plans.get(key)
+        if plan is None:
+            buf = self._pyfftw.empty_aligned(shape, dtype=dtype)
+            flags = (self.planner_effort, "FFTW_DESTROY_INPUT")
+            forward = self._pyfftw.FFTW(buf, buf, axes=axes, direction="FFTW_FORWARD",
+                                        flags=flags, threads=self.threads)
+            backward = self._pyfftw.FFTW(buf, buf, axes=axes, direction="FFTW_BACKWARD",
+                                         flags=flags, threads=self.threads)
+            plan = plans[key] = (buf, forward, backward)
+        return plan
+
+    def _execute(self, a, overwrite_x, which, axes=(-1,)):
+        a = np.asarray(a)
+        dtype = a.dtype if np.iscomplexobj(a) else np.complex128
+        plan = self._plan(a.shape, dtype, tuple(axes))
+        buf = plan[0]
+        if a is not buf:
+            buf[...] = a
+        plan[which]()
+        return buf if overwrite_x else buf.copy()
+
+    def fft(self, a: np.ndarray, overwrite_x: bool = False) -> np.ndarray:
+        return self._execute(a, overwrite_x, 1)
+
+    def ifft(self, a: np.ndarray, overwrite_x: bool = False) -> np.ndarray:
+        return self._execute(a, overwrite_x, 2)
+
+    def fftn(self, a: np.ndarray, axes, overwrite_x: bool = False) -> np.ndarray:
+        return self._execute(a, overwrite_x, 1, axes)
+
+    def ifftn(self, a: np.ndarray, axes, overwrite_x: bool = False) -> np.ndarray:
+        return self._execute(a, overwrite_x, 2, axes)
+
+
+# =========================================================
+# REGISTRO
+# =========================================================
+_REGISTRY = {
+    "numpy": NumpyBackend,
+    "scipy": ScipyBackend,
+    "pyfftw": PyFFTWBackend,
+}
+
+
+def register_backend(name: str, factory):
+    """Registra um backend extra (objeto com fft/ifft e, para 2D/3D, fftn/ifftn)."""
+    _REGISTRY[name] = factory
+
+
+def available_backends():
+    """Nomes dos backends cujas dependências estão instaladas."""
+    names = []
+    for name, factory in _REGISTRY.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_backend(name: str = None, **options):
+    """
+    Instancia um backend pelo nome (ou pela variável de ambiente).
+    Se a dependência opcional não estiver instalada, avisa e cai no numpy.
+    """
+    if name is None:
+        name = os.environ.get(ENV_VAR, DEFAULT_BACKEND)
+
+    try:
+        factory = _REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"Backend FFT desconhecido: {name!r} (opções: {', '.join(_REGISTRY)})"
+        ) from None
+
+    try:
+        return factory(**options)
+    except ImportError as exc:
+        warnings.warn(f"Backend FFT {name!r} indisponível ({exc}); usando numpy.")
+        return NumpyBackend()
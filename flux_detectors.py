@@ -0,0 +1,183 @@
+"""
+=========================================================
+FLUX DETECTORS
+---------------------------------------------------------
+Corrente de probabilidade j(x, t) = Im(ψ* ∂ψ/∂x) (ħ = m = 1)
+medida em pontos fixos da malha e integrada no tempo a cada
+passo do split-step.
+
+Com um detector antes e outro depois das barreiras:
+    T = ∫ j(x_dir) dt
+    R = P_esq(0) - ∫ j(x_esq) dt
+e a probabilidade que ainda resta entre os dois mede quanto
+falta para o espalhamento terminar (critério de parada).
+
+O critério de parada usa essa probabilidade residual, que é exata.
+Já j local é sensível às componentes de k alto que o split-step cria
+em barreiras abruptas: com dt = 0.05 o T por fluxo pode errar ~3%;
+com dt <= 0.02 concorda com o T por densidade em ~0.1%.
+=========================================================
+"""
+
+import numpy as np
+
+import Schrödinger_engine as eng
+
+# Distância padrão entre os detectores e a região de interação
+DEFAULT_MARGIN = 5.0
+
+# Derivada central de 6ª ordem (pontos i-3 ... i+3). A diferença de 3
+# pontos subestima j em ~(k dx)²/6, mais de 1% já para k0 = 3.
+_STENCIL = np.array([-1 / 60, 3 / 20, -3 / 4, 0.0, 3 / 4, -3 / 20, 1 / 60])
+_OFFSETS = np.arange(-3, 4)
+
+
+class FluxDetector:
+    """
+    Integra j(x, t) nos pontos da malha mais próximos de positions.
+
+    A derivada é uma diferença central de 6ª ordem, então cada detector
+    lê sete pontos de psi por passo (via evolve_n(probe_index=...)); a
+    integral no tempo é feita pela regra do trapézio.
+    """
+
+    def __init__(self, sim: eng.Simulation, positions, batch_shape=()):
+        x = sim.x
+        index = np.searchsorted(x, np.atleast_1d(positions).astype(float))
+        index = np.clip(index, 3, sim.N - 4)
+
+        self.index = index
+        self.positions = x[index]
+        self.probe_index = (index[:, np.newaxis] + _OFFSETS).ravel()
+
+        # Posição de psi(x_d) dentro de cada amostra de probe_index
+        self.center_index = np.arange(index.size) * _OFFSETS.size + 3
+
+        # Numa MappedGrid o estêncil deriva em ξ: d/dx = J⁻¹ d/dξ
+        self.dx = sim.dx
+        if sim.grid.is_mapped:
+            self.dx = sim.dx * sim.grid.jacobian[index]
+        self.dt = sim.dt
+
+        shape = tuple(batch_shape) + (index.size,)
+        self.fluence = np.zeros(shape)  # ∫ j dt até agora
+        self.current = np.zeros(shape)  # j no último passo
+
+    def new_samples(self, n_steps: int, batch_shape=()) -> np.ndarray:
+        """Buffer probe_out para n_steps passos."""
+        return np.empty((n_steps,) + tuple(batch_shape) + (self.probe_index.size,), dtype=complex)
+
+    def current_of(self, psi_points: np.ndarray) -> np.ndarray:
+        """j a partir de (..., 7P) valores de psi nos pontos i-3 ... i+3."""
+        points = psi_points.reshape(psi_points.shape[:-1] + (self.index.size, _OFFSETS.size))
+        dpsi = points @ _STENCIL / self.dx
+        return np.imag(np.conj(points[..., 3]) * dpsi)
+
+    def reset(self, psi: np.ndarray):
+        """Zera a integral; j inicial vem de psi."""
+        self.current = self.current_of(psi[..., self.probe_index])
+        self.fluence = np.zeros_like(self.current)
+
+    def update(self, samples: np.ndarray):
+        """Acumula os passos gravados em samples (n_steps, ..., 7P)."""
+        if len(samples) == 0:
+            return
+        j = self.current_of(samples)
+        self.fluence += self.dt * (0.5 * (self.current + j[-1]) + j[:-1].sum(axis=0))
+        self.current = j[-1]
+
+
+class ScatteringMonitor:
+    """
+    Par de detectores de fluxo em volta da região de interação, com
+    critério de convergência: o espalhamento acabou quando a
+    probabilidade entre os detectores, depois de ter passado de tol,
+    volta a ficar abaixo de tol.
+
+    Use advance() no lugar de sim.evolve_n; T, R, residual e converged
+    são por linha num lote (B, N). Com record=True guarda também a série
+    temporal psi(x_d, t) nos dois detectores (ver signal).
+    """
+
+    def __init__(self, sim: eng.Simulation, psi: np.ndarray, tol: float = 1e-3,
+                 left: float = None, right: float = None, margin: float = DEFAULT_MARGIN,
+                 record: bool = False):
+        self.sim = sim
+        self.tol = tol
+
+        x = sim.x
+        regions = sim.regions
+        if left is None:
+            left = x[regions.interaction.start] - margin
+        if right is None:
+            right = x[max(regions.interaction.stop - 1, 0)] + margin
+
+        self.batch_shape = np.shape(psi)[:-1]
+        self.detector = FluxDetector(sim, (left, right), self.batch_shape)
+        self.detector.reset(psi)
+
+        i_left, i_right = self.detector.index
+        self._between = slice(i_left, i_right)
+        self.incident = sim.region_probability(psi, slice(0, i_left))
+
+        self.residual = sim.region_probability(psi, self._between)
+        self.peak = self.residual.copy() if np.ndim(self.residual) else self.residual
+        self.converged = np.zeros(self.batch_shape, dtype=bool)
+
+        self._signal = None
+        if record:
+            self._signal = [psi[..., self.detector.index][np.newaxis]]
+
+    @property
+    def positions(self):
+        return self.detector.positions
+
+    @property
+    def signal(self) -> np.ndarray:
+        """psi nos detectores (esquerdo, direito) a cada passo: (passos + 1, ..., 2)."""
+        if self._signal is None:
+            raise RuntimeError("ScatteringMonitor criado sem record=True")
+        return np.concatenate(self._signal)
+
+    @property
+    def T(self):
+        """Probabilidade que atravessou o detector da direita."""
+        return self.detector.fluence[..., 1]
+
+    @property
+    def R(self):
+        """Probabilidade que voltou para trás do detector da esquerda."""
+        return self.incident - self.detector.fluence[..., 0]
+
+    def advance(self, psi: np.ndarray, n_steps: int, mode="1D", absorbed=None) -> np.ndarray:
+        """Evolui psi in-place por n_steps passos medindo o fluxo a cada passo."""
+        samples = self.detector.new_samples(n_steps, self.batch_shape)
+        self.sim.evolve_n(psi, n_steps, mode=mode, out=psi, absorbed=absorbed,
+                          probe_index=self.detector.probe_index, probe_out=samples)
+        self.detector.update(samples)
+        if self._signal is not None:
+            self._signal.append(samples[..., self.detector.center_index])
+        self.check(psi)
+        return psi
+
+    def state(self) -> dict:
+        """Acumuladores (arrays) para um checkpoint; volta com restore()."""
+        return {"fluence": self.detector.fluence, "current": self.detector.current,
+                "incident": np.asarray(self.incident), "residual": np.asarray(self.residual),
+                "peak": np.asarray(self.peak), "converged": self.converged}
+
+    def restore(self, state: dict):
+        """Retoma a integração de onde state() parou (mesmos detectores)."""
+        self.detector.fluence = np.array(state["fluence"])
+        self.detector.current = np.array(state["current"])
+        self.incident = state["incident"][()]
+        self.residual = state["residual"][()]
+        self.peak = np.array(state["peak"])[()]
+        self.converged = np.array(state["converged"])
+
+    def check(self, psi: np.ndarray):
+        """Atualiza residual/converged a partir do estado atual."""
+        self.residual = self.sim.region_probability(psi, self._between)
+        self.peak = np.maximum(self.peak, self.residual)
+        self.converged = (self.peak > self.tol) & (self.residual < self.tol)
+        return self.converged
@@ -0,0 +1,271 @@
+"""
+=========================================================
+GLOBAL PROPAGATORS (CHEBYSHEV / KRYLOV)
+---------------------------------------------------------
+Alternativas ao split-step que aproximam exp(-iHt) inteiro,
+sem separar T e V, com erro controlado por uma tolerância:
+
+  chebyshev -> expansão em polinômios de Chebyshev (Tal-Ezer &
+               Kosloff). Só H hermitiano; custo ~ ΔE·t/2
+               aplicações de H, independente de quantos dt.
+  krylov    -> subespaço de Krylov curto (Lanczos/Arnoldi),
+               com sub-passos automáticos. Aceita a parte
+               absorvente -iW (CAP, coletor da fotossíntese).
+
+H ψ = IFFT(k²/2 · FFT ψ) + (V - iW) ψ custa duas FFTs. A parede
+rígida e a origem radial entram como condição de Dirichlet
+(H projetado, ψ = 0 nesses pontos) em vez de V = V_INFINITY, que
+tornaria o espectro de H enorme.
+
+Numa MappedGrid (x = x(ξ), J = dx/dξ) H atua em φ = √J·ψ com a
+cinética simétrica -½ J^-½ ∂ξ J⁻¹ ∂ξ J^-½ (quatro FFTs), que é
+hermitiana na malha uniforme em ξ.
+
+Este módulo não importa o motor: recebe a Simulation pronta.
+=========================================================
+"""
+
+import numpy as np
+
+# Tolerância padrão (norma L2 contínua do erro por passo)
+DEFAULT_TOL = 1e-12
+
+# Dimensão máxima do subespaço de Krylov antes de cortar o passo
+KRYLOV_DIM = 30
+
+
+# =========================================================
+# HAMILTONIANO
+# =========================================================
+class Hamiltonian:
+    """
+    H = T + V - iW da Simulation, no modo '1D' ou '3D_RADIAL'.
+
+    W soma o CAP da simulação (se houver) a um W extra opcional
+    (ex.: o coletor da fotossíntese). V pode ser uma pilha (B, N).
+    Numa MappedGrid, sqrt_jacobian = √J e H atua em φ = √J·ψ.
+    """
+
+    def __init__(self, sim, mode: str = "1D", W: np.ndarray = None, wall_level: float = None):
+        self.fft = sim.fft_backend
+        self.dx = sim.dx  # dξ numa MappedGrid
+        self.kinetic = sim.k ** 2 / 2
+
+        grid = sim.grid
+        self.sqrt_jacobian = None
+        if grid.is_mapped:
+            self.sqrt_jacobian = np.sqrt(grid.jacobian)
+            self._ik = 1j * sim.k
+            self._inv_jacobian = 1.0 / grid.jacobian
+
+        V = np.asarray(sim.V, dtype=float)
+        self.mask = V >= (wall_level if wall_level is not None else np.inf)
+        if mode == "3D_RADIAL":
+            # Mesma origem que o split-step zera em half_radial
+            origin = np.zeros(sim.N, dtype=bool)
+            origin[np.argmin(sim.r) if grid.is_mapped else sim.N // 2] = True
+            origin |= sim.r < 1e-10
+            self.mask = self.mask | origin
+        self.V = np.where(self.mask, 0.0, V)
+
+        absorbing = sim.absorber_profile() if sim.has_absorber else np.zeros(sim.N)
+        if W is not None:
+            absorbing = absorbing + W
+        self.W = absorbing
+        self.hermitian = not np.any(absorbing > 0)
+
+        self.potential = self.V - 1j * self.W
+        self._has_mask = bool(self.mask.any())
+
+        # Limites do espectro (parte real) para a expansão de Chebyshev
+        e_min = min(0.0, float(self.V.min()))
+        kinetic_max = float(self.kinetic.max())
+        if grid.is_mapped:
+            kinetic_max *= float(self._inv_jacobian.max()) ** 2  # ||T|| <= ½ k_max² · max(1/J)²
+        e_max = kinetic_max + float(self.V.max())
+        self.bounds = (e_min, e_max)
+
+        self._chebyshev = {}
+        self.applications = 0  # contador para benchmarks
+
+    def project(self, psi: np.ndarray):
+        """Zera psi na parede/origem (in-place)."""
+        if self._has_mask:
+            psi[..., self.mask] = 0.0
+        return psi
+
+    def apply(self, psi: np.ndarray, row=None) -> np.ndarray:
+        """H psi (array novo). row seleciona a linha de V numa pilha."""
+        self.applications += 1
+        potential = self.potential
+        if row is not None and potential.ndim > 1:
+            potential = potential[row]
+        if self.sqrt_jacobian is None:
+            out = self.fft.fft(psi)
+            out *= self.kinetic
+            # Sem overwrite_x: no pyFFTW o resultado seria o buffer do plano,
+            # reescrito pela próxima FFT (a recorrência guarda H psi)
+            out = self.fft.ifft(out)
+        else:
+            out = self._mapped_kinetic(psi)
+        out += potential * psi
+        return self.project(out)
+
+    def _mapped_kinetic(self, phi: np.ndarray) -> np.ndarray:
+        """-½ J^-½ ∂ξ (J⁻¹ ∂ξ (J^-½ φ)) com derivadas espectrais em ξ."""
+        fft = self.fft
+        d = fft.fft(phi / self.sqrt_jacobian)
+        d *= self._ik
+        d = fft.ifft(d, overwrite_x=True)
+        d *= self._inv_jacobian
+        d = fft.fft(d, overwrite_x=True)
+        d *= self._ik
+        d = fft.ifft(d)  # array próprio, como em apply
+        d *= -0.5 / self.sqrt_jacobian
+        return d
+
+    def chebyshev_coefficients(self, t: float, tol: float) -> np.ndarray:
+        """c_n = (2 - δ_n0)(-i)^n J_n(b t), truncados em |J_n| < tol; em cache por (t, tol)."""
+        key = (t, tol)
+        coeffs = self._chebyshev.get(key)
+        if coeffs is None:
+            e_min, e_max = self.bounds
+            J = bessel_j(0.5 * (e_max - e_min) * t)
+            above = np.flatnonzero(np.abs(J) > tol / 16)
+            J = J[:above[-1] + 2]
+            coeffs = 2.0 * (-1j) ** np.arange(len(J)) * J
+            coeffs[0] = J[0]
+            self._chebyshev[key] = coeffs
+        return coeffs
+
+
+def bessel_j(z: float) -> np.ndarray:
+    """
+    J_0(z) ... J_M(z) até a cauda desprezível (M ~ z + 15 z^(1/3) + 30),
+    por recorrência para trás (Miller) normalizada por J_0 + 2ΣJ_2k = 1.
+    """
+    if z == 0.0:
+        return np.array([1.0, 0.0])
+    n_max = int(z + 15 * z ** (1 / 3) + 30)
+    start = n_max + 20 + int(np.sqrt(40 * n_max))
+
+    J = np.zeros(start + 2)
+    J[start] = 1e-30
+    for n in range(start, 0, -1):
+        J[n - 1] = (2 * n / z) * J[n] - J[n + 1]
+        if abs(J[n - 1]) > 1e250:
+            J[n - 1:] *= 1e-250
+    J /= J[0] + 2.0 * J[2::2].sum()
+    return J[:n_max + 1]
+
+
+# =========================================================
+# PROPAGADORES
+# =========================================================
+def chebyshev(H: Hamiltonian, psi: np.ndarray, t: float, tol: float = DEFAULT_TOL,
+              out: np.ndarray = None) -> np.ndarray:
+    """
+    exp(-iHt) psi pela série de Chebyshev em H normalizado para [-1, 1].
+    Passo único de qualquer tamanho; o custo cresce ~ linearmente com t.
+    """
+    if not H.hermitian:
+        raise ValueError("chebyshev exige H hermitiano; use krylov com CAP ou coletor")
+    e_min, e_max = H.bounds
+    center, half_width = 0.5 * (e_max + e_min), 0.5 * (e_max - e_min)
+    coeffs = H.chebyshev_coefficients(t, tol)
+
+    def normalized(phi):
+        h = H.apply(phi)
+        h -= center * phi
+        h /= half_width
+        return h
+
+    previous = H.project(np.array(psi, dtype=complex))
+    result = coeffs[0] * previous
+    if len(coeffs) > 1:
+        current = normalized(previous)
+        result += coeffs[1] * current
+        for c in coeffs[2:]:
+            nxt = normalized(current)
+            nxt *= 2.0
+            nxt -= previous
+            result += c * nxt
+            previous, current = current, nxt
+
+    result *= np.exp(-1j * center * t)
+    if out is None:
+        return result
+    np.copyto(out, result)
+    return out
+
+
+def krylov(H: Hamiltonian, psi: np.ndarray, t: float, tol: float = DEFAULT_TOL,
+           out: np.ndarray = None, dim: int = KRYLOV_DIM) -> np.ndarray:
+    """
+    exp(-iHt) psi por Lanczos (H hermitiano) ou Arnoldi (com -iW), linha
+    a linha num lote. Cada sub-passo constrói até `dim` vetores e avança o
+    maior tempo cujo erro estimado |h_{m+1,m} [e^{-iH_m τ} e_1]_m|·||ψ||
+    fica abaixo de tol.
+    """
+    if out is None:
+        out = np.array(psi, dtype=complex)
+    elif out is not psi:
+        np.copyto(out, psi)
+    H.project(out)
+
+    # A base não depende de τ: cada sub-passo tenta o tempo restante
+    # inteiro e só encolhe τ (barato) se a estimativa de erro pedir
+    for row in np.ndindex(out.shape[:-1]):
+        v = out[row]
+        remaining = t
+        while remaining > 1e-12 * t:
+            v, tau = _krylov_substep(H, v, remaining, tol, dim, row or None)
+            remaining -= tau
+        out[row] = v
+    return out
+
+
+def _krylov_substep(H, v, tau, tol, dim, row):
+    """Um sub-passo de Krylov; devolve (v avançado, τ usado)."""
+    beta = np.sqrt(np.vdot(v, v).real)
+    if beta == 0.0:
+        return v, tau
+    scale = beta * np.sqrt(H.dx)  # ||v|| na norma contínua
+    N = v.shape[-1]
+    basis = np.empty((dim + 1, N), dtype=complex)
+    h = np.zeros((dim + 1, dim), dtype=complex)
+    basis[0] = v / beta
+
+    m = dim
+    for j in range(dim):
+        w = H.apply(basis[j], row)
+        # Gram-Schmidt modificado completo: no caso hermitiano é Lanczos
+        # com reortogonalização (h sai tridiagonal a menos de arredondamento)
+        for i in range(j + 1):
+            h[i, j] = np.vdot(basis[i], w)
+            w -= h[i, j] * basis[i]
+        h[j + 1, j] = np.sqrt(np.vdot(w, w).real)
+        if h[j + 1, j].real < 1e-12:
+            m = j + 1  # subespaço invariante: exp exata
+            break
+        basis[j + 1] = w / h[j + 1, j]
+
+    small = h[:m, :m]
+    if H.hermitian:
+        small = 0.5 * (small + small.conj().T)
+        eigval, eigvec = np.linalg.eigh(small)
+        inverse = eigvec.conj().T
+    else:
+        eigval, eigvec = np.linalg.eig(small)
+        inverse = np.linalg.inv(eigvec)
+    e1 = inverse[:, 0]
+
+    def coefficients(step):
+        return eigvec @ (np.exp(-1j * eigval * step) * e1)
+
+    residual = h[m, m - 1].real
+    c = coefficients(tau)
+    while residual * abs(c[-1]) * scale > tol and tau > 1e-12:
+        tau *= 0.5
+        c = coefficients(tau)
+    return beta * (c @ basis[:m]), tau
@@ -1,4 +1,5 @@
 import sys
+import time
 import numpy as np
 
 # =========================================================
@@ -11,7 +12,7 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget,
     QHBoxLayout, QVBoxLayout, QLabel,
     QPushButton, QSlider, QGroupBox, QStackedWidget,
-    QDoubleSpinBox, QFormLayout
+    QDoubleSpinBox, QFormLayout, QFileDialog
 )
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont, QPalette, QColor
@@ -22,26 +23,40 @@ from pyqtgraph.Qt import QtCore
 
 # --- IMPORTAÇÕES DO PROJETO ---
 import Schrödinger_engine as eng
+import cartesian_engine as cart_eng
+import radial_engine as rad_eng
 import quantum_photosynthesis as bio_eng
+import stationary
+import trajectory
+import batch_runner
 from widgets import ExplainerPanel
+from simulation_worker import SimulationWorker, BASE_STEPS_PER_SECOND
 
 
 class QuantumApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, replay: str = None):
         super().__init__()
         self.setWindowTitle("YANKCO Simulator (siliconera.ca)")
         self.resize(1600, 950)
 
         # --- MOTORES ---
-        self.psi_phys = eng.psi0.copy()
+        self.sim = eng.Simulation()
         self.bio_model = None
+        # Motor 2D do modo 3D_SURFACE, criado na primeira entrada no modo
+        self.surface_sim = None
+        # Motor radial (r ∈ [0, R]) do modo 3D_RADIAL, idem
+        self.radial_sim = None
 
-        self.time = 0.0
         self.is_paused = False
 
         # Configuração Inicial
         self.V0 = 2.0
-        eng.set_barrier_height(self.V0)
+        self.sim.set_barrier_height(self.V0)
+
+        # A física roda numa thread própria; a GUI só lê o último quadro
+        self.worker = SimulationWorker(self.sim, self.sim.psi0)
+        self.prob = np.zeros(self.sim.N)
+        self._frame_version = -1
 
         # Modos
         self.dimension_mode = "1D"
@@ -50,24 +65,37 @@ class QuantumApp(QMainWindow):
         self.Z_SCALE = 300.0
         self.y_steps = 40
         self.y_width = 30
+        # Largura em y do pacote 2D (modo 3D_SURFACE)
+        self.surface_sigma_y = 4.0
         # Largura do espaço entre as barreiras no modo duplo
         self.gap_width = 15.0
 
+        # Reprodução de uma trajetória gravada (trajectory.py). Enquanto
+        # ativa, self.sim é a simulação da gravação e _live guarda a ao vivo
+        self.player = None
+        self._live = None
+        self._last_tick = time.perf_counter()
+
         self._setup_theme()
         self._setup_ui()
 
-        # Timer
+        # Timer de renderização (~33 FPS), independente da física
         self.timer = QTimer()
-        self.timer.timeout.connect(self._update_simulation)
+        self.timer.timeout.connect(self._render_frame)
         self.timer.start(30)
+        self.worker.start()
 
         # Inicializa visual
+        self._update_regime()
         self._update_barrier_visuals()
         self._update_display()
 
         # Inicializa texto explicativo
         self.explainer.update_mode("1D")
 
+        if replay:
+            self.load_recording(replay)
+
     def _setup_theme(self):
         palette = QPalette()
         palette.setColor(QPalette.ColorRole.Window, QColor(12, 18, 28))
@@ -136,8 +164,9 @@ class QuantumApp(QMainWindow):
 
         c.addWidget(QLabel("Time Speed"))
         self.speed = QSlider(Qt.Orientation.Horizontal)
-        self.speed.setRange(20, 200)
+        self.speed.setRange(20, 2000)
         self.speed.setValue(100)
+        self.speed.valueChanged.connect(self._update_speed)
         c.addWidget(self.speed)
 
         # Botão de Modo
@@ -149,8 +178,32 @@ class QuantumApp(QMainWindow):
         controls.setLayout(c)
         v.addWidget(controls)
 
+        # 3b. Replay de trajetórias gravadas (batch_runner --record)
+        replay = QGroupBox("Replay")
+        r = QVBoxLayout()
+        rbtns = QHBoxLayout()
+        self.btn_open = QPushButton("Open Recording…")
+        self.btn_open.clicked.connect(self._open_recording)
+        self.btn_live = QPushButton("Back to Live")
+        self.btn_live.setEnabled(False)
+        self.btn_live.clicked.connect(self.close_recording)
+        rbtns.addWidget(self.btn_open)
+        rbtns.addWidget(self.btn_live)
+        r.addLayout(rbtns)
+
+        self.scrub = QSlider(Qt.Orientation.Horizontal)
+        self.scrub.setEnabled(False)
+        self.scrub.valueChanged.connect(self._seek)
+        r.addWidget(self.scrub)
+        self.lbl_frame = QLabel("No recording loaded")
+        self.lbl_frame.setStyleSheet("color: #cbd5e1; font-size: 11px;")
+        r.addWidget(self.lbl_frame)
+
+        replay.setLayout(r)
+        v.addWidget(replay)
+
         # 4. PARÂMETROS DETALHADOS
-        params = QGroupBox("System Parameters")
+        params = self.params_box = QGroupBox("System Parameters")
         form = QFormLayout()
         form.setLabelAlignment(Qt.AlignmentFlag.AlignLeft)
 
@@ -172,7 +225,7 @@ class QuantumApp(QMainWindow):
 
         self.spin_width = QDoubleSpinBox()
         self.spin_width.setRange(1.0, 100.0)
-        self.spin_width.setValue(eng.barreira_width)
+        self.spin_width.setValue(self.sim.barreira_width)
         self.spin_width.setSingleStep(0.5)
         self.spin_width.setStyleSheet(spin_style)
         self.spin_width.valueChanged.connect(self._update_width)
@@ -180,7 +233,7 @@ class QuantumApp(QMainWindow):
 
         self.spin_energy = QDoubleSpinBox()
         self.spin_energy.setRange(0.1, 50.0)
-        self.spin_energy.setValue(0.5 * eng.k0 ** 2)
+        self.spin_energy.setValue(0.5 * self.sim.k0 ** 2)
         self.spin_energy.setSingleStep(0.1)
         self.spin_energy.setStyleSheet(spin_style)
         self.spin_energy.valueChanged.connect(self._update_energy)
@@ -188,7 +241,7 @@ class QuantumApp(QMainWindow):
 
         self.spin_sigma = QDoubleSpinBox()
         self.spin_sigma.setRange(1.0, 30.0)
-        self.spin_sigma.setValue(eng.sigma)
+        self.spin_sigma.setValue(self.sim.sigma)
         self.spin_sigma.setStyleSheet(spin_style)
         self.spin_sigma.valueChanged.connect(self._update_sigma)
         form.addRow("Dispersão:", self.spin_sigma)
@@ -213,16 +266,30 @@ class QuantumApp(QMainWindow):
         self._update_barrier_logic()
 
     def _update_width(self, value):
-        eng.barreira_width = value
+        with self.worker.lock:
+            self.sim.barreira_width = value
         self._update_barrier_logic()
 
+    def _update_speed(self, value):
+        # 100% = 1 passo de física por quadro; acima disso, vários passos por quadro
+        self.worker.speed = value / 100
+        if self.player is not None:
+            self.player.speed = value / 100
+
     def _update_barrier_logic(self):
         # Decide qual barreira desenhar no motor
-        if self.dimension_mode == "DOUBLE_BARRIER":
-            eng.set_double_barrier_potential(self.V0, eng.barreira_width, self.gap_width)
-        else:
-            eng.set_barrier_height(self.V0)
-
+        with self.worker.lock:
+            if self.dimension_mode == "DOUBLE_BARRIER":
+                self.sim.set_double_barrier_potential(self.V0, self.sim.barreira_width, self.gap_width)
+            else:
+                self.sim.set_barrier_height(self.V0)
+            if self.dimension_mode == "3D_SURFACE":
+                self._set_surface_potential()
+            elif self.dimension_mode == "3D_RADIAL":
+                self._set_radial_potential()
+            self.worker.publish()
+
+        self._update_regime()
         self._update_barrier_visuals()
 
         # Se for Bio, reseta tudo
@@ -231,11 +298,13 @@ class QuantumApp(QMainWindow):
 
     def _update_energy(self, value):
         if value > 0:
-            eng.k0 = np.sqrt(2 * value)
+            self.sim.k0 = np.sqrt(2 * value)
+            self._update_regime()  # T_stat depende de k0
             self._reset_logic()
 
     def _update_sigma(self, value):
-        eng.sigma = value
+        self.sim.sigma = value
+        self._update_regime()  # e da largura do pacote
         self._reset_logic()
 
     # =====================================================
@@ -250,9 +319,14 @@ class QuantumApp(QMainWindow):
         plot.setBackground('#0d1117')
         plot.setLabel('left', '|ψ|²')
         plot.setLabel('bottom', 'Posição')
-        plot.setXRange(eng.x.min(), eng.x.max())
+        plot.setXRange(self.sim.x.min(), self.sim.x.max())
         plot.setYRange(0, 0.12)
         plot.showGrid(True, True, 0.2)
+        # Malhas maiores que a tela (gravações com N alto) são reduzidas
+        # por pico ao desenhar, sem perder o pacote
+        plot.setDownsampling(auto=True, mode='peak')
+        plot.setClipToView(True)
+        self.plot_2d = plot
 
         self.curve_L = plot.plot(pen=pg.mkPen('#22d3ee', width=2))
         self.curve_B = plot.plot(pen=pg.mkPen('#facc15', width=2))
@@ -274,24 +348,11 @@ class QuantumApp(QMainWindow):
         grid.scale(5, 5, 1)
         view.addItem(grid)
 
-        # --- ESTRATÉGIA MULTI-SUPERFÍCIE ---
-        z0 = np.zeros((len(eng.x), self.y_steps), dtype=np.float32)
-
-        self.surf_L = gl.GLSurfacePlotItem(z=z0, color=(0.2, 0.8, 1.0, 0.9), shader=None, computeNormals=False,
-                                           smooth=False)
-        self.surf_B = gl.GLSurfacePlotItem(z=z0, color=(1.0, 0.8, 0.0, 0.9), shader=None, computeNormals=False,
-                                           smooth=False)
-        self.surf_R = gl.GLSurfacePlotItem(z=z0, color=(0.1, 1.0, 0.2, 0.9), shader=None, computeNormals=False,
-                                           smooth=False)
-
-        x_range = eng.x.max() - eng.x.min()
-        dx = x_range / (len(eng.x) - 1)
-        dy = self.y_width / (self.y_steps - 1)
-
-        for surf in [self.surf_L, self.surf_B, self.surf_R]:
-            surf.scale(dx, dy, 1)
-            surf.translate(eng.x.min(), -self.y_width / 2, 0)
-            view.addItem(surf)
+        # --- SUPERFÍCIE ÚNICA COM COR POR VÉRTICE ---
+        self._surface_palette = ((0.2, 0.8, 1.0, 0.9), (1.0, 0.8, 0.0, 0.9), (0.1, 1.0, 0.2, 0.9))
+        self.surface = gl.GLSurfacePlotItem(shader=None, computeNormals=False, smooth=False)
+        self._build_surface()
+        view.addItem(self.surface)
 
         self.barrier_box_3d = gl.GLBoxItem()
         self.barrier_box_3d.setColor(QColor(255, 140, 0, 100))
@@ -324,16 +385,35 @@ class QuantumApp(QMainWindow):
     # =====================================================
     def _cycle_dimension(self):
         # Ciclo: 1D -> Radial -> Surface -> DOUBLE -> BIO -> 1D
+        if self.player is not None:
+            # No replay o botão só alterna entre a vista 2D e a superfície 3D
+            self.view_stack.setCurrentIndex(1 - self.view_stack.currentIndex())
+            self._update_barrier_visuals()
+            self._show_replay_frame()
+            return
 
         if self.dimension_mode == "1D":
             self.dimension_mode = "3D_RADIAL"
             self.btn_dimension.setText("Mode: 3D Radial (Spherical)")
             self.view_stack.setCurrentIndex(0)
 
+            # Motor radial próprio: os N pontos cobrem r ∈ [0, L/2]
+            if self.radial_sim is None:
+                grid = rad_eng.RadialGrid(self.sim.L / 2, self.sim.N)
+                self.radial_sim = rad_eng.RadialSimulation(grid, dt=self.sim.dt)
+            self._set_radial_potential()
+            self._enter_grid()
+
         elif self.dimension_mode == "3D_RADIAL":
             self.dimension_mode = "3D_SURFACE"
             self.btn_dimension.setText("Mode: 3D Surface (OpenGL)")
             self.view_stack.setCurrentIndex(1)
+
+            # Física 2D de verdade: a faixa de y da superfície vira o domínio
+            if self.surface_sim is None:
+                grid = cart_eng.CartesianGrid((self.sim.L, self.y_width), cart_eng.N)
+                self.surface_sim = cart_eng.CartesianSimulation(grid, dt=self.sim.dt)
+            self._build_surface()
             self._set_colors_physics()
 
         elif self.dimension_mode == "3D_SURFACE":
@@ -342,6 +422,7 @@ class QuantumApp(QMainWindow):
             self.btn_dimension.setStyleSheet(
                 "background-color: #d946ef; color: white; font-weight: bold; margin-top: 5px;")
             self.view_stack.setCurrentIndex(1)
+            self._build_surface()
             self._set_colors_double()
 
         elif self.dimension_mode == "DOUBLE_BARRIER":
@@ -351,9 +432,9 @@ class QuantumApp(QMainWindow):
                 "background-color: #10b981; color: white; font-weight: bold; margin-top: 5px;")
             self.view_stack.setCurrentIndex(1)
 
-            # ATIVA MOTOR BIO
-            self.bio_model = bio_eng.QuantumPhotosynthesis()
-            self.psi_phys = self.bio_model.psi
+            # ATIVA MOTOR BIO (registra o coletor no motor compartilhado)
+            with self.worker.lock:
+                self.bio_model = bio_eng.QuantumPhotosynthesis(self.sim)
             self.title_lbl.setText("🌿 Photosynthetic Complex")
             self.title_lbl.setStyleSheet("font-size:18px; font-weight:600; color:#10b981;")
             self._set_colors_bio()
@@ -366,6 +447,7 @@ class QuantumApp(QMainWindow):
             self.view_stack.setCurrentIndex(0)
             self.title_lbl.setText("Quantum Tunneling (Physics)")
             self.title_lbl.setStyleSheet("font-size:18px; font-weight:600; color:#58a6ff;")
+            self._enter_grid()
 
         self._update_barrier_logic()  # Atualiza V no motor
         self.explainer.update_mode(self.dimension_mode)
@@ -373,9 +455,8 @@ class QuantumApp(QMainWindow):
 
     def _set_colors_physics(self):
         # Cores Físicas (Azul -> Amarelo -> Verde)
-        self.surf_L.setData(color=(0.2, 0.8, 1.0, 0.9))
-        self.surf_B.setData(color=(1.0, 0.8, 0.0, 0.9))
-        self.surf_R.setData(color=(0.1, 1.0, 0.2, 0.9))
+        self._surface_palette = ((0.2, 0.8, 1.0, 0.9), (1.0, 0.8, 0.0, 0.9), (0.1, 1.0, 0.2, 0.9))
+        self._update_surface_colors()
         self.barrier_box_3d.setColor(QColor(255, 140, 0, 100))  # Laranja Transparente
         self.barrier_2_box_3d.setVisible(False)
         self.sink_box_3d.setVisible(False)
@@ -386,10 +467,9 @@ class QuantumApp(QMainWindow):
         self.txt_R.setData(color=(0.5, 1.0, 0.5, 1.0))
 
     def _set_colors_double(self):
-        # Ciano (Onda) e Magenta (Barreiras)
-        self.surf_L.setData(color=(0.0, 1.0, 1.0, 0.9))
-        self.surf_B.setData(color=(1.0, 0.0, 1.0, 0.5))  # Roxo no meio
-        self.surf_R.setData(color=(0.0, 1.0, 1.0, 0.9))
+        # Ciano (Onda) e Magenta (Barreiras), roxo no meio
+        self._surface_palette = ((0.0, 1.0, 1.0, 0.9), (1.0, 0.0, 1.0, 0.5), (0.0, 1.0, 1.0, 0.9))
+        self._update_surface_colors()
 
         self.barrier_box_3d.setColor(QColor(255, 0, 255, 120))  # Magenta
         self.barrier_2_box_3d.setColor(QColor(255, 0, 255, 120))
@@ -400,9 +480,8 @@ class QuantumApp(QMainWindow):
 
     def _set_colors_bio(self):
         # Cores Bio (Dourado -> Branco -> Dourado)
-        self.surf_L.setData(color=(1.0, 0.8, 0.2, 0.9))
-        self.surf_B.setData(color=(1.0, 1.0, 1.0, 0.8))
-        self.surf_R.setData(color=(1.0, 0.8, 0.2, 0.9))
+        self._surface_palette = ((1.0, 0.8, 0.2, 0.9), (1.0, 1.0, 1.0, 0.8), (1.0, 0.8, 0.2, 0.9))
+        self._update_surface_colors()
 
         self.barrier_box_3d.setColor(QColor(0, 150, 50, 150))  # Verde Proteína
         self.barrier_2_box_3d.setVisible(False)
@@ -413,9 +492,136 @@ class QuantumApp(QMainWindow):
         self.txt_L.setData(color=(1.0, 0.4, 0.4, 1.0))
         self.txt_R.setData(color=(0.4, 1.0, 0.4, 1.0))
 
+    @property
+    def _view_sim(self):
+        """Simulação exibida: a 2D/radial nos modos 3D ao vivo, senão self.sim."""
+        if self.player is None:
+            if self.dimension_mode == "3D_SURFACE":
+                return self.surface_sim
+            if self.dimension_mode == "3D_RADIAL":
+                return self.radial_sim
+        return self.sim
+
+    def _set_surface_potential(self):
+        """A barreira do motor 1D (altura e largura) atravessando todo o y do motor 2D."""
+        sim2d = self.surface_sim
+        sim2d.clear()
+        sim2d.add_rectangle((self.sim.barreira_center, 0.0), (self.sim.barreira_width, np.inf), self.V0)
+
+    def _set_radial_potential(self):
+        """A barreira do motor 1D (altura, centro e largura) como casca esférica."""
+        sim_r = self.radial_sim
+        sim_r.barreira_center = self.sim.barreira_center
+        sim_r.barreira_width = self.sim.barreira_width
+        sim_r.set_barrier_height(self.V0)
+
+    def _build_surface(self):
+        """
+        (Re)cria a malha 3D para a simulação exibida. Com mais pontos que
+        a largura da tela, cada coluna da superfície cobre um bloco de
+        pontos (_columns = início de cada bloco) e mostra o pico dele.
+        No modo 3D_SURFACE a altura é a densidade 2D do motor cartesiano
+        (linhas = y da malha, em blocos de até 256); nos outros, a curva
+        1D estendida em y_steps linhas.
+        """
+        sim = self._view_sim
+        shape = np.atleast_1d(sim.N)
+        screen = QApplication.primaryScreen()
+        width = screen.size().width() if screen is not None else shape[0]
+        columns = min(shape[0], max(width, 64))
+        self._columns = self._blocks(shape[0], columns)
+
+        if len(shape) > 1:
+            rows = min(shape[1], 256)
+            self._rows = self._blocks(shape[1], rows)
+            y = np.asarray(sim.axes[1] if self._rows is None else sim.axes[1][self._rows])
+            # ∫|ψ|² dy = |ψ_1D|²: o pico 2D é o 1D dividido por σ_y·√π
+            self._z_scale = self.Z_SCALE * self.surface_sigma_y * np.sqrt(np.pi)
+        else:
+            rows = self.y_steps
+            self._rows = None
+            y = np.linspace(-self.y_width / 2, self.y_width / 2, rows)
+            self._z_scale = self.Z_SCALE
+
+        # Buffers pré-alocados: altura (float32) e cores, que só mudam
+        # quando a barreira ou o modo mudam
+        self._z_buf = np.zeros((columns, rows), dtype=np.float32)
+        self._surface_colors = np.zeros((columns, rows, 4), dtype=np.float32)
+
+        # x explícito por coluna: vale também para malhas não uniformes
+        x = np.asarray(sim.x if self._columns is None else sim.x[self._columns])
+        self.surface.resetTransform()
+        self.surface.setData(x=x, y=y, z=self._z_buf)
+        self._update_surface_colors()
+
+    @staticmethod
+    def _blocks(n, count):
+        """Início de cada um de count blocos de n pontos (None se count == n)."""
+        return None if count == n else np.linspace(0, n, count, endpoint=False).astype(int)
+
+    def _decimate(self, prob):
+        """|ψ|² reduzido às colunas (e linhas) da superfície (máximo de cada bloco)."""
+        if self._rows is not None and prob.ndim > 1:
+            prob = np.maximum.reduceat(prob, self._rows, axis=1)
+        if self._columns is None:
+            return prob
+        return np.maximum.reduceat(prob, self._columns, axis=0)
+
+    def _update_surface_colors(self):
+        """Pinta cada linha x da superfície com a cor da sua região (L/B/R)."""
+        sim = self._view_sim
+        regions = sim.regions
+        color_L, color_B, color_R = self._surface_palette
+
+        colors = np.empty((len(sim.x), 4), dtype=np.float32)
+        colors[regions.left] = color_L
+        colors[regions.interaction] = color_B
+        colors[regions.right] = color_R
+        if self._columns is not None:
+            colors = colors[self._columns]
+        self._surface_colors[:] = colors[:, np.newaxis]
+        self.surface.setData(z=self._z_buf, colors=self._surface_colors.reshape(-1, 4))
+
+    def _update_regime(self):
+        """
+        Rótulo do regime a partir da solução estacionária (matriz de
+        transferência) do potencial atual: calculado só quando a barreira
+        muda, em microssegundos, sem esperar a evolução temporal.
+        """
+        E0 = 0.5 * self.sim.k0 ** 2
+        if self.V0 >= eng.V_INFINITY:
+            self._regime_text = "🧱 Hard Wall"
+            return
+
+        segments = stationary.segments_from_potential(self.sim)
+        T0, _ = stationary.packet_transmission(segments, self.sim.k0, self.sim.sigma)
+
+        if self.dimension_mode == "DOUBLE_BARRIER":
+            E_res, _, widths = stationary.resonances(segments, np.linspace(0.05, 2 * E0, 1500))
+            below = E_res < self.V0
+            if below.any():
+                nearest = np.argmin(np.abs(E_res[below] - E0))
+                e_res, width = E_res[below][nearest], widths[below][nearest]
+                if abs(e_res - E0) < max(width, 0.05 * E0):
+                    self._regime_text = f"🔮 On Resonance (E ≈ {e_res:.2f})"
+                else:
+                    self._regime_text = f"🔮 Fabry-Pérot · resonance at E = {e_res:.2f}"
+            else:
+                self._regime_text = "🔮 Fabry-Pérot Interference"
+        elif self.V0 > E0:
+            self._regime_text = "🔒 Tunneling (E < V)"
+        else:
+            self._regime_text = "🚀 Scattering (E > V)"
+        self._regime_text += f"  ·  T_stat = {T0 * 100:.1f}%"
+
     def _update_barrier_visuals(self):
-        mask = eng.V > 0
-        xb = eng.x[mask]
+        self._update_surface_colors()
+
+        sim = self._view_sim
+        mask = sim.V > 0
+        if mask.ndim > 1:
+            mask = mask.any(axis=tuple(range(1, mask.ndim)))  # colunas x com barreira
+        xb = sim.x[mask]
 
         # --- Atualizar 2D ---
         if xb.size > 0:
@@ -432,9 +638,9 @@ class QuantumApp(QMainWindow):
 
             if self.dimension_mode == "DOUBLE_BARRIER":
                 # Desenha DUAS barreiras
-                w = eng.barreira_width
+                w = self.sim.barreira_width
                 gap = self.gap_width
-                center = eng.barreira_center
+                center = self.sim.barreira_center
 
                 # Barreira 1 (Esquerda)
                 self.barrier_box_3d.resetTransform()
@@ -479,105 +685,221 @@ class QuantumApp(QMainWindow):
             self.txt_L.setVisible(False)
             self.txt_R.setVisible(False)
 
-    def _update_simulation(self):
-        if self.is_paused: return
-
-        if self.dimension_mode == "BIO_QUANTUM" and self.bio_model:
-            self.psi_phys = self.bio_model.evolve_step()
-        else:
-            mode = "3D_RADIAL" if self.dimension_mode == "3D_RADIAL" else "1D"
-            self.psi_phys = eng.evolve_step(self.psi_phys, mode=mode)
-            self.psi_phys = eng.normalize(self.psi_phys, mode=mode)
-
-        self.time += eng.dt * (self.speed.value() / 100)
-        self._update_display()
+    def _render_frame(self):
+        now = time.perf_counter()
+        elapsed, self._last_tick = now - self._last_tick, now
+        if self.player is not None:
+            # Replay: só muda de quadro quando o relógio cruzou um; em
+            # velocidades altas os quadros do meio são pulados
+            if self.player.tick(elapsed):
+                self._show_replay_frame()
+            return
+        # Só redesenha quando o worker publicou um quadro novo
+        if self.worker.frames.version != self._frame_version:
+            self._update_display()
 
     def _update_display(self):
-        x = eng.x
-        prob = np.abs(self.psi_phys) ** 2
-
-        # --- UPDATE 3D SURFACES ---
+        if self.player is not None:
+            self._show_replay_frame()
+            return
+        frames = self.worker.frames
+        if self.prob.shape != frames.shape:
+            self.prob = np.zeros(frames.shape)  # o worker trocou de malha (1D <-> 2D)
+        self._frame_version, meta = frames.read(self.prob)
+        self._show_frame(self.prob, meta)
+
+    def _show_frame(self, prob, meta):
+        x = self._view_sim.x
+
+        # --- UPDATE 3D SURFACE ---
+        # Densidade 2D real (3D_SURFACE) ou extrusão da curva 1D por
+        # broadcasting, direto no buffer float32
         if self.view_stack.currentIndex() == 1:
-            z_full = np.tile(prob * self.Z_SCALE, (self.y_steps, 1)).T.astype(np.float32)
-
-            mask = eng.V > 0
-            xb = eng.x[mask]
-
-            if xb.size > 0:
-                l_edge, r_edge = xb.min(), xb.max()
-                mask_L = (x < l_edge)[:, np.newaxis]
-                mask_B = ((x >= l_edge) & (x <= r_edge))[:, np.newaxis]
-                mask_R = (x > r_edge)[:, np.newaxis]
-
-                self.surf_L.setData(z=np.where(mask_L, z_full, 0.0))
-                self.surf_B.setData(z=np.where(mask_B, z_full, 0.0))
-                self.surf_R.setData(z=np.where(mask_R, z_full, 0.0))
-            else:
-                self.surf_L.setData(z=z_full)
-                self.surf_B.setData(z=np.zeros_like(z_full))
-                self.surf_R.setData(z=np.zeros_like(z_full))
+            z = self._decimate(prob)
+            np.multiply(z if z.ndim > 1 else z[:, np.newaxis], self._z_scale, out=self._z_buf)
+            self.surface.setData(z=self._z_buf)
 
         # --- UPDATE TEXT & STATUS ---
-        if self.dimension_mode == "BIO_QUANTUM" and self.bio_model:
-            eff = self.bio_model.get_efficiency_percent()
+        if "efficiency" in meta:
+            eff = meta["efficiency"]
             self.lbl_trans.setText(f"Harvested: {eff:.1f}%")
             self.lbl_refl.setText(f"Dissipated: {(100 - eff):.1f}%")
             self.txt_L.setData(text="Dissipation")
             self.txt_R.setData(text=f"Harvest: {eff:.1f}%")
 
         else:
-            T, R = eng.calculate_transmission(self.psi_phys)
+            T, R = meta["T"], meta["R"]
             self.lbl_trans.setText(f"Transmission: {T:.1f}%")
             self.lbl_refl.setText(f"Reflection: {R:.1f}%")
             self.txt_L.setData(text=f"R: {R:.1f}%")
             self.txt_R.setData(text=f"T: {T:.1f}%")
 
-            if self.V0 >= eng.V_INFINITY:
-                self.lbl_regime.setText("🧱 Hard Wall")
-            elif self.dimension_mode == "DOUBLE_BARRIER":
-                # Checa Ressonância (simplificado)
-                self.lbl_regime.setText("🔮 Fabry-Pérot Interference")
-            elif self.V0 > 0.5 * eng.k0 ** 2:
-                self.lbl_regime.setText("🔒 Tunneling (E < V)")
-            else:
-                self.lbl_regime.setText("🚀 Scattering (E > V)")
+            self.lbl_regime.setText(self._regime_text)
 
-        self.lbl_time.setText(f"Time: {self.time:.2f}")
-        self.lbl_norm.setText(f"Norm: {np.trapz(prob, x):.4f}")
+        self.lbl_time.setText(f"Time: {meta['time']:.2f}")
+        self.lbl_norm.setText(f"Norm: {meta['norm']:.4f}")
         self.lbl_dimension.setText(f"View: {self.dimension_mode}")
 
         # --- 2D UPDATE ---
+        # Cada curva recebe uma view da sua fatia (índice de regiões do motor)
         if self.view_stack.currentIndex() == 0:
-            mask = eng.V > 0
-            xb = eng.x[mask]
-            if xb.size > 0:
-                l, r = xb.min(), xb.max()
-            else:
-                l, r = 9999, 9999
-            self.curve_L.setData(x, np.where(x < l, prob, np.nan))
-            self.curve_B.setData(x, np.where((x >= l) & (x <= r), prob, np.nan))
-            self.curve_R.setData(x, np.where(x > r, prob, np.nan))
+            regions = self._view_sim.regions
+            self.curve_L.setData(x[regions.left], prob[regions.left])
+            self.curve_B.setData(x[regions.interaction], prob[regions.interaction])
+            self.curve_R.setData(x[regions.right], prob[regions.right])
 
     def _toggle_pause(self):
+        if self.player is not None:
+            if not self.player.playing and self.player.index == self.player.last:
+                self.player.seek(0)  # Play no fim recomeça
+            self.player.playing = not self.player.playing
+            self.btn_pause.setText("Pause" if self.player.playing else "Run")
+            return
         self.is_paused = not self.is_paused
+        self.worker.paused = self.is_paused
         self.btn_pause.setText("Run" if self.is_paused else "Pause")
 
+    # =====================================================
+    # REPLAY
+    # =====================================================
+    def _open_recording(self):
+        path = QFileDialog.getExistingDirectory(self, "Open Recording")
+        if path:
+            self.load_recording(path)
+
+    def load_recording(self, path: str):
+        """
+        Troca a física ao vivo pela reprodução da trajetória em path. Os
+        quadros são lidos por memmap sob demanda; o worker fica pausado,
+        então a GUI não disputa CPU com o solver.
+        """
+        reader = trajectory.TrajectoryReader(path)
+        sim = batch_runner.replay_simulation(reader)
+        if self._live is None:
+            self._live = (self.sim, self.dimension_mode, self.gap_width, self.bio_model)
+        self.worker.paused = True
+
+        spec = reader.parameters
+        self.sim = sim
+        self.bio_model = None
+        self.dimension_mode = spec.get("mode", reader.mode)
+        if self.dimension_mode == "BIO_QUANTUM":
+            self.dimension_mode = "1D"  # o coletor não é reconstruído no replay
+        self.gap_width = spec.get("gap", self.gap_width)
+
+        self.player = trajectory.TrajectoryPlayer(reader, BASE_STEPS_PER_SECOND)
+        self.player.speed = self.speed.value() / 100
+        self.scrub.blockSignals(True)
+        self.scrub.setRange(0, self.player.last)
+        self.scrub.setValue(0)
+        self.scrub.blockSignals(False)
+        self.scrub.setEnabled(True)
+        self.btn_live.setEnabled(True)
+        self.params_box.setEnabled(False)
+        self.btn_pause.setText("Pause")
+
+        self._enter_grid()
+        self._update_regime()  # k0 e sigma da gravação
+        self._show_replay_frame()
+
+    def close_recording(self):
+        """Volta à simulação ao vivo, no estado em que foi deixada."""
+        if self.player is None:
+            return
+        self.player = None
+        self.sim, self.dimension_mode, self.gap_width, self.bio_model = self._live
+        self._live = None
+        self.worker.paused = self.is_paused
+
+        self.scrub.setEnabled(False)
+        self.btn_live.setEnabled(False)
+        self.params_box.setEnabled(True)
+        self.btn_pause.setText("Run" if self.is_paused else "Pause")
+        self.lbl_frame.setText("No recording loaded")
+
+        self._enter_grid()
+        self._update_regime()
+        self._frame_version = -1
+        self._update_display()
+
+    def _enter_grid(self):
+        """Ajusta gráficos e buffers à malha exibida (ao vivo ou gravada)."""
+        sim = self._view_sim
+        self.prob = np.zeros(sim.N)
+        self.plot_2d.setXRange(sim.x.min(), sim.x.max())
+        self._build_surface()
+        self._update_barrier_visuals()
+
+    def _seek(self, index):
+        if self.player is not None:
+            self.player.seek(index)
+            self._show_replay_frame()
+
+    def _show_replay_frame(self):
+        player = self.player
+        i = player.index
+        psi = player.reader[i]
+        if psi.ndim > 1:
+            psi = psi[0]  # lote: mostra a primeira linha
+        psi = psi.astype(complex)
+        prob = np.abs(psi) ** 2
+
+        meta = {"time": float(player.reader.times[i]), "norm": np.trapz(prob, self.sim.x)}
+        meta["T"], meta["R"] = self.sim.calculate_transmission(psi)
+        self._regime_text = f"⏯ Replay · {player.speed:.1f}×"
+        self._show_frame(prob, meta)
+
+        self.scrub.blockSignals(True)
+        self.scrub.setValue(i)
+        self.scrub.blockSignals(False)
+        self.lbl_frame.setText(f"Frame {i + 1}/{player.last + 1}")
+        if not player.playing:
+            self.btn_pause.setText("Run")
+
     def _reset_logic(self):
         if self.dimension_mode == "BIO_QUANTUM":
-            self.bio_model = bio_eng.QuantumPhotosynthesis()
-            self.psi_phys = self.bio_model.psi
+            with self.worker.lock:
+                self.bio_model = bio_eng.QuantumPhotosynthesis(self.sim)
+            self.worker.reset(self.bio_model.psi, self.dimension_mode, self.bio_model, sim=self.sim)
+        elif self.dimension_mode == "3D_SURFACE":
+            # Pacote 2D com x0, σ e k0 dos controles, largura surface_sigma_y em y
+            psi = self.surface_sim.make_packet(x0=(self.sim.x0, 0.0),
+                                               sigma=(self.sim.sigma, self.surface_sigma_y),
+                                               k0=(self.sim.k0, 0.0))
+            self.worker.reset(psi, self.dimension_mode, sim=self.surface_sim)
+        elif self.dimension_mode == "3D_RADIAL":
+            # u(r) saindo do centro da casca; σ limitado para a base seno
+            # (u(0) = 0) não cortar o pacote
+            sim_r = self.radial_sim
+            psi = sim_r.make_packet(sigma=min(self.sim.sigma, sim_r.r0 / 3), k0=self.sim.k0)
+            self.worker.reset(psi, self.dimension_mode, sim=sim_r)
         else:
-            self.psi_phys = eng.psi0.copy()
-        self.time = 0.0
+            with self.worker.lock:
+                self.sim.set_sink()  # Fora do modo Bio não há coletor
+            self.worker.reset(self.sim.psi0, self.dimension_mode, sim=self.sim)
         self._update_display()
 
     def _reset(self):
+        if self.player is not None:
+            self._seek(0)  # no replay, Reset volta ao primeiro quadro
+            return
         self._reset_logic()
 
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.worker.stop()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="YANKCO Quantum Tunnelling Simulator")
+    parser.add_argument("--replay", help="trajetória gravada (batch_runner --record) a reproduzir")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setFont(QFont("Arial", 10))
-    win = QuantumApp()
+    win = QuantumApp(replay=args.replay)
     win.show()
     sys.exit(app.exec())
\ No newline at end of file
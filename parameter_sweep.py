@@ -0,0 +1,243 @@
+"""
+=========================================================
+PARAMETER SWEEP
+---------------------------------------------------------
+Expande uma grade de parâmetros (ex.: V0 × width × energy) em
+jobs, roda em paralelo num ProcessPoolExecutor e grava o T/R
+assintótico de cada ponto num SQLite, chaveado pelo hash do
+spec. Uma varredura interrompida retoma sem recalcular os
+pontos já gravados.
+
+Uso:
+    python -m parameter_sweep --axis V0=0.5:8:16 --axis width=1,2,4 \\
+        --axis energy=0.5:10:64 --steps 1500 --store sweep.sqlite
+
+Eixos: "a,b,c" (lista) ou "início:fim:n" (linspace).
+=========================================================
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+
+import numpy as np
+
+import Schrödinger_engine as eng
+import batch_runner
+
+
+# =========================================================
+# GRADE
+# =========================================================
+def expand_grid(base: batch_runner.RunSpec, axes: dict):
+    """Produto cartesiano dos eixos aplicado sobre o spec base."""
+    names = list(axes)
+    specs = []
+    for values in itertools.product(*(axes[name] for name in names)):
+        data = asdict(base)
+        data.update(zip(names, values))
+        specs.append(batch_runner.RunSpec.from_dict(data))
+    return specs
+
+
+def spec_hash(spec: batch_runner.RunSpec) -> str:
+    return hashlib.sha1(spec.to_json().encode("utf-8")).hexdigest()
+
+
+# =========================================================
+# ARMAZENAMENTO
+# =========================================================
+class ResultStore:
+    """
+    Resultados de varredura em SQLite, um registro por spec.
+    Só o processo principal escreve; os workers apenas calculam.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                hash TEXT PRIMARY KEY,
+                spec TEXT NOT NULL,
+                T REAL, R REAL, norm REAL, efficiency REAL,
+                created REAL
+            )
+            """
+        )
+        self._db.commit()
+
+    def done_hashes(self) -> set:
+        return {row[0] for row in self._db.execute("SELECT hash FROM results")}
+
+    def add(self, rows):
+        """rows: iterável de (hash, spec_json, T, R, norm, efficiency)."""
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(*row, now) for row in rows],
+        )
+        self._db.commit()
+
+    def load(self) -> dict:
+        """Todos os resultados como colunas numpy + a lista de specs."""
+        rows = self._db.execute(
+            "SELECT spec, T, R, norm, efficiency FROM results ORDER BY created, hash"
+        ).fetchall()
+        specs = [json.loads(row[0]) for row in rows]
+        columns = np.array([row[1:] for row in rows], dtype=float).reshape(-1, 4)
+        return {
+            "specs": specs,
+            "T": columns[:, 0], "R": columns[:, 1],
+            "norm": columns[:, 2], "efficiency": columns[:, 3],
+        }
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+# =========================================================
+# EXECUÇÃO
+# =========================================================
+def _run_job(spec_dicts):
+    """
+    Worker: roda um grupo de specs compatíveis como um único lote
+    (ou um a um, se o lote não é possível) e devolve linhas para o store.
+    """
+    specs = [batch_runner.RunSpec.from_dict(d) for d in spec_dicts]
+
+    if not _batchable(specs[0]):
+        results = []
+        for spec in specs:
+            out = batch_runner.run(spec)
+            results.append((out["T"][-1], out["R"][-1], out["norm"][-1], out["efficiency"][-1]))
+    else:
+        out = batch_runner.run_batch(specs)
+        results = zip(out["T"], out["R"], out["norm"], out["efficiency"])
+
+    return [
+        (spec_hash(spec), spec.to_json(), float(T), float(R), float(norm), float(eff))
+        for spec, (T, R, norm, eff) in zip(specs, results)
+    ]
+
+
+def _batchable(spec: batch_runner.RunSpec) -> bool:
+    """run_batch não cobre 3D_RADIAL (motor radial) nem BIO_QUANTUM com integrador global."""
+    if spec.mode == "3D_RADIAL":
+        return False
+    return spec.mode != "BIO_QUANTUM" or spec.integrator not in eng.GLOBAL_PROPAGATORS
+
+
+def make_jobs(specs, max_batch: int = 64):
+    """Agrupa specs pela batch_key e corta os grupos em lotes de até max_batch."""
+    groups = {}
+    for spec in specs:
+        groups.setdefault(batch_runner.batch_key(spec), []).append(spec)
+
+    jobs = []
+    for group in groups.values():
+        size = max_batch if _batchable(group[0]) else 1
+        for i in range(0, len(group), size):
+            jobs.append(group[i:i + size])
+    return jobs
+
+
+def run_sweep(specs, store: ResultStore, workers: int = None,
+              max_batch: int = 64, progress=None) -> int:
+    """
+    Roda os specs que ainda não estão no store, gravando cada lote
+    assim que termina. Devolve quantos pontos foram calculados.
+    """
+    done = store.done_hashes()
+    pending = [spec for spec in specs if spec_hash(spec) not in done]
+    if not pending:
+        return 0
+
+    jobs = make_jobs(pending, max_batch)
+    computed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_job, [asdict(spec) for spec in job]) for job in jobs]
+        for future in as_completed(futures):
+            rows = future.result()
+            store.add(rows)
+            computed += len(rows)
+            if progress is not None:
+                progress(computed, len(pending))
+    return computed
+
+
+# =========================================================
+# CLI
+# =========================================================
+def parse_axis(text: str):
+    """'V0=1,2,3', 'energy=0.5:10:64' ou 'mode=1D,3D_RADIAL' -> (nome, [valores])."""
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"Eixo inválido: {text!r}")
+    if ":" in values:
+        start, stop, num = values.split(":")
+        return name, list(np.linspace(float(start), float(stop), int(num)))
+    return name, [_parse_value(v) for v in values.split(",")]
+
+
+def _parse_value(text: str):
+    try:
+        return float(text)
+    except ValueError:
+        return text  # ex.: mode=1D,3D_RADIAL
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m parameter_sweep",
+                                     description="Varredura paralela de parâmetros com retomada.")
+    batch_runner.add_spec_arguments(parser)
+    parser.add_argument("--axis", action="append", type=parse_axis, default=[],
+                        help="eixo da grade, ex.: V0=1,2,3 ou energy=0.5:10:64")
+    parser.add_argument("--store", default="sweep.sqlite", help="arquivo SQLite de resultados")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    base = batch_runner.spec_from_args(args)
+
+    # Eixos chegam como float; campos int de RunSpec (N, steps, cells, ...) viram int
+    kinds = {f.name: f.type for f in fields(batch_runner.RunSpec)}
+    axes = dict(args.axis)
+    for name, values in axes.items():
+        if kinds.get(name) is int:
+            try:
+                ints = [int(v) for v in values]
+            except ValueError:
+                ints = None
+            if ints != values:
+                parser.error(f"o eixo {name} só aceita inteiros: {values}")
+            axes[name] = ints
+    specs = expand_grid(base, axes)
+
+    store = ResultStore(args.store)
+    done = store.done_hashes()
+    skipped = sum(spec_hash(spec) in done for spec in specs)
+    print(f"{len(specs)} pontos ({skipped} já no store), {args.workers} workers")
+
+    def progress(n, total):
+        print(f"\r  {n}/{total}", end="", flush=True)
+
+    t0 = time.perf_counter()
+    computed = run_sweep(specs, store, workers=args.workers,
+                         max_batch=args.max_batch, progress=progress)
+    print(f"\n{computed} pontos calculados em {time.perf_counter() - t0:.1f} s -> {args.store}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
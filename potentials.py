@@ -0,0 +1,314 @@
+"""
+=========================================================
+BIBLIOTECA DE POTENCIAIS
+---------------------------------------------------------
+Descritores imutáveis e hasheáveis de V(x), combináveis com +:
+
+    Rectangle     barreira retangular (V0 ≥ V_INFINITY = parede)
+    Gaussian      barreira (ou poço, V0 < 0) gaussiana
+    Eckart        V0/cosh²(ξ) + degrau suave, ξ = (x - c)/a
+    Morse         poço de Morse com parede exponencial
+    KronigPenney  rede periódica de barreiras retangulares
+    LinearRamp    rampa linear (campo uniforme) entre dois pontos
+    Tabulated     tabela (x, V) interpolada; from_csv lê de um CSV
+    Sum / Stack   soma de termos / uma linha por pacote do lote
+
+Simulation.set_potential aceita um descritor no lugar do array.
+Como o descritor é hasheável, V(x), os propagadores e o índice
+de regiões ficam em CACHE, um LRU chaveado por (descritor,
+malha, dt, ...) e compartilhado por todas as simulações do
+processo: uma varredura que volta a um potencial já visto não
+recalcula nada.
+
+Descritores constantes por partes (Rectangle, KronigPenney e
+somas deles) também viram os trechos (início, fim, V) do
+solver estacionário (segments()).
+
+Uso:
+    import potentials as pot
+    V = pot.KronigPenney(10.0, count=6, period=3.0, width=1.0, height=2.0) \\
+        + pot.LinearRamp(-10.0, 30.0, 0.0, -1.0)
+    sim.set_potential(V)
+=========================================================
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+# Entradas do cache compartilhado (cada propagador guarda alguns arrays
+# do tamanho da malha, ou do lote)
+CACHE_SIZE = 64
+
+
+# =========================================================
+# DESCRITORES
+# =========================================================
+@dataclass(frozen=True)
+class Potential:
+    """
+    Base dos descritores. evaluate(x) devolve V nos pontos x; os campos
+    float são normalizados para float no construtor, então Gaussian(0, 1, 2)
+    e Gaussian(0.0, 1.0, np.float64(2)) são a mesma chave de cache.
+    """
+
+    def __post_init__(self):
+        for f in fields(self):
+            if f.type is float:
+                object.__setattr__(self, f.name, float(getattr(self, f.name)))
+            elif f.type is int:
+                object.__setattr__(self, f.name, int(getattr(self, f.name)))
+
+    def evaluate(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def __call__(self, x) -> np.ndarray:
+        return self.evaluate(np.asarray(x, dtype=float))
+
+    def __add__(self, other):
+        if not isinstance(other, Potential):
+            return NotImplemented
+        left = self.terms if isinstance(self, Sum) else (self,)
+        right = other.terms if isinstance(other, Sum) else (other,)
+        return Sum(left + right)
+
+    def edges(self):
+        """Bordas dos trechos constantes, ou None se V não é constante por partes."""
+        return None
+
+    def segments(self):
+        """
+        Trechos (início, fim, V) com V != 0, como em stationary. Só para
+        descritores constantes por partes (TypeError nos demais).
+        """
+        edges = self.edges()
+        if edges is None:
+            raise TypeError(f"{type(self).__name__} não é constante por partes")
+        edges = np.unique(edges)
+        values = self.evaluate((edges[:-1] + edges[1:]) / 2)
+        return [(float(a), float(b), float(v))
+                for a, b, v in zip(edges[:-1], edges[1:], values) if v != 0]
+
+
+@dataclass(frozen=True)
+class Rectangle(Potential):
+    """height no intervalo aberto center ± width/2, como set_barrier_height."""
+    center: float
+    width: float
+    height: float
+
+    def evaluate(self, x):
+        inside = (x > self.center - self.width / 2) & (x < self.center + self.width / 2)
+        return np.where(inside, self.height, 0.0)
+
+    def edges(self):
+        return (self.center - self.width / 2, self.center + self.width / 2)
+
+
+@dataclass(frozen=True)
+class Gaussian(Potential):
+    """height·exp(-(x - center)²/(2·width²))."""
+    center: float
+    width: float
+    height: float
+
+    def evaluate(self, x):
+        return self.height * np.exp(-0.5 * ((x - self.center) / self.width) ** 2)
+
+
+@dataclass(frozen=True)
+class Eckart(Potential):
+    """
+    step/(1 + e^-ξ) + height/cosh²(ξ), ξ = (x - center)/width: barreira
+    suave (step = 0, Pöschl-Teller, com T(E) analítico) ou degrau.
+    """
+    center: float
+    width: float
+    height: float
+    step: float = 0.0
+
+    def evaluate(self, x):
+        xi = np.clip((x - self.center) / self.width, -350.0, 350.0)
+        return self.step / (1.0 + np.exp(-xi)) + self.height / np.cosh(xi) ** 2
+
+
+@dataclass(frozen=True)
+class Morse(Potential):
+    """
+    depth·(e^-2ξ - 2e^-ξ), ξ = (x - center)/width: poço de profundidade
+    depth em center, V → 0 à direita e parede exponencial à esquerda
+    (o motor a corta em V_INFINITY). width < 0 espelha: parede à direita,
+    de frente para um pacote que vem da esquerda.
+    """
+    center: float
+    width: float
+    depth: float
+
+    def evaluate(self, x):
+        decay = np.exp(-np.maximum((x - self.center) / self.width, -300.0))
+        return self.depth * (decay ** 2 - 2.0 * decay)
+
+
+@dataclass(frozen=True)
+class KronigPenney(Potential):
+    """
+    count barreiras de largura width e altura height, uma a cada period,
+    centradas em center (rede de Kronig-Penney finita).
+    """
+    center: float
+    count: int
+    period: float
+    width: float
+    height: float
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.count < 1 or self.width > self.period:
+            raise ValueError("KronigPenney exige count >= 1 e width <= period")
+
+    def centers(self) -> np.ndarray:
+        return self.center + (np.arange(self.count) - (self.count - 1) / 2) * self.period
+
+    def evaluate(self, x):
+        offset = np.abs(np.asarray(x)[..., np.newaxis] - self.centers())
+        return np.where(np.any(offset < self.width / 2, axis=-1), self.height, 0.0)
+
+    def edges(self):
+        return tuple(np.concatenate([self.centers() - self.width / 2, self.centers() + self.width / 2]))
+
+
+@dataclass(frozen=True)
+class LinearRamp(Potential):
+    """
+    v_start até start, linear até v_end em stop, constante depois. Um campo
+    uniforme F entre start e stop é v_end - v_start = -F·(stop - start). Com
+    v_end != v_start a malha periódica tem um degrau na borda: use absorvedor.
+    """
+    start: float
+    stop: float
+    v_start: float
+    v_end: float
+
+    def evaluate(self, x):
+        return np.interp(x, (self.start, self.stop), (self.v_start, self.v_end))
+
+
+@dataclass(frozen=True)
+class Tabulated(Potential):
+    """
+    Tabela (x, V) interpolada linearmente, fill fora dela. Arrays viram
+    tuplas ordenadas por x, para o descritor ser hasheável.
+    """
+    x: tuple
+    V: tuple
+    fill: float = 0.0
+
+    def __post_init__(self):
+        super().__post_init__()
+        x = np.asarray(self.x, dtype=float).ravel()
+        V = np.asarray(self.V, dtype=float).ravel()
+        if x.size != V.size or x.size < 2:
+            raise ValueError(f"Tabela com {x.size} x e {V.size} V (mínimo 2 pontos iguais)")
+        order = np.argsort(x, kind="stable")
+        object.__setattr__(self, "x", tuple(x[order].tolist()))
+        object.__setattr__(self, "V", tuple(V[order].tolist()))
+
+    def evaluate(self, x):
+        return np.interp(x, self.x, self.V, left=self.fill, right=self.fill)
+
+
+@dataclass(frozen=True)
+class Sum(Potential):
+    """Soma dos termos (também é o resultado de a + b)."""
+    terms: tuple
+
+    def __post_init__(self):
+        object.__setattr__(self, "terms", tuple(self.terms))
+
+    def evaluate(self, x):
+        return sum(term.evaluate(x) for term in self.terms)
+
+    def edges(self):
+        parts = [term.edges() for term in self.terms]
+        if any(part is None for part in parts):
+            return None
+        return tuple(edge for part in parts for edge in part)
+
+
+@dataclass(frozen=True)
+class Stack(Potential):
+    """Uma linha por descritor: V (B, N) para um lote de pacotes."""
+    rows: tuple
+
+    def __post_init__(self):
+        object.__setattr__(self, "rows", tuple(self.rows))
+
+    def evaluate(self, x):
+        return np.stack([np.broadcast_to(row.evaluate(x), np.shape(x)) for row in self.rows])
+
+
+def double_barrier(center: float, width: float, gap: float, height: float) -> Sum:
+    """Duas Rectangle de largura width separadas por gap, centradas em center."""
+    offset = gap / 2 + width / 2
+    return Rectangle(center - offset, width, height) + Rectangle(center + offset, width, height)
+
+
+def from_csv(path: str, x_column: int = 0, v_column: int = 1, delimiter: str = ",",
+             fill: float = 0.0) -> Tabulated:
+    """
+    Tabulated das colunas x e V de um CSV. Linhas de cabeçalho (não
+    numéricas) e comentários com # são ignorados.
+    """
+    data = np.genfromtxt(path, delimiter=delimiter, comments="#",
+                         usecols=(x_column, v_column), ndmin=2)
+    data = data[~np.isnan(data).any(axis=1)]
+    return Tabulated(data[:, 0], data[:, 1], fill)
+
+
+# =========================================================
+# CACHE
+# =========================================================
+class PotentialCache:
+    """
+    LRU de objetos derivados de um descritor (V na malha, propagadores,
+    regiões). As chaves começam por (descritor, malha); o valor é
+    construído por build() na primeira vez e devolvido daí em diante.
+    Os objetos guardados são somente leitura.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # A GUI lê regiões na thread principal enquanto o worker evolui
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+CACHE = PotentialCache()
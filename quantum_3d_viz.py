@@ -20,6 +20,8 @@ import pyqtgraph.opengl as gl  # Módulo 3D
 from pyqtgraph.Qt import QtCore
 
 import Schrödinger_engine as eng
+import cartesian_engine as cart_eng
+import radial_engine as rad_eng
 
 
 class QuantumApp(QMainWindow):
@@ -29,14 +31,15 @@ class QuantumApp(QMainWindow):
         self.resize(1600, 900)
 
         # --- ESTADO INICIAL ---
-        self.psi0 = eng.psi0.copy()
+        self.sim = eng.Simulation()
+        self.psi0 = self.sim.psi0
         self.psi = self.psi0.copy()
         self.time = 0.0
         self.is_paused = False
 
         # Configuração da Barreira
         self.V0 = 2.0
-        eng.set_barrier_height(self.V0)
+        self.sim.set_barrier_height(self.V0)
 
         # Modos: "1D", "3D_RADIAL", "3D_SURFACE"
         self.dimension_mode = "1D"
@@ -46,6 +49,21 @@ class QuantumApp(QMainWindow):
         self.y_steps = 40  # Resolução lateral
         self.y_width = 30  # Largura visual
 
+        # Motor 2D do modo 3D_SURFACE: uma linha da superfície por ponto de y
+        self.sigma_y = 4.0
+        self.surface_sim = cart_eng.CartesianSimulation(
+            cart_eng.CartesianGrid((self.sim.L, self.y_width), (self.sim.N, self.y_steps)),
+            dt=self.sim.dt)
+        self._set_surface_potential()
+        self.psi_2d = self._surface_packet()
+
+        # Motor radial do modo 3D_RADIAL: u(r) em r ∈ [0, L/2], casca na barreira
+        self.radial_sim = rad_eng.RadialSimulation(
+            rad_eng.RadialGrid(self.sim.L / 2, self.sim.N), dt=self.sim.dt,
+            barreira_center=self.sim.barreira_center, barreira_width=self.sim.barreira_width,
+            k0=self.sim.k0, V0=self.V0)
+        self.u = self.radial_sim.normalize(self.radial_sim.psi0)
+
         self._setup_theme()
         self._setup_ui()
 
@@ -97,9 +115,10 @@ class QuantumApp(QMainWindow):
         plot.setBackground('#0d1117')
         plot.setLabel('left', '|ψ|²')
         plot.setLabel('bottom', 'Posição')
-        plot.setXRange(eng.x.min(), eng.x.max())
+        plot.setXRange(self.sim.x.min(), self.sim.x.max())
         plot.setYRange(0, 0.12)
         plot.showGrid(True, True, 0.2)
+        self.plot_2d = plot
 
         self.curve_L = plot.plot(pen=pg.mkPen('#22d3ee', width=2))  # Azul
         self.curve_B = plot.plot(pen=pg.mkPen('#facc15', width=2))  # Amarelo
@@ -122,14 +141,15 @@ class QuantumApp(QMainWindow):
         view.addItem(grid)
 
         # --- SUPERFÍCIE SEGURA (FLOAT32) ---
-        z0 = np.zeros((len(eng.x), self.y_steps), dtype=np.float32)
+        # Buffer pré-alocado, reescrito a cada quadro
+        self._z_buf = np.zeros((len(self.sim.x), self.y_steps), dtype=np.float32)
 
         # MUDANÇA DE COR AQUI (R, G, B, Alpha)
         # 0.6 = Roxo, 0.1 = Verde, 1.0 = Azul
         WAVE_COLOR = (0.6, 0.3, 1.0, 0.9)  # ROXO NEON
 
         self.wave_surface = gl.GLSurfacePlotItem(
-            z=z0,
+            z=self._z_buf,
             color=WAVE_COLOR,
             shader=None,
             computeNormals=False,
@@ -137,12 +157,12 @@ class QuantumApp(QMainWindow):
         )
 
         # Ajustar Escala e Posição
-        x_range = eng.x.max() - eng.x.min()
-        dx = x_range / (len(eng.x) - 1)
+        x_range = self.sim.x.max() - self.sim.x.min()
+        dx = x_range / (len(self.sim.x) - 1)
         dy = self.y_width / (self.y_steps - 1)
 
         self.wave_surface.scale(dx, dy, 1)
-        self.wave_surface.translate(eng.x.min(), -self.y_width / 2, 0)
+        self.wave_surface.translate(self.sim.x.min(), -self.y_width / 2, 0)
 
         view.addItem(self.wave_surface)
 
@@ -237,17 +257,36 @@ class QuantumApp(QMainWindow):
             self.btn_dimension.setText("Mode: 1D Standard")
             self.view_stack.setCurrentIndex(0)
 
+        # O modo radial desenha r ∈ [0, R]; os outros, x do motor 1D
+        view = self._view_sim
+        self.plot_2d.setXRange(view.x.min(), view.x.max())
+        self._update_barrier_visuals()
         self._reset()
 
+    @property
+    def _view_sim(self):
+        return self.radial_sim if self.dimension_mode == "3D_RADIAL" else self.sim
+
+    def _set_surface_potential(self):
+        self.surface_sim.clear()
+        self.surface_sim.add_rectangle((self.sim.barreira_center, 0.0),
+                                       (self.sim.barreira_width, np.inf), self.V0)
+
+    def _surface_packet(self):
+        return self.surface_sim.make_packet(x0=(self.sim.x0, 0.0), sigma=(self.sim.sigma, self.sigma_y),
+                                            k0=(self.sim.k0, 0.0))
+
     def _update_barrier(self, value):
         self.V0 = value / 10.0
-        eng.set_barrier_height(self.V0)
+        self.sim.set_barrier_height(self.V0)
+        self._set_surface_potential()
+        self.radial_sim.set_barrier_height(self.V0)
         self.lbl_V0.setText(f"Barrier V₀ = {self.V0:.2f}")
         self._update_barrier_visuals()
 
     def _update_barrier_visuals(self):
-        mask = eng.V > 0
-        xb = eng.x[mask]
+        view = self._view_sim
+        xb = view.x[view.V > 0]
 
         # --- Atualizar 2D ---
         if xb.size > 0:
@@ -269,29 +308,37 @@ class QuantumApp(QMainWindow):
     def _update_simulation(self):
         if self.is_paused: return
 
-        phys_mode = "3D_RADIAL" if self.dimension_mode == "3D_RADIAL" else "1D"
-
-        self.psi = eng.evolve_step(self.psi, mode=phys_mode)
-        self.psi = eng.normalize(self.psi, mode=phys_mode)
-        self.time += eng.dt * (self.speed.value() / 100)
+        if self.dimension_mode == "3D_SURFACE":
+            self.surface_sim.evolve_n(self.psi_2d, 1, out=self.psi_2d)
+        elif self.dimension_mode == "3D_RADIAL":
+            self.radial_sim.evolve_n(self.u, 1, out=self.u)
+        else:
+            self.psi = self.sim.evolve_step(self.psi)
+            self.psi = self.sim.normalize(self.psi)
+        self.time += self.sim.dt * (self.speed.value() / 100)
 
         self._update_display()
 
     def _update_display(self):
-        x = eng.x
-        prob = np.abs(self.psi) ** 2
+        view = self._view_sim
+        psi = self.u if view is self.radial_sim else self.psi
+        x = view.x
+        prob = np.abs(psi) ** 2
 
         # Status
-        T, R = eng.calculate_transmission(self.psi)
+        if self.dimension_mode == "3D_SURFACE":
+            T, R = self.surface_sim.calculate_transmission(self.psi_2d)
+        else:
+            T, R = view.calculate_transmission(psi)
         self.lbl_time.setText(f"Time: {self.time:.2f}")
-        self.lbl_energy.setText(f"Energy ≈ {0.5 * eng.k0 ** 2:.2f}")
+        self.lbl_energy.setText(f"Energy ≈ {0.5 * self.sim.k0 ** 2:.2f}")
         self.lbl_trans.setText(f"Transmission: {T:.1f}%")
         self.lbl_refl.setText(f"Reflection: {R:.1f}%")
         self.lbl_dimension.setText(f"View: {self.dimension_mode}")
 
         if self.V0 >= eng.V_INFINITY:
             self.lbl_regime.setText("🧱 Hard Wall")
-        elif self.V0 > 0.5 * eng.k0 ** 2:
+        elif self.V0 > 0.5 * self.sim.k0 ** 2:
             self.lbl_regime.setText("🔒 Tunneling (E < V)")
         else:
             self.lbl_regime.setText("🚀 Scattering (E > V)")
@@ -299,29 +346,23 @@ class QuantumApp(QMainWindow):
         # Display Gráfico
         if self.dimension_mode == "3D_SURFACE":
             # --- 3D Update ---
-            norm_val = np.trapz(prob, x)
-            self.lbl_norm.setText(f"Norm: {norm_val:.4f}")
+            # Densidade 2D real; ∫|ψ|² dy = |ψ_1D|², então o pico 2D é o
+            # 1D dividido por σ_y·√π e a escala compensa
+            self.lbl_norm.setText(f"Norm: {self.surface_sim.norm(self.psi_2d):.4f}")
 
-            # CRÍTICO: Converter para float32 antes de enviar para OpenGL
-            z_data = np.tile(prob * self.Z_SCALE, (self.y_steps, 1)).T
-            self.wave_surface.setData(z=z_data.astype(np.float32))
+            # CRÍTICO: float32 para o OpenGL, direto no buffer
+            np.multiply(self.surface_sim.density(self.psi_2d), self.Z_SCALE * self.sigma_y * np.sqrt(np.pi),
+                        out=self._z_buf)
+            self.wave_surface.setData(z=self._z_buf)
 
         else:
             # --- 2D Update ---
-            norm_val = np.trapz(prob, x)
-            self.lbl_norm.setText(f"Norm: {norm_val:.4f}")
-
-            mask = eng.V > 0
-            xb = eng.x[mask]
-            if xb.size > 0:
-                left = xb.min()
-                right = xb.max()
-            else:
-                left, right = 9999, 9999
+            self.lbl_norm.setText(f"Norm: {view.norm(psi):.4f}")
 
-            self.curve_L.setData(x, np.where(x < left, prob, np.nan))
-            self.curve_B.setData(x, np.where((x >= left) & (x <= right), prob, np.nan))
-            self.curve_R.setData(x, np.where(x > right, prob, np.nan))
+            regions = view.regions
+            self.curve_L.setData(x[regions.left], prob[regions.left])
+            self.curve_B.setData(x[regions.interaction], prob[regions.interaction])
+            self.curve_R.setData(x[regions.right], prob[regions.right])
 
     def _toggle_pause(self):
         self.is_paused = not self.is_paused
@@ -329,6 +370,8 @@ class QuantumApp(QMainWindow):
 
     def _reset(self):
         self.psi = self.psi0.copy()
+        self.psi_2d = self._surface_packet()
+        self.u = self.radial_sim.normalize(self.radial_sim.psi0)
         self.time = 0.0
         self._update_display()
 
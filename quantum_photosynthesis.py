@@ -10,6 +10,7 @@ natural photosynthesis (exciton transport).
 
 import numpy as np
 import Schrödinger_engine as eng
+import potentials
 
 
 class QuantumPhotosynthesis:
@@ -18,14 +19,18 @@ class QuantumPhotosynthesis:
     Concept: Non-Hermitian system with an absorbing potential (Sink).
     """
 
-    def __init__(self):
+    def __init__(self, sim: eng.Simulation = None):
+        # Each model drives its own engine unless one is shared with it
+        self.sim = sim if sim is not None else eng.Simulation()
+
         # Copy base wavefunction
-        self.psi = eng.psi0.copy()
+        self.psi = self.sim.psi0
 
         # Energy sink position (reaction center)
         # Posiciona o "coletor" logo após a barreira
-        self.sink_center = eng.barreira_center + eng.barreira_width * 2
-        self.sink_width = 15.0  # Aumentei um pouco para ficar visualmente claro
+        self._sink_center = self.sim.barreira_center + self.sim.barreira_width * 2
+        self._sink_width = 15.0  # Aumentei um pouco para ficar visualmente claro
+        self.sim.set_sink(self._sink_center, self._sink_width)
 
         # Sink strength (controls capture efficiency)
         self.sink_strength = 0.05
@@ -34,53 +39,306 @@ class QuantumPhotosynthesis:
         self.time = 0.0
         self.captured_energy = 0.0
 
+        # H não-hermitiano com o coletor (integrador krylov), em cache
+        self._sink_hamiltonian = None
+        self._sink_key = None
+
     # --------------------------------------------------
     # Reaction Center (Quantum Sink)
     # --------------------------------------------------
-    def _reaction_center_mask(self):
-        x = eng.x
-        return (
-                (x > self.sink_center - self.sink_width / 2) &
-                (x < self.sink_center + self.sink_width / 2)
-        )
+    # The sink region lives in the engine's region index (sim.regions.sink),
+    # so it is computed once per change instead of once per step
+    @property
+    def sink_center(self):
+        return self._sink_center
+
+    @sink_center.setter
+    def sink_center(self, value):
+        self._sink_center = value
+        self.sim.set_sink(self._sink_center, self._sink_width)
+
+    @property
+    def sink_width(self):
+        return self._sink_width
+
+    @sink_width.setter
+    def sink_width(self, value):
+        self._sink_width = value
+        self.sim.set_sink(self._sink_center, self._sink_width)
 
     def apply_reaction_center(self, psi):
         """
         Simulates irreversible energy capture (Absorption)
         """
-        mask = self._reaction_center_mask()
-
-        # Probabilidade na região do Sink
-        prob = np.abs(psi[mask]) ** 2
+        sink = self.sim.regions.sink
 
-        # Energy captured this step
-        if prob.size > 0:
-            captured = np.sum(prob) * eng.dx * self.sink_strength
+        # Energy captured this step (probability in the sink region)
+        if sink.stop > sink.start:
+            captured = self.sim.region_probability(psi, sink) * self.sink_strength
             self.captured_energy += captured
 
             # Remove amplitude (energy absorbed)
-            psi[mask] *= np.exp(-self.sink_strength)
+            psi[..., sink] *= np.exp(-self.sink_strength)
+
+        return psi
+
+    def sink_hamiltonian(self):
+        """
+        H - iW com o coletor como potencial imaginário: W = sink_strength/dt
+        na região do coletor, a mesma atenuação exp(-sink_strength) por
+        passo de apply_reaction_center, mas dentro da exponencial.
+        """
+        sim = self.sim
+        key = (sim.regions.version, self.sink_strength, sim.dt)
+        if key != self._sink_key:
+            W = np.zeros(sim.N)
+            if sim.regions.sink is not None:
+                W[sim.regions.sink] = self.sink_strength / sim.dt
+            self._sink_hamiltonian = sim.hamiltonian("1D", W)
+            self._sink_key = key
+        return self._sink_hamiltonian
+
+    def evolve_with_sink(self, psi):
+        """
+        Um passo de exp(-i(H - iW)dt) por Krylov (Arnoldi), via
+        sim.propagate. A norma perdida
+        no coletor vira captured_energy na mesma escala de
+        apply_reaction_center (P_coletor · sink_strength por passo).
+        """
+        sim = self.sim
+        H = self.sink_hamiltonian()
+        sink = sim.regions.sink if sim.regions.sink is not None else slice(0, 0)
+        sqrt_W = np.sqrt(H.W)
+
+        def rates(a):
+            a = a * sqrt_W  # ∫W|ψ|² no coletor e no total
+            return sim.region_probability(a, sink), sim.region_probability(a, slice(None))
 
+        norm_before = sim.region_probability(psi, slice(None))
+        sink_before, total_before = rates(psi)
+        psi = sim.propagate(H, psi)
+        sink_after, total_after = rates(psi)
+
+        # Só a parte da perda que saiu pelo coletor (o CAP pode estar ligado)
+        total = total_before + total_after
+        if total > 0:
+            lost = norm_before - sim.region_probability(psi, slice(None))
+            lost *= (sink_before + sink_after) / total
+            s = self.sink_strength
+            self.captured_energy += lost * s / -np.expm1(-2 * s)
         return psi
 
     # --------------------------------------------------
     # Time Evolution
     # --------------------------------------------------
     def evolve_step(self, dt_scale=1.0):
-        # 1. Standard Evolution
-        self.psi = eng.evolve_step(self.psi, mode="1D")
+        if self.sim.integrator == "krylov":
+            # Evolução e coletor numa única exponencial não-hermitiana
+            self.psi = self.evolve_with_sink(self.psi)
+        else:
+            # 1. Standard Evolution
+            self.psi = self.sim.evolve_step(self.psi, mode="1D")
 
-        # 2. Apply Sink (Photosynthesis)
-        self.psi = self.apply_reaction_center(self.psi)
+            # 2. Apply Sink (Photosynthesis)
+            self.psi = self.apply_reaction_center(self.psi)
 
         # No modo Bio, NÃO normalizamos para 1.0,
         # porque a energia está sendo "gastada" (capturada).
         # A soma total deve diminuir.
 
-        self.time += eng.dt * dt_scale
+        self.time += self.sim.dt * dt_scale
 
         return self.psi
 
     def get_efficiency_percent(self):
         # Retorna quanto % da energia inicial já foi capturada
-        return min(100.0, self.captured_energy * 100.0)
\ No newline at end of file
+        return min(100.0, self.captured_energy * 100.0)
+
+# ==================================================
+# Batched Ensemble
+# ==================================================
+class PhotosynthesisEnsemble:
+    """
+    B configurações de fotossíntese evoluídas juntas como um lote (B, N).
+
+    Cada linha tem o seu coletor (sink_center, sink_width, sink_strength)
+    e, opcionalmente, a sua barreira (V0, barrier_width). O coletor entra
+    nas fases do split-step como potencial imaginário W = sink_strength/dt:
+    a meia-fase vira exp(-i(V - iW)dt/2), e cada passo atenua o coletor
+    por exp(-sink_strength) como apply_reaction_center, sem máscara nem
+    multiplicação à parte. As fases ficam em cache até a Simulation
+    (potencial, dt, integrador) ou os parâmetros do coletor mudarem.
+
+    A cinética é unitária, então a perda em cada multiplicação pelas
+    fases é exata. A parte que sai pelo coletor vai para captured_energy
+    (B,), na escala de QuantumPhotosynthesis: perda · s/(1 - e^{-2s}),
+    ou seja, P_coletor · s por passo. A que sai pelo CAP vai para
+    absorbed (2, B), como em evolve_n.
+
+    Com dephasing = γ > 0 cada linha é uma trajetória estocástica: a cada
+    passo ψ recebe a fase exp(-i √(γ dt) η(x)) de um potencial de ruído
+    clássico, branco no tempo, com η gaussiano de variância 1 e correlação
+    espacial exp(-d²/2ℓ²) (ℓ = dephasing_length; 0 = independente por
+    ponto). A média sobre trajetórias é a equação de Lindblad com
+    decoerência γ(1 - C(x - x')) entre x e x' (Haken-Strobl). O ruído
+    não muda |ψ|², então a contabilidade de perdas não muda.
+    """
+
+    def __init__(self, sim: eng.Simulation = None, sink_center=None, sink_width=15.0,
+                 sink_strength=0.05, V0=None, barrier_width=None, psi=None,
+                 dephasing: float = 0.0, dephasing_length: float = 0.0, rng=None):
+        self.sim = sim if sim is not None else eng.Simulation()
+        sim = self.sim
+        if sink_center is None:
+            sink_center = sim.barreira_center + sim.barreira_width * 2
+
+        # Uma barreira retangular por linha, no centro da simulação
+        if V0 is not None or barrier_width is not None:
+            V0 = np.max(sim.V) if V0 is None else V0
+            barrier_width = sim.barreira_width if barrier_width is None else barrier_width
+            V0, barrier_width = np.broadcast_arrays(np.atleast_1d(V0), np.atleast_1d(barrier_width))
+            sim.set_potential(potentials.Stack(tuple(
+                potentials.Rectangle(sim.barreira_center, w, v) for v, w in zip(V0, barrier_width))))
+
+        columns = [np.atleast_1d(np.asarray(p, dtype=float))
+                   for p in (sink_center, sink_width, sink_strength)]
+        shapes = [c.shape for c in columns] + [sim.V.shape[:-1]]
+        if psi is not None:
+            shapes.append(np.shape(psi)[:-1])
+        batch = np.broadcast_shapes(*shapes)
+        if len(batch) != 1:
+            raise ValueError(f"PhotosynthesisEnsemble exige um lote 1-D, não {batch}")
+        self.sink_center, self.sink_width, self.sink_strength = (
+            np.array(np.broadcast_to(c, batch)) for c in columns)
+
+        psi = sim.psi0 if psi is None else psi
+        self.psi = np.array(np.broadcast_to(psi, batch + (sim.N,)), dtype=complex)
+        self.captured_energy = np.zeros(batch)
+        self.absorbed = sim.new_absorbed(self.psi) if sim.has_absorber else None
+        self.time = 0.0
+
+        self.dephasing = float(dephasing)
+        self.dephasing_length = float(dephasing_length)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self._factors = None
+        self._noise_filter = None  # (ℓ, filtro em rfft)
+
+    def __len__(self):
+        return len(self.captured_energy)
+
+    def sink_factors(self) -> "_SinkFactors":
+        """Fases com o coletor de cada linha dobrado, em cache."""
+        sim = self.sim
+        scheme = sim.phase_factors("1D")
+        params = np.stack([self.sink_center, self.sink_width, self.sink_strength])
+        factors = self._factors
+        if factors is None or factors.scheme is not scheme or not np.array_equal(factors.params, params):
+            factors = _SinkFactors(sim, scheme, params)
+            self._factors = factors
+        return factors
+
+    def evolve(self, n_steps: int = 1) -> np.ndarray:
+        """Evolui o lote n_steps passos (in-place, fundidos como em evolve_n)."""
+        if n_steps <= 0:
+            return self.psi
+        sim = self.sim
+        f = self.sink_factors()
+        scheme = f.scheme
+        fft = sim.fft_backend
+        captured = self.captured_energy
+        absorbed = self.absorbed
+
+        def collect(a, capture, cap):
+            density = np.abs(a[..., f.sink]) ** 2
+            captured[...] += np.sum(density * capture[..., f.sink], axis=-1) * sim.dx
+            if absorbed is not None:
+                for side, layer in enumerate(f.layers):
+                    absorbed[side] += np.sum(np.abs(a[..., layer]) ** 2 * cap[..., layer], axis=-1) * sim.dx
+
+        buf = self.psi
+        collect(buf, f.capture_half, f.cap_half)
+        buf *= f.half
+        for i in range(n_steps):
+            for j, kinetic in enumerate(scheme.kinetic):
+                if j:
+                    buf *= scheme.inner[j - 1]
+                buf = fft.fft(buf, overwrite_x=True)
+                buf *= kinetic
+                buf = fft.ifft(buf, overwrite_x=True)
+            if self.dephasing > 0:
+                buf *= self.noise_phase()
+            if i == n_steps - 1:
+                collect(buf, f.capture_half, f.cap_half)
+                buf *= f.half
+            else:
+                collect(buf, f.capture_full, f.cap_full)
+                buf *= f.full
+
+        np.copyto(self.psi, buf)
+        self.time += n_steps * sim.dt
+        return self.psi
+
+    def noise_phase(self) -> np.ndarray:
+        """Fase de um passo do ruído de dephasing, (B, N), nova a cada chamada."""
+        sim = self.sim
+        eta = self.rng.standard_normal(self.psi.shape)
+        if self.dephasing_length > 0:
+            cached = self._noise_filter
+            if cached is None or cached[0] != self.dephasing_length:
+                k = 2 * np.pi * np.fft.rfftfreq(sim.N, d=sim.dx)
+                shape = np.exp(-(k * self.dephasing_length) ** 2 / 4)
+                # Variância 1: média de |filtro|² sobre o espectro completo
+                full = np.concatenate([shape, shape[1:(sim.N + 1) // 2][::-1]])
+                cached = (self.dephasing_length, shape / np.sqrt(np.mean(full ** 2)))
+                self._noise_filter = cached
+            eta = np.fft.irfft(np.fft.rfft(eta, axis=-1) * cached[1], n=sim.N, axis=-1)
+        return np.exp(-1j * np.sqrt(self.dephasing * sim.dt) * eta)
+
+    def get_efficiency_percent(self) -> np.ndarray:
+        return np.minimum(100.0, self.captured_energy * 100.0)
+
+
+class _SinkFactors:
+    """
+    half/full do integrador com exp(-W dt/2) do coletor de cada linha,
+    e as frações da perda que vão para o coletor (capture_*, já na escala
+    de captured_energy) e para o CAP (cap_*).
+    """
+
+    __slots__ = ("scheme", "params", "half", "full", "sink", "layers",
+                 "capture_half", "capture_full", "cap_half", "cap_full")
+
+    def __init__(self, sim: eng.Simulation, scheme, params: np.ndarray):
+        self.scheme = scheme
+        self.params = params
+        center, width, strength = (p[:, np.newaxis] for p in params)
+
+        x = sim.x
+        inside = (x > center - width / 2) & (x < center + width / 2)
+        W = np.where(inside, strength / sim.dt, 0.0)
+        damping = np.exp(-W * (sim.dt / 2))
+        self.half = scheme.half * damping
+        self.full = scheme.full * damping ** 2
+
+        # Colunas que algum coletor toca (a soma da captura só passa por elas)
+        hit = np.flatnonzero(inside.any(axis=0))
+        self.sink = slice(hit[0], hit[-1] + 1) if hit.size else slice(0, 0)
+        regions = sim.regions
+        self.layers = (regions.absorber_left, regions.absorber_right)
+
+        # Perda dividida entre coletor e CAP na proporção das taxas W
+        W_cap = sim.absorber_profile()
+        total = W + W_cap
+        to_sink = np.divide(W, total, out=np.zeros_like(W), where=total > 0)
+        to_cap = np.divide(W_cap * np.ones_like(W), total, out=np.zeros_like(W), where=total > 0)
+        # s/(1 - e^{-2s}) -> 1/2 quando s -> 0
+        safe = np.where(strength > 0, strength, 1.0)
+        scale = np.where(strength > 0, safe / -np.expm1(-2 * safe), 0.5)
+
+        loss_half = 1.0 - np.abs(self.half) ** 2
+        loss_full = 1.0 - np.abs(self.full) ** 2
+        self.capture_half = loss_half * to_sink * scale
+        self.capture_full = loss_full * to_sink * scale
+        self.cap_half = loss_half * to_cap
+        self.cap_full = loss_full * to_cap
@@ -1,4 +1,5 @@
 import sys
+import time
 import numpy as np
 
 # =========================================================
@@ -7,42 +8,68 @@ import numpy as np
 if not hasattr(np, "trapz"):
     np.trapz = np.trapezoid
 
-from PyQt6.QtWidgets import QApplication, QMainWindow
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QSlider
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
 
 import Schrödinger_engine as eng
+import batch_runner
+import trajectory
 
 
 # =========================================================
 # QUANTUM VIEWER — VISUALIZAÇÃO DIDÁTICA (SIMPLIFICADA)
 # =========================================================
 class QuantumViewer(QMainWindow):
-    def __init__(self):
+    def __init__(self, replay: str = None):
         super().__init__()
 
         self.setWindowTitle("Quantum Tunneling — Visualização Didática (1D)")
         self.resize(1100, 650)
 
+        # Motor próprio desta janela; no replay, a malha e o potencial
+        # vêm da gravação e os quadros são lidos do disco (memmap)
+        self.player = None
+        if replay:
+            reader = trajectory.TrajectoryReader(replay)
+            self.player = trajectory.TrajectoryPlayer(reader)
+            self.sim = batch_runner.replay_simulation(reader)
+            self.setWindowTitle(f"Quantum Tunneling — Replay: {replay}")
+        else:
+            self.sim = eng.Simulation()
+
         # =================================================
         # SETUP DO GRÁFICO
         # =================================================
         self.plot = pg.PlotWidget()
-        self.setCentralWidget(self.plot)
+        if self.player is None:
+            self.setCentralWidget(self.plot)
+        else:
+            # Barra de busca: arrastar vai direto ao quadro, sem reprocessar
+            central = QWidget()
+            layout = QVBoxLayout(central)
+            layout.addWidget(self.plot)
+            self.scrub = QSlider(QtCore.Qt.Orientation.Horizontal)
+            self.scrub.setRange(0, self.player.last)
+            self.scrub.valueChanged.connect(self.seek)
+            layout.addWidget(self.scrub)
+            self.setCentralWidget(central)
 
         self.plot.setBackground('#0f172a')
         self.plot.setLabel('bottom', 'Posição (x)')
         self.plot.setLabel('left', 'Densidade de Probabilidade |ψ(x)|²')
 
         # Define os limites baseados no motor
-        self.plot.setXRange(eng.x.min(), eng.x.max())
+        self.plot.setXRange(self.sim.x.min(), self.sim.x.max())
         self.plot.setYRange(0, 0.12)
         self.plot.showGrid(True, True, 0.15)
+        self.plot.setDownsampling(auto=True, mode='peak')
+        self.plot.setClipToView(True)
 
         # =================================================
         # FUNÇÃO DE ONDA INICIAL
         # =================================================
-        self.psi = eng.psi0.copy()
+        self.psi = self.sim.psi0
 
         # =================================================
         # CURVAS — REGIÕES FÍSICAS
@@ -66,8 +93,8 @@ class QuantumViewer(QMainWindow):
         # VISUALIZAÇÃO DA BARREIRA (Área Sombreada)
         # =================================================
         # Pegamos onde V > 0 no motor
-        mask = eng.V > 0
-        xb = eng.x[mask]
+        mask = self.sim.V > 0
+        xb = self.sim.x[mask]
 
         if xb.size > 0:
             self.barrier_region = pg.LinearRegionItem(
@@ -81,50 +108,73 @@ class QuantumViewer(QMainWindow):
         # =================================================
         # TIMER — EVOLUÇÃO TEMPORAL
         # =================================================
+        self._last_tick = time.perf_counter()
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)  # ~33 FPS
 
+        if self.player is not None:
+            self.seek(0)
+
     # =====================================================
     # ATUALIZAÇÃO DO FRAME
     # =====================================================
     def update_frame(self):
+        if self.player is not None:
+            now = time.perf_counter()
+            if self.player.tick(now - self._last_tick):
+                self.seek(self.player.index)
+            self._last_tick = now
+            return
+
         # 1. Evolução Temporal (Usando o motor explicitamente em 1D)
-        self.psi = eng.evolve_step(self.psi, mode="1D")
+        self.psi = self.sim.evolve_step(self.psi, mode="1D")
 
         # 2. Normalização (Essencial para manter a física correta)
-        self.psi = eng.normalize(self.psi, mode="1D")
+        self.psi = self.sim.normalize(self.psi, mode="1D")
 
         # 3. Calcular probabilidade para plotagem
-        prob = np.abs(self.psi) ** 2
-
+        self.draw(np.abs(self.psi) ** 2)
+
+    def seek(self, index: int):
+        """Replay: mostra o quadro index da gravação."""
+        self.player.seek(index)
+        frame = self.player.reader[self.player.index]
+        prob = np.abs(frame.reshape(-1, self.sim.N)[0]).astype(float) ** 2
+        self.scrub.blockSignals(True)
+        self.scrub.setValue(self.player.index)
+        self.scrub.blockSignals(False)
+        self.draw(prob)
+
+    def draw(self, prob: np.ndarray):
+        """Desenha |ψ|² com uma cor por região."""
         # -------------------------------------------------
         # SEPARAÇÃO POR REGIÕES (Para colorir diferente)
         # -------------------------------------------------
-        x = eng.x
-        left_edge = eng.barreira_center - eng.barreira_width / 2
-        right_edge = eng.barreira_center + eng.barreira_width / 2
-
-        # Usamos np.nan para deixar "buracos" onde a linha não deve aparecer
-        left_region = np.where(x < left_edge, prob, np.nan)
-        barrier_region = np.where(
-            (x >= left_edge) & (x <= right_edge), prob, np.nan
-        )
-        right_region = np.where(x > right_edge, prob, np.nan)
+        # Fatias do índice de regiões do motor: cada curva recebe uma view,
+        # sem máscaras recriadas a cada quadro
+        x = self.sim.x
+        regions = self.sim.regions
 
         # -------------------------------------------------
         # ATUALIZAR CURVAS NA TELA
         # -------------------------------------------------
-        self.curve_left.setData(x, left_region)
-        self.curve_barrier.setData(x, barrier_region)
-        self.curve_right.setData(x, right_region)
+        self.curve_left.setData(x[regions.left], prob[regions.left])
+        self.curve_barrier.setData(x[regions.interaction], prob[regions.interaction])
+        self.curve_right.setData(x[regions.right], prob[regions.right])
 
 
 # =========================================================
 # PONTO DE ENTRADA
 # =========================================================
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    win = QuantumViewer()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Visualização didática (1D)")
+    parser.add_argument("--replay", help="trajetória gravada (batch_runner --record) a reproduzir")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    win = QuantumViewer(replay=args.replay)
     win.show()
     sys.exit(app.exec())
\ No newline at end of file
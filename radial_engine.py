@@ -0,0 +1,489 @@
+"""
+=========================================================
+MOTOR RADIAL ESFÉRICO (r ∈ [0, R])
+---------------------------------------------------------
+Num potencial central, ψ(r, θ, φ) = u_ℓ(r)/r · Y_ℓm(θ, φ), e
+cada canal ℓ obedece a uma equação 1D só em r ≥ 0:
+
+    i ∂u/∂t = [-½ ∂²/∂r² + V(r) + ℓ(ℓ+1)/(2r²)] u,   u(0) = u(R) = 0
+
+A malha são os N pontos internos r_j = j·R/(N+1) da transformada
+seno discreta (DST-I). A base sin(k_n r), k_n = nπ/R, já cumpre
+as duas condições de contorno e diagonaliza a cinética, como a
+FFT no motor 1D: nenhum ponto em r < 0, nada de zerar u(0) à mão.
+O modo 3D_RADIAL do Schrödinger_engine gasta metade dos N pontos
+em x < 0; aqui os mesmos N cobrem [0, R] com o dobro da resolução.
+
+Para ℓ > 0 o termo centrífugo ℓ(ℓ+1)/(2r²) é enorme junto à
+origem e não pode ir para a fase do potencial: o erro do splitting
+não converge. Ele fica na parte "livre" H0_ℓ = T + ℓ(ℓ+1)/(2r²),
+diagonalizada uma vez por ℓ na base DVR dos nós (a versão discreta
+da transformada de Hankel, funções de Riccati-Bessel), e o passo
+aplica exp(-iH0_ℓ dt) exato como uma matriz N×N. Só V(r), suave e
+limitado, é separado por Strang. Para ℓ = 0, H0 é diagonal na base
+seno e o passo fica em duas DSTs.
+
+Vários ℓ evoluem juntos como um lote (B, N), um canal por linha.
+|u|² já é a densidade radial (inclui o r² do volume).
+
+A DST-I vem do scipy.fft (multithread) se estiver instalado; sem
+ele, da FFT do numpy sobre a extensão ímpar de u.
+
+Uso:
+    python -m radial_engine --ell 0 1 2 3 4 --V0 4 --steps 800
+=========================================================
+"""
+
+import argparse
+
+import numpy as np
+
+import Schrödinger_engine as eng
+
+try:
+    import scipy.fft as _scipy_fft
+except ImportError:
+    _scipy_fft = None
+
+
+def dst1(a: np.ndarray) -> np.ndarray:
+    """DST-I ortonormal no último eixo (é a própria inversa)."""
+    if _scipy_fft is not None:
+        return _scipy_fft.dst(a, type=1, norm="ortho", axis=-1, workers=-1)
+    n = a.shape[-1]
+    ext = np.zeros(a.shape[:-1] + (2 * (n + 1),), dtype=complex)
+    ext[..., 1:n + 1] = a
+    ext[..., n + 2:] = -a[..., ::-1]
+    return np.fft.fft(ext, axis=-1)[..., 1:n + 1] * (0.5j * np.sqrt(2 / (n + 1)))
+
+
+# =========================================================
+# MALHA
+# =========================================================
+class RadialGrid:
+    """
+    Nós internos da DST-I em [0, R] e os números de onda da base seno.
+    Imutável, como Grid; as bases de cada ℓ ficam em cache aqui, então
+    simulações na mesma malha as compartilham.
+    """
+
+    # Uniforme, como Grid (os detectores de fluxo perguntam)
+    is_mapped = False
+
+    def __init__(self, R: float = eng.L / 2, N: int = eng.N):
+        self.R = float(R)
+        self.N = int(N)
+        self.dr = self.R / (self.N + 1)
+        self.r = self.dr * np.arange(1, self.N + 1)
+        self.k = np.pi * np.arange(1, self.N + 1) / self.R
+
+        for arr in (self.r, self.k):
+            arr.flags.writeable = False
+
+        self._bases = {}
+
+    def channel_basis(self, ell: int):
+        """
+        (E, Q) com H0_ℓ = Q diag(E) Qᵀ, H0_ℓ = T + ℓ(ℓ+1)/(2r²) na base
+        DVR dos nós (T = S diag(k²/2) S, S = DST-I). Custa um eigh N×N
+        na primeira chamada de cada ℓ.
+        """
+        basis = self._bases.get(ell)
+        if basis is None:
+            S = dst1(np.eye(self.N)).real
+            H = (S * (self.k ** 2 / 2)) @ S
+            H[np.diag_indices(self.N)] += ell * (ell + 1) / (2 * self.r ** 2)
+            basis = self._bases[ell] = np.linalg.eigh(H)
+        return basis
+
+
+# =========================================================
+# SIMULAÇÃO
+# =========================================================
+class RadialSimulation:
+    """
+    Evolução de u_ℓ(r) por split-step de Strang na base seno, com a
+    mesma interface de Simulation no modo 3D_RADIAL (evolve_n,
+    normalize, norm, calculate_transmission, regions, x), para o
+    SimulationWorker e a GUI.
+
+    ell: um ℓ ou um vetor de ℓ (lote (B, N), um canal por linha). Canais
+    com ℓ > 0 pagam um produto matriz-vetor N×N por passo.
+    A barreira é uma casca esférica em barreira_center ± barreira_width/2;
+    T é a probabilidade fora da casca (mais a absorvida na borda R) e
+    R a que ficou dentro.
+    """
+
+    def __init__(self, grid: RadialGrid = None, dt: float = 0.05, ell=0,
+                 barreira_center: float = 10.0, barreira_width: float = 2.0,
+                 r0: float = 5.0, sigma: float = 1.5, k0: float = 3.0, V0: float = 2.0):
+        self._grid = grid if grid is not None else RadialGrid()
+        self.barreira_center = barreira_center
+        self.barreira_width = barreira_width
+
+        # Pacote inicial: gaussiana em u(r) centrada em r0, saindo com k0
+        self.r0 = r0
+        self.sigma = sigma
+        self.k0 = k0
+
+        self._version = 0
+        self._cache = None
+        self._regions = None
+
+        self.absorber_width = 0.0
+        self.absorber_strength = 0.0
+
+        self._dt = float(dt)
+        self._ell = np.asarray(ell, dtype=int)
+        self._V = np.zeros(self.N)
+        self.set_barrier_height(V0)
+
+        self.time = 0.0
+
+    # -----------------------------------------------------
+    # Malha e parâmetros
+    # -----------------------------------------------------
+    @property
+    def grid(self):
+        return self._grid
+
+    @property
+    def r(self):
+        return self._grid.r
+
+    @property
+    def x(self):
+        """Alias de r, para quem desenha ou integra sobre sim.x."""
+        return self._grid.r
+
+    @property
+    def dx(self):
+        return self._grid.dr
+
+    @property
+    def N(self):
+        return self._grid.N
+
+    @property
+    def R(self):
+        return self._grid.R
+
+    @property
+    def dt(self):
+        return self._dt
+
+    @dt.setter
+    def dt(self, value):
+        self._dt = float(value)
+        self._invalidate()
+
+    @property
+    def ell(self):
+        return self._ell
+
+    @ell.setter
+    def ell(self, value):
+        ell = np.asarray(value, dtype=int)
+        if np.any(ell < 0):
+            raise ValueError(f"ℓ deve ser >= 0: {value}")
+        self._ell = ell
+        self._invalidate()
+
+    def make_packet(self, r0=None, sigma=None, k0=None) -> np.ndarray:
+        """
+        Pacote gaussiano em u(r) (N,); os omitidos usam os valores da
+        simulação. A base seno impõe u(0) = 0: com r0 de alguns sigma
+        a parte cortada é desprezível.
+        """
+        return eng.gaussian_packet(self.r, self.r0 if r0 is None else r0,
+                                   self.sigma if sigma is None else sigma,
+                                   self.k0 if k0 is None else k0)
+
+    @property
+    def psi0(self):
+        """Função de onda inicial (nova cópia a cada acesso)."""
+        return self.make_packet()
+
+    # -----------------------------------------------------
+    # Potencial
+    # -----------------------------------------------------
+    @property
+    def V(self):
+        """Potencial V(r), sem o termo centrífugo (somente leitura)."""
+        return self._V
+
+    def set_potential(self, V: np.ndarray):
+        """Substitui V(r); pontos com V >= V_INFINITY viram parede rígida."""
+        V = np.array(V, dtype=float)
+        if V.shape != (self.N,):
+            raise ValueError(f"Potencial com forma {V.shape} incompatível com N={self.N}")
+        V.flags.writeable = False
+        self._V = V
+        self._invalidate()
+
+    def set_barrier_height(self, V0: float):
+        """Casca esférica de altura V0 em barreira_center ± barreira_width/2."""
+        shell = np.abs(self.r - self.barreira_center) < self.barreira_width / 2
+        self.set_potential(np.where(shell, min(V0, eng.V_INFINITY), 0.0))
+
+    def centrifugal(self) -> np.ndarray:
+        """ℓ(ℓ+1)/(2r²) de cada canal: (N,) ou (B, N)."""
+        ell = self._ell[..., np.newaxis]
+        return ell * (ell + 1) / (2 * self.r ** 2)
+
+    def set_absorber(self, width: float, strength: float = 5.0):
+        """
+        CAP -iW(r) junto à borda r = R (W quadrático até strength em width).
+        Sem ele a borda é uma parede: a onda que escapou volta. O que a
+        camada remove é somado em evolve_n(absorbed=...)[1].
+        """
+        if width < 0 or width > self.R:
+            raise ValueError(f"Largura do absorvedor fora de [0, R]: {width}")
+        self.absorber_width = float(width)
+        self.absorber_strength = float(strength)
+        self._invalidate()
+
+    @property
+    def has_absorber(self) -> bool:
+        return self.absorber_width > 0 and self.absorber_strength > 0
+
+    def absorber_profile(self) -> np.ndarray:
+        W = np.zeros(self.N)
+        if self.has_absorber:
+            depth = np.clip((self.r - (self.R - self.absorber_width)) / self.absorber_width, 0.0, 1.0)
+            W = self.absorber_strength * depth ** 2
+        return W
+
+    def new_absorbed(self, psi: np.ndarray = None) -> np.ndarray:
+        """Acumulador (2, ...) como em Simulation: [interno (sempre 0), borda R]."""
+        batch = np.shape(psi)[:-1] if psi is not None else self._ell.shape
+        return np.zeros((2,) + batch)
+
+    @property
+    def regions(self) -> "RadialRegions":
+        regions = self._regions
+        if regions is None or regions.version != self._version:
+            regions = RadialRegions(self)
+            self._regions = regions
+        return regions
+
+    # -----------------------------------------------------
+    # Propagadores
+    # -----------------------------------------------------
+    def _invalidate(self):
+        self._version += 1
+        self._cache = None
+
+    def _propagators(self, dt: float = None) -> "_RadialPropagators":
+        dt = self._dt if dt is None else float(dt)
+        prop = self._cache
+        if prop is None or prop.version != self._version or prop.dt != dt:
+            prop = _RadialPropagators(self, dt)
+            self._cache = prop
+        return prop
+
+    # -----------------------------------------------------
+    # Evolução
+    # -----------------------------------------------------
+    def evolve_n(self, psi: np.ndarray, n_steps: int, mode="3D_RADIAL",
+                 out: np.ndarray = None, absorbed: np.ndarray = None,
+                 probe_index=None, probe_out: np.ndarray = None,
+                 dt: float = None) -> np.ndarray:
+        """
+        n_steps passos de Strang fundidos (V/2 · K · (V · K)^(n-1) · V/2),
+        K = exp(-iH0_ℓ dt) de cada canal (na base seno para ℓ = 0). Um u (N,) com vários ℓ vira um lote
+        (B, N). out pode ser o próprio psi (in-place); absorbed (de
+        new_absorbed) recebe o que o CAP da borda removeu. probe_index /
+        probe_out: u nos índices probe_index após cada passo, como em
+        Simulation.evolve_n (para os detectores de fluxo).
+        """
+        if mode != "3D_RADIAL":
+            raise ValueError(f"O motor radial só evolui o modo 3D_RADIAL, não {mode!r}")
+        prop = self._propagators(dt)
+        shape = np.broadcast_shapes(np.shape(psi), self._ell.shape + (self.N,))
+        if out is None:
+            out = np.array(np.broadcast_to(psi, shape), dtype=complex)
+        elif out is not psi:
+            np.copyto(out, psi)
+        if n_steps <= 0:
+            return out
+
+        track = absorbed is not None and prop.loss_half is not None
+        layer = self.regions.absorber_right
+
+        def absorb(a, loss):
+            absorbed[1] += np.sum(np.abs(a[..., layer]) ** 2 * loss[layer], axis=-1) * self.grid.dr
+
+        # Linhas de cada canal: tudo (um ℓ só) ou uma máscara por ℓ do lote
+        if self._ell.ndim == 0:
+            channels = [(Ellipsis, prop.channel(int(self._ell)))]
+        else:
+            channels = [(self._ell == ell, prop.channel(int(ell))) for ell in np.unique(self._ell)]
+
+        if probe_out is not None:
+            probe_index = np.asarray(probe_index)
+            probe_half = prop.half[probe_index]
+
+        buf = out
+        if track:
+            absorb(buf, prop.loss_half)
+        buf *= prop.half
+        for i in range(n_steps):
+            for rows, free in channels:
+                if free is None:
+                    part = dst1(buf[rows])
+                    part *= prop.kinetic
+                    buf[rows] = dst1(part)
+                else:
+                    buf[rows] = buf[rows] @ free  # exp(-iH0_ℓ dt) é simétrica
+            # Estado físico após o passo i = buf * half
+            if probe_out is not None:
+                np.multiply(buf[..., probe_index], probe_half, out=probe_out[i])
+            last = i == n_steps - 1
+            if track:
+                absorb(buf, prop.loss_half if last else prop.loss_full)
+            buf *= prop.half if last else prop.full
+        return out
+
+    def evolve_step(self, psi: np.ndarray) -> np.ndarray:
+        return self.evolve_n(psi, 1)
+
+    # -----------------------------------------------------
+    # Medidas
+    # -----------------------------------------------------
+    def norm(self, psi: np.ndarray):
+        """∫|u|² dr (a soma nos nós é a quadratura exata da base seno)."""
+        return np.sum(np.abs(psi) ** 2, axis=-1) * self.grid.dr
+
+    def normalize(self, psi: np.ndarray, mode="3D_RADIAL") -> np.ndarray:
+        norm = np.asarray(self.norm(psi))
+        norm = np.where(norm > 0, norm, 1.0)
+        psi /= np.sqrt(norm)[..., np.newaxis]
+        return psi
+
+    def region_probability(self, psi: np.ndarray, region: slice):
+        return np.sum(np.abs(psi[..., region]) ** 2, axis=-1) * self.grid.dr
+
+    def calculate_transmission(self, psi: np.ndarray, absorbed: np.ndarray = None):
+        """(T, R) em %: fora da casca (+ absorvido na borda) e dentro dela."""
+        regions = self.regions
+        T = self.region_probability(psi, regions.right)
+        R = self.region_probability(psi, regions.left)
+        if absorbed is not None:
+            T = T + absorbed[1]
+            R = R + absorbed[0]
+        return T * 100.0, R * 100.0
+
+
+class RadialRegions:
+    """
+    left (dentro da casca) | interaction (a casca) | right (fora), com os
+    nomes de Regions. A casca é onde V > SUPPORT_TOL·max(V), como em
+    Regions; sem barreira vale a casca nominal. absorber_right
+    é a camada do CAP (vazia sem ele), contida em right.
+    """
+
+    __slots__ = ("version", "left", "interaction", "right", "absorber_right")
+
+    def __init__(self, sim: RadialSimulation):
+        self.version = sim._version
+        n = sim.N
+        V = sim.V
+        finite = V[V < eng.V_INFINITY]
+        peak = finite.max() if finite.size else 0.0
+        support = np.flatnonzero((V > eng.SUPPORT_TOL * peak) & (V > 0))
+        if support.size:
+            start, end = int(support[0]), int(support[-1]) + 1
+        else:
+            start = int(np.searchsorted(sim.r, sim.barreira_center - sim.barreira_width / 2))
+            end = int(np.searchsorted(sim.r, sim.barreira_center + sim.barreira_width / 2))
+        self.left = slice(0, start)
+        self.interaction = slice(start, end)
+        self.right = slice(end, n)
+
+        inner = sim.R - sim.absorber_width if sim.has_absorber else sim.R
+        self.absorber_right = slice(int(np.searchsorted(sim.r, inner, side="left")), n)
+
+
+class _RadialPropagators:
+    """
+    Propagadores de uma versão da RadialSimulation e um dt: half/full de
+    V(r) com a parede rígida e o CAP, a fase cinética na base seno (ℓ = 0)
+    e, sob demanda, exp(-iH0_ℓ dt) denso de cada ℓ > 0.
+    """
+
+    __slots__ = ("version", "dt", "kinetic", "half", "full", "loss_half", "loss_full",
+                 "_grid", "_channels")
+
+    def __init__(self, sim: RadialSimulation, dt: float):
+        self.version = sim._version
+        self.dt = dt
+        self.kinetic = np.exp(-1j * (sim.grid.k ** 2 / 2) * dt)
+        self._grid = sim.grid
+        self._channels = {0: None}
+
+        half = np.exp(-1j * sim.V * (dt / 2))
+        half[sim.V >= eng.V_INFINITY] = 0.0
+
+        self.loss_half = self.loss_full = None
+        if sim.has_absorber:
+            damping = np.exp(-sim.absorber_profile() * (dt / 2))
+            half *= damping
+            self.loss_half = 1.0 - damping ** 2
+            self.loss_full = 1.0 - damping ** 4
+
+        self.half = half
+        self.full = half ** 2
+        for arr in (self.kinetic, self.half, self.full, self.loss_half, self.loss_full):
+            if arr is not None:
+                arr.flags.writeable = False
+
+    def channel(self, ell: int):
+        """exp(-iH0_ℓ dt) (N, N), ou None para ℓ = 0 (passo por DST)."""
+        if ell not in self._channels:
+            E, Q = self._grid.channel_basis(ell)
+            free = (Q * np.exp(-1j * E * self.dt)) @ Q.T
+            free.flags.writeable = False
+            self._channels[ell] = free
+        return self._channels[ell]
+
+
+# =========================================================
+# CLI
+# =========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m radial_engine",
+        description="Escape de um pacote por uma casca esférica, um canal ℓ por linha do lote.",
+    )
+    parser.add_argument("--ell", type=int, nargs="+", default=[0, 1, 2, 3, 4], help="canais ℓ")
+    parser.add_argument("--R", type=float, default=50.0, help="raio do domínio")
+    parser.add_argument("--N", type=int, default=1024, help="pontos internos")
+    parser.add_argument("--dt", type=float, default=0.05)
+    parser.add_argument("--steps", type=int, default=800)
+    parser.add_argument("--V0", type=float, default=4.0, help="altura da casca")
+    parser.add_argument("--center", type=float, default=10.0, help="raio da casca")
+    parser.add_argument("--width", type=float, default=1.0, help="espessura da casca")
+    parser.add_argument("--energy", type=float, default=4.5, help="energia do pacote (k0²/2)")
+    parser.add_argument("--r0", type=float, default=5.0, help="centro do pacote")
+    parser.add_argument("--sigma", type=float, default=1.5)
+    parser.add_argument("--absorber", type=float, default=10.0, help="largura do CAP na borda R")
+    args = parser.parse_args(argv)
+
+    sim = RadialSimulation(RadialGrid(args.R, args.N), dt=args.dt, ell=args.ell,
+                           barreira_center=args.center, barreira_width=args.width,
+                           r0=args.r0, sigma=args.sigma, k0=np.sqrt(2 * args.energy), V0=args.V0)
+    if args.absorber > 0:
+        sim.set_absorber(args.absorber)
+    u = sim.evolve_n(sim.normalize(sim.psi0), 0)
+    absorbed = sim.new_absorbed(u)
+    sim.evolve_n(u, args.steps, out=u, absorbed=absorbed)
+    T, R = sim.calculate_transmission(u, absorbed)
+
+    print(f"t = {args.steps * args.dt:g}, casca V0 = {args.V0:g} em r = {args.center:g}")
+    for ell, t, r in zip(args.ell, T, R):
+        print(f"  ℓ = {ell:<3d} escapou {t:6.2f} %   dentro {r:6.2f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+=========================================================
+SIMULATION WORKER
+---------------------------------------------------------
+Física numa QThread separada da renderização. O worker avança
+quantos passos a velocidade pedir e publica |ψ|² e as métricas
+num buffer duplo; a GUI lê o quadro mais recente no ritmo da
+tela, sem nunca esperar pela física.
+=========================================================
+"""
+
+import threading
+import time
+
+import numpy as np
+from PyQt6.QtCore import QThread
+
+# Na velocidade 100% a física anda 1 passo a cada 30 ms (ritmo antigo do QTimer)
+BASE_STEPS_PER_SECOND = 1000.0 / 30.0
+
+# Maior bloco de passos entre duas publicações (limita a latência da GUI)
+MAX_CHUNK = 200
+
+
+class FrameBuffer:
+    """
+    Buffer duplo sem lock entre uma thread escritora e uma leitora.
+
+    O escritor grava sempre no buffer de trás e só então o promove a
+    frente. Cada buffer tem uma versão que fica negativa durante a
+    escrita (seqlock): se o escritor der a volta e reescrever o buffer
+    que o leitor está copiando, a versão muda e o leitor tenta de novo.
+    """
+
+    def __init__(self, shape):
+        self.shape = tuple(np.atleast_1d(shape))
+        self._data = (np.zeros(self.shape), np.zeros(self.shape))
+        self._meta = [None, None]
+        self._version = [0, 0]
+        self._seq = 0
+        self._front = 0
+
+    def publish(self, psi: np.ndarray, meta: dict):
+        back = 1 - self._front
+        buf = self._data[back]
+
+        self._version[back] = -1
+        np.abs(psi, out=buf)
+        np.square(buf, out=buf)
+        self._meta[back] = meta
+        self._seq += 1
+        self._version[back] = self._seq
+
+        self._front = back
+
+    @property
+    def version(self) -> int:
+        """Número do último quadro publicado."""
+        return self._seq
+
+    def read(self, out: np.ndarray):
+        """Copia o quadro mais recente em out; devolve (versão, meta)."""
+        while True:
+            front = self._front
+            version = self._version[front]
+            if version < 0:
+                continue
+            np.copyto(out, self._data[front])
+            meta = self._meta[front]
+            if self._version[front] == version:
+                return version, meta
+
+
+class SimulationWorker(QThread):
+    """
+    Avança a simulação em segundo plano no ritmo
+    speed * BASE_STEPS_PER_SECOND passos por segundo.
+
+    Quem altera a simulação (potencial, psi, modo) a partir da GUI deve
+    segurar self.lock; a GUI lê os quadros (self.frames) sem lock.
+
+    No modo 3D_SURFACE sim é uma cartesian_engine.CartesianSimulation e
+    os quadros são a densidade 2D inteira.
+    """
+
+    def __init__(self, sim, psi, mode: str = "1D", parent=None):
+        super().__init__(parent)
+        self.lock = threading.Lock()
+        self.frames = FrameBuffer(sim.N)
+
+        self.sim = sim
+        self.psi = psi
+        self.mode = mode
+        self.bio_model = None
+        self.time = 0.0
+        self.absorbed = sim.new_absorbed(psi) if sim.has_absorber else None
+
+        self.speed = 1.0
+        self.paused = False
+
+        self.publish()
+
+    # -----------------------------------------------------
+    # Controle (chamado pela GUI)
+    # -----------------------------------------------------
+    def reset(self, psi, mode: str, bio_model=None, sim=None):
+        """Novo estado; sim troca de simulação (ex.: entrando no modo 3D_SURFACE)."""
+        with self.lock:
+            if sim is not None and sim is not self.sim:
+                self.sim = sim
+                if self.frames.shape != tuple(np.atleast_1d(sim.N)):
+                    self.frames = FrameBuffer(sim.N)
+            self.psi = psi
+            self.mode = mode
+            self.bio_model = bio_model
+            self.time = 0.0
+            # Probabilidade removida pelas camadas absorventes (se houver)
+            self.absorbed = self.sim.new_absorbed(psi) if self.sim.has_absorber else None
+            self.publish()
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+    # -----------------------------------------------------
+    # Física
+    # -----------------------------------------------------
+    def publish(self):
+        """Calcula as métricas do psi atual e publica o quadro."""
+        meta = {"time": self.time, "norm": self.sim.norm(self.psi)}
+        if self.bio_model is not None:
+            meta["efficiency"] = self.bio_model.get_efficiency_percent()
+        else:
+            meta["T"], meta["R"] = self.sim.calculate_transmission(self.psi, self.absorbed)
+        self.frames.publish(self.psi, meta)
+
+    def _advance(self, n_steps: int):
+        if self.bio_model is not None:
+            for _ in range(n_steps):
+                self.psi = self.bio_model.evolve_step()
+        elif self.mode == "3D_SURFACE":
+            # Evolução unitária 2D: sem renormalizar
+            self.sim.evolve_n(self.psi, n_steps, out=self.psi)
+        else:
+            phys_mode = "3D_RADIAL" if self.mode == "3D_RADIAL" else "1D"
+            self.sim.evolve_n(self.psi, n_steps, mode=phys_mode, out=self.psi, absorbed=self.absorbed)
+            if self.absorbed is None:
+                self.sim.normalize(self.psi, mode=phys_mode)
+        self.time += n_steps * self.sim.dt
+
+    def run(self):
+        budget = 0.0
+        last = time.perf_counter()
+
+        while not self.isInterruptionRequested():
+            now = time.perf_counter()
+            if self.paused:
+                budget, last = 0.0, now
+                self.msleep(10)
+                continue
+
+            budget += (now - last) * self.speed * BASE_STEPS_PER_SECOND
+            last = now
+
+            n_steps = min(int(budget), MAX_CHUNK)
+            if n_steps == 0:
+                self.msleep(1)
+                continue
+
+            with self.lock:
+                self._advance(n_steps)
+                self.publish()
+
+            # Se a CPU não acompanha a velocidade pedida, não acumula atraso
+            budget = min(budget - n_steps, MAX_CHUNK)
@@ -0,0 +1,200 @@
+"""
+=========================================================
+ENERGY-RESOLVED TRANSMISSION T(E)
+---------------------------------------------------------
+Um único pacote largo já contém todas as energias da sua
+banda. Evoluímos um lote de duas linhas, o potencial de
+interesse e o espaço livre (V = 0), e gravamos psi(x_d, t)
+nos detectores de fluxo. Como H não depende do tempo, a
+transformada de Fourier no tempo separa as energias:
+
+    T(E) = |ψ̂_V(x_dir, E)|² / |ψ̂_0(x_dir, E)|²
+    R(E) = |ψ̂_V(x_esq, E) - ψ̂_0(x_esq, E)|² / |ψ̂_0(x_esq, E)|²
+
+A linha livre é o espectro incidente medido na mesma malha,
+então dispersão e propagação até o detector se cancelam.
+
+Uma ressonância estreita (largura Γ) segura parte do pacote por
+~1/Γ: sem max_steps, o limite de passos vem do tempo de vida das
+ressonâncias da banda, estimado pela matriz de transferência.
+
+Uso:
+    python -m spectrum --mode DOUBLE_BARRIER --V0 3 --gap 5 --sigma 1 --out spectrum.npz
+=========================================================
+"""
+
+import argparse
+
+import numpy as np
+
+import Schrödinger_engine as eng
+import batch_runner
+import flux_detectors
+import stationary
+
+# Energias onde o espectro incidente é menor que isto (relativo ao
+# máximo) ficam fora da banda do pacote e saem como NaN
+MIN_INCIDENT = 1e-2
+
+# Limite de passos: nunca menos que MAX_STEPS; o tempo de vida estimado
+# (vezes LIFETIME_SAFETY) pode subi-lo até MAX_STEPS_LIMIT
+MAX_STEPS = 50_000
+MAX_STEPS_LIMIT = 2_000_000
+LIFETIME_SAFETY = 2.0
+
+
+def default_energies(sim: eng.Simulation, n: int = 256) -> np.ndarray:
+    """
+    Banda do pacote da simulação: k0 ± 2/sigma, em E = k²/2. As
+    componentes mais lentas que isso mal chegam aos detectores antes
+    da parada, e o espectro delas não é confiável.
+    """
+    k = np.linspace(max(sim.k0 - 2 / sim.sigma, 0.05), sim.k0 + 2 / sim.sigma, n)
+    return k ** 2 / 2
+
+
+def lifetime_steps(sim: eng.Simulation, distance: float, tol: float, n: int = 2048) -> int:
+    """
+    Passos até o pacote atravessar distance (na velocidade mais lenta da
+    banda) e as ressonâncias da banda esvaziarem abaixo de tol. Uma
+    ressonância (E_r, Γ) de pico 1 retém ~ρ(E_r)·πΓ/2 do pacote (ρ é a
+    densidade de energia do pacote gaussiano), que decai como e^{-Γt}.
+
+    As ressonâncias só são procuradas num descritor constante por partes
+    (poucos trechos exatos); um V suave ou tabelado viraria ~N trechos
+    da malha e a busca custaria mais que a própria evolução.
+    """
+    energies = default_energies(sim, n)
+    k = np.sqrt(2 * energies)
+    transit = distance / k.min()
+    descriptor = sim.potential
+    if descriptor is None or descriptor.edges() is None:
+        return int(np.ceil(LIFETIME_SAFETY * transit / sim.dt))
+
+    E_res, _, widths = stationary.resonances(stationary.segments_from_potential(sim), energies)
+    valid = np.isfinite(widths) & (widths > 0)
+    E_res, widths = E_res[valid], widths[valid]
+
+    k_res = np.sqrt(2 * E_res)
+    density = sim.sigma / np.sqrt(np.pi) * np.exp(-(sim.sigma * (k_res - sim.k0)) ** 2) / k_res
+    trapped = density * np.pi * widths / 2
+    decay = np.log(np.maximum(trapped / tol, 1.0)) / widths
+    t = transit + (decay.max() if decay.size else 0.0)
+    return int(np.ceil(LIFETIME_SAFETY * t / sim.dt))
+
+
+def fourier_in_time(signal: np.ndarray, dt: float, energies: np.ndarray) -> np.ndarray:
+    """ψ̂(E) = Σ_n ψ(t_n) e^{iE t_n} dt ao longo do primeiro eixo de signal."""
+    t = np.arange(len(signal)) * dt
+    phases = np.exp(1j * np.outer(energies, t))
+    return np.tensordot(phases, signal, axes=(1, 0)) * dt
+
+
+def transmission_spectrum(sim: eng.Simulation, energies=None, tol: float = 1e-4,
+                          max_steps: int = None, chunk: int = 200,
+                          absorber_width: float = None, left: float = None,
+                          right: float = None,
+                          margin: float = flux_detectors.DEFAULT_MARGIN) -> dict:
+    """
+    T(E) e R(E) do potencial atual de sim (1D, uma linha) a partir de uma
+    única evolução do pacote sim.psi0.
+
+    A evolução para quando a probabilidade entre os detectores cai
+    abaixo de tol nas duas linhas (ou após max_steps; padrão: MAX_STEPS ou,
+    se maior, lifetime_steps, até MAX_STEPS_LIMIT; potenciais suaves ficam
+    com MAX_STEPS). Sem camadas
+    absorventes em sim, usa-se absorber_width (padrão L/10) para que o
+    sinal não volte ao detector pela borda periódica.
+
+    Devolve {"E", "T", "R", "incident", "steps", "converged"}; T e R
+    valem NaN fora da banda do pacote.
+    """
+    if sim.V.ndim != 1:
+        raise ValueError("transmission_spectrum exige um potencial (N,), não uma pilha")
+    energies = default_energies(sim) if energies is None else np.asarray(energies, dtype=float)
+
+    # Linha 0: potencial de interesse. Linha 1: espaço livre (referência).
+    # O CAP abaixo é obrigatório e chebyshev exige H hermitiano: vira krylov
+    integrator = "krylov" if sim.integrator == "chebyshev" else sim.integrator
+    work = eng.Simulation(grid=sim.grid, dt=sim.dt,
+                          barreira_center=sim.barreira_center, barreira_width=sim.barreira_width,
+                          x0=sim.x0, sigma=sim.sigma, k0=sim.k0, V0=0.0,
+                          fft_backend=sim.fft_backend, integrator=integrator)
+    work.propagator_tol = sim.propagator_tol
+    if sim.has_absorber:
+        work.set_absorber(sim.absorber_width, sim.absorber_strength)
+    else:
+        work.set_absorber(sim.L / 10 if absorber_width is None else absorber_width)
+    work.set_potential(np.stack([sim.V, np.zeros_like(sim.V)]))
+
+    psi = work.normalize(np.stack([work.psi0, work.psi0]))
+    monitor = flux_detectors.ScatteringMonitor(work, psi, tol=tol, left=left, right=right,
+                                               margin=margin, record=True)
+    if max_steps is None:
+        distance = monitor.positions[1] - sim.x0
+        max_steps = min(max(MAX_STEPS, lifetime_steps(sim, distance, tol)), MAX_STEPS_LIMIT)
+
+    steps = 0
+    while steps < max_steps and not monitor.converged.all():
+        n = min(chunk, max_steps - steps)
+        monitor.advance(psi, n)
+        steps += n
+
+    # spectra[e, linha, detector]
+    spectra = fourier_in_time(monitor.signal, work.dt, energies)
+    incident_left = np.abs(spectra[:, 1, 0]) ** 2
+    incident_right = np.abs(spectra[:, 1, 1]) ** 2
+
+    in_band = incident_left > MIN_INCIDENT * incident_left.max()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        T = np.where(in_band, np.abs(spectra[:, 0, 1]) ** 2 / incident_right, np.nan)
+        R = np.where(in_band, np.abs(spectra[:, 0, 0] - spectra[:, 1, 0]) ** 2 / incident_left, np.nan)
+
+    return {"E": energies, "T": T, "R": R, "incident": incident_left,
+            "steps": steps, "converged": bool(monitor.converged.all())}
+
+
+# =========================================================
+# CLI
+# =========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m spectrum",
+        description="T(E) e R(E) numa única execução com um pacote largo.",
+    )
+    batch_runner.add_spec_arguments(parser)
+    parser.add_argument("--energies", type=float, nargs=3, metavar=("E_MIN", "E_MAX", "N"),
+                        help="grade de energias (padrão: banda do pacote)")
+    parser.add_argument("--tol", type=float, default=1e-4, help="probabilidade residual para parar")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help=f"limite de passos (padrão: {MAX_STEPS} ou o tempo de vida das ressonâncias)")
+    parser.add_argument("--out", default="spectrum.npz", help="arquivo .npz de saída")
+    args = parser.parse_args(argv)
+
+    spec = batch_runner.spec_from_args(args)
+    if spec.mode not in ("1D", "DOUBLE_BARRIER"):
+        parser.error("o espectro só é definido para os modos 1D e DOUBLE_BARRIER")
+    sim = batch_runner.build_simulation(spec)
+
+    energies = None
+    if args.energies:
+        e_min, e_max, n = args.energies
+        energies = np.linspace(e_min, e_max, int(n))
+
+    result = transmission_spectrum(sim, energies, tol=args.tol, max_steps=args.max_steps,
+                                   absorber_width=spec.absorber_width or None,
+                                   left=spec.flux_left, right=spec.flux_right,
+                                   margin=spec.detector_margin)
+    np.savez_compressed(args.out, spec=np.array(spec.to_json()), **result)
+
+    valid = ~np.isnan(result["T"])
+    E, T = result["E"][valid], result["T"][valid]
+    print(f"{spec.mode}: {result['steps']} passos, E ∈ [{E.min():.3f}, {E.max():.3f}]")
+    if not result["converged"]:
+        print("  aviso: não convergiu em --max-steps; o espectro está truncado no tempo")
+    print(f"  T máximo = {T.max():.4f} em E = {E[T.argmax()]:.3f}")
+    print(f"  -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
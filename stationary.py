@@ -0,0 +1,313 @@
+"""
+=========================================================
+STATIONARY SOLVER (TRANSFER MATRIX)
+---------------------------------------------------------
+T(E) e R(E) exatos para potenciais constantes por partes:
+barreira retangular, barreira dupla, parede rígida, redes de
+Kronig-Penney e somas delas (potentials, segments()). Cada
+trecho é (início, fim, V); fora deles V = 0. Todas as funções são vetorizadas sobre as energias.
+
+Em cada trecho ψ = A e^{ik(x - x_j)} + B e^{-ik(x - x_j)}, com
+k = sqrt(2(E - V)) (imaginário abaixo da barreira) e x_j a
+borda esquerda do trecho, para que os expoentes fiquem
+limitados à largura de cada trecho.
+
+Uso:
+    python -m stationary --mode DOUBLE_BARRIER --V0 3 --gap 5 --E 0.1:12:20000
+    python -m stationary --V0 2 --check     # compara com o TDSE
+=========================================================
+"""
+
+import argparse
+
+import numpy as np
+
+import Schrödinger_engine as eng
+import potentials
+
+
+# =========================================================
+# DESCRIÇÃO DO POTENCIAL
+# =========================================================
+def rectangle(center: float, width: float, V0: float):
+    """Barreira única, como Simulation.set_barrier_height."""
+    return potentials.Rectangle(center, width, V0).segments()
+
+
+def double_barrier(center: float, width: float, gap: float, V0: float):
+    """Duas barreiras separadas por gap, como Simulation.set_double_barrier_potential."""
+    return potentials.double_barrier(center, width, gap, V0).segments()
+
+
+def segments_from_potential(sim: eng.Simulation, V: np.ndarray = None):
+    """
+    Trechos constantes do potencial de sim (padrão: sim.V, uma linha).
+
+    Se V veio de um descritor constante por partes (sim.potential com
+    edges()), os trechos são os exatos do descritor. Senão, cada ponto
+    da malha vale uma célula de largura sim.dx, a mesma escala que o
+    split-step usa, então a largura efetiva de uma barreira de M pontos
+    é M·dx (numa MappedGrid, a soma dos weights).
+    """
+    descriptor = sim.potential
+    if V is None and descriptor is not None and descriptor.edges() is not None and sim.V.ndim == 1:
+        return [(a, b, min(v, eng.V_INFINITY)) for a, b, v in descriptor.segments()]
+
+    V = sim.V if V is None else np.asarray(V)
+    if V.ndim != 1:
+        raise ValueError("segments_from_potential espera uma linha (N,)")
+
+    # Índices onde o valor muda: início de cada trecho constante
+    changes = np.flatnonzero(np.diff(V)) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [V.size]))
+
+    if sim.grid.is_mapped:
+        # Células de largura J·dξ (weights) em volta de cada ponto
+        weights = sim.grid.weights
+        edges = sim.x[0] - weights[0] / 2 + np.concatenate(([0.0], np.cumsum(weights)))
+    else:
+        edges = sim.x[0] - sim.dx / 2 + np.arange(V.size + 1) * sim.dx
+    return [
+        (edges[a], edges[b], float(V[a]))
+        for a, b in zip(starts, ends) if V[a] != 0
+    ]
+
+
+# =========================================================
+# TRANSFER MATRIX
+# =========================================================
+def _wavenumber(E, V):
+    # Em E == V o k zera e a matriz de interface fica singular
+    diff = 2 * (E - V)
+    diff = np.where(diff == 0, 1e-12, diff)
+    return np.sqrt(diff.astype(complex))
+
+
+def _interface(k_left, k_right):
+    """Matriz (..., 2, 2) que leva (A, B) da esquerda para a direita de uma interface."""
+    ratio = k_left / k_right
+    m = np.empty(np.shape(k_left) + (2, 2), dtype=complex)
+    m[..., 0, 0] = m[..., 1, 1] = 0.5 * (1 + ratio)
+    m[..., 0, 1] = m[..., 1, 0] = 0.5 * (1 - ratio)
+    return m
+
+
+def _propagate(k, width):
+    p = np.zeros(np.shape(k) + (2, 2), dtype=complex)
+    p[..., 0, 0] = np.exp(1j * k * width)
+    p[..., 1, 1] = np.exp(-1j * k * width)
+    return p
+
+
+def transmission(segments, energies):
+    """
+    (T, R) para cada energia. Trechos com V >= V_INFINITY são parede
+    rígida (T = 0, R = 1). Trechos devem estar ordenados e sem sobreposição.
+    """
+    E = np.atleast_1d(np.asarray(energies, dtype=float))
+    if np.any(E <= 0):
+        raise ValueError("As energias devem ser positivas")
+
+    segments = sorted(segments)
+    if any(V >= eng.V_INFINITY for _, _, V in segments):
+        return np.zeros_like(E), np.ones_like(E)
+
+    k_free = _wavenumber(E, 0.0)
+    M = np.broadcast_to(np.eye(2, dtype=complex), E.shape + (2, 2)).copy()
+
+    k_prev, edge = k_free, None
+    for start, end, V in segments:
+        if edge is not None and start > edge:
+            # Trecho livre entre duas barreiras (poço/gap)
+            M = _interface(k_prev, k_free) @ M
+            M = _propagate(k_free, start - edge) @ M
+            k_prev = k_free
+        k = _wavenumber(E, V)
+        M = _interface(k_prev, k) @ M
+        M = _propagate(k, end - start) @ M
+        k_prev, edge = k, end
+    M = _interface(k_prev, k_free) @ M
+
+    # Entrada (1, r) à esquerda, saída (t, 0) à direita
+    r = -M[..., 1, 0] / M[..., 1, 1]
+    t = M[..., 0, 0] + M[..., 0, 1] * r
+    return np.abs(t) ** 2, np.abs(r) ** 2
+
+
+def packet_transmission(segments, k0, sigma, n: int = 2048):
+    """
+    T e R médios sobre o pacote gaussiano (|φ(k)|² ∝ exp(-(k - k0)² σ²)),
+    que é o que uma execução do TDSE mede. k0 e sigma podem ser vetores.
+    """
+    k0, sigma = np.broadcast_arrays(np.asarray(k0, dtype=float), np.asarray(sigma, dtype=float))
+    offsets = np.linspace(-5, 5, n)
+    k = k0[..., np.newaxis] + offsets / sigma[..., np.newaxis]
+    weight = np.where(k > 0, np.exp(-offsets ** 2), 0.0)
+    T, R = transmission(segments, np.maximum(k, 1e-6) ** 2 / 2)
+    norm = weight.sum(axis=-1)
+    return (T * weight).sum(axis=-1) / norm, (R * weight).sum(axis=-1) / norm
+
+
+def resonances(segments, energies, min_height: float = 0.5):
+    """
+    Picos de T(E): devolve (E, T, largura) de cada máximo local acima de
+    min_height na grade de energias. A posição é refinada por seção áurea
+    entre os vizinhos da grade e a largura a meia altura por bisseção (todos
+    os picos de uma vez), então picos mais estreitos que o passo da grade
+    também saem com altura e largura corretas. A largura é NaN se o pico
+    não desce à meia altura dentro da grade.
+    """
+    E = np.asarray(energies, dtype=float)
+    T, _ = transmission(segments, E)
+    peaks = np.flatnonzero((T[1:-1] > T[:-2]) & (T[1:-1] >= T[2:])) + 1
+
+    T_at = lambda e: transmission(segments, e)[0]
+    e_peak = _golden_max(T_at, E[peaks - 1], E[peaks + 1])
+    t_peak = T_at(e_peak) if peaks.size else np.empty(0)
+
+    keep = t_peak > min_height
+    peaks, e_peak, t_peak = peaks[keep], e_peak[keep], t_peak[keep]
+
+    half = t_peak / 2
+    left = _half_crossing(T_at, E, T, peaks, e_peak, half, -1)
+    right = _half_crossing(T_at, E, T, peaks, e_peak, half, +1)
+    return e_peak, t_peak, right - left
+
+
+_GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def _golden_max(f, a, b, iterations: int = 60):
+    """Máximo de f em [a, b] (vetores de intervalos) por seção áurea."""
+    a, b = np.array(a, dtype=float), np.array(b, dtype=float)
+    if a.size == 0:
+        return a
+    c, d = b - _GOLDEN * (b - a), a + _GOLDEN * (b - a)
+    fc, fd = f(c), f(d)
+    for _ in range(iterations):
+        upper = fc > fd
+        # Máximo em [a, d]: d <- c; senão em [c, b]: c <- d
+        b = np.where(upper, d, b)
+        a = np.where(upper, a, c)
+        c_new = np.where(upper, b - _GOLDEN * (b - a), d)
+        d_new = np.where(upper, c, a + _GOLDEN * (b - a))
+        fc_new = np.where(upper, np.nan, fd)
+        fd_new = np.where(upper, fc, np.nan)
+        c, d = c_new, d_new
+        # Só um dos dois pontos é novo em cada intervalo
+        fresh = f(np.where(upper, c, d))
+        fc = np.where(upper, fresh, fc_new)
+        fd = np.where(upper, fd_new, fresh)
+    return (a + b) / 2
+
+
+def _half_crossing(f, E, T, peaks, e_peak, half, direction, iterations: int = 50):
+    """Energia onde T cruza half ao se afastar de cada pico (bisseção vetorizada)."""
+    # Ponto da grade vizinho ao pico refinado, do lado de direction
+    start = np.searchsorted(E, e_peak, side="right" if direction > 0 else "left")
+    start = start if direction > 0 else start - 1
+
+    outside = np.full(peaks.size, np.nan)
+    for n, (j, level) in enumerate(zip(start, half)):
+        # Primeiro ponto da grade abaixo da meia altura, andando a partir do pico
+        while 0 <= j < E.size and T[j] > level:
+            j += direction
+        if 0 <= j < E.size:
+            outside[n] = E[j]
+
+    found = ~np.isnan(outside)
+    inside = np.array(e_peak, dtype=float)[found]
+    outside, level = outside[found], half[found]
+    for _ in range(iterations):
+        mid = (inside + outside) / 2
+        above = f(mid) > level
+        inside = np.where(above, mid, inside)
+        outside = np.where(above, outside, mid)
+
+    crossing = np.full(peaks.size, np.nan)
+    crossing[found] = (inside + outside) / 2
+    return crossing
+
+
+# =========================================================
+# VALIDAÇÃO CONTRA O TDSE
+# =========================================================
+def cross_check(sim: eng.Simulation, energies=None, **spectrum_options) -> dict:
+    """
+    Compara T(E) exato do potencial de sim com o T(E) de uma execução
+    do motor dependente do tempo (spectrum.transmission_spectrum).
+    """
+    import spectrum
+
+    tdse = spectrum.transmission_spectrum(sim, energies, **spectrum_options)
+    E = tdse["E"]
+    T_exact, R_exact = transmission(segments_from_potential(sim), E)
+    valid = ~np.isnan(tdse["T"])
+    error = np.abs(tdse["T"] - T_exact)
+    return {
+        "E": E, "T": T_exact, "R": R_exact,
+        "T_tdse": tdse["T"], "R_tdse": tdse["R"],
+        "max_error": float(error[valid].max()) if valid.any() else np.nan,
+        "median_error": float(np.median(error[valid])) if valid.any() else np.nan,
+        "steps": tdse["steps"],
+    }
+
+
+# =========================================================
+# CLI
+# =========================================================
+def _parse_energies(text: str):
+    start, stop, num = text.split(":")
+    return np.linspace(float(start), float(stop), int(num))
+
+
+def main(argv=None):
+    import batch_runner
+
+    parser = argparse.ArgumentParser(
+        prog="python -m stationary",
+        description="T(E), R(E) e ressonâncias exatas por matriz de transferência.",
+    )
+    batch_runner.add_spec_arguments(parser)
+    parser.add_argument("--E", type=_parse_energies, default=None, metavar="MIN:MAX:N",
+                        help="grade de energias (padrão: 0.01:3·V0:20000)")
+    parser.add_argument("--check", action="store_true",
+                        help="compara com uma execução do TDSE (spectrum)")
+    parser.add_argument("--out", help="arquivo .npz de saída (opcional)")
+    args = parser.parse_args(argv)
+
+    spec = batch_runner.spec_from_args(args)
+    sim = batch_runner.build_simulation(spec)
+    segments = segments_from_potential(sim)
+
+    energies = args.E
+    if energies is None:
+        energies = np.linspace(0.01, max(3 * min(spec.V0, 100.0), 10.0), 20000)
+
+    T, R = transmission(segments, energies)
+    E_res, T_res, widths = resonances(segments, energies)
+
+    print(f"{len(segments)} trecho(s): " + ", ".join(f"[{a:.2f}, {b:.2f}] V={V:g}" for a, b, V in segments))
+    print(f"T(E = {spec.energy:g}) = {np.interp(spec.energy, energies, T):.4f}")
+    if E_res.size:
+        print("Ressonâncias (E, T, largura):")
+        for e, t, w in zip(E_res, T_res, widths):
+            print(f"  {e:10.4f}  {t:.4f}  {w:.3g}")
+
+    result = {"E": energies, "T": T, "R": R,
+              "resonance_E": E_res, "resonance_T": T_res, "resonance_width": widths}
+
+    if args.check:
+        check = cross_check(sim)
+        print(f"TDSE ({check['steps']} passos): |T - T_tdse| máx = {check['max_error']:.3g}, "
+              f"mediana = {check['median_error']:.3g}")
+        result.update({"check_" + key: value for key, value in check.items()})
+
+    if args.out:
+        np.savez_compressed(args.out, spec=np.array(spec.to_json()), **result)
+        print(f"  -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
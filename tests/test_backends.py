@@ -0,0 +1,34 @@
+"""Todos os backends FFT dão o mesmo resultado em todos os integradores."""
+
+import numpy as np
+import pytest
+
+import Schrödinger_engine as eng
+import fft_backends
+
+BACKENDS = fft_backends.available_backends()
+INTEGRATORS = tuple(eng.INTEGRATORS) + tuple(eng.GLOBAL_PROPAGATORS)
+
+
+def _evolve(backend, integrator, grid=None, n_steps=20):
+    sim = eng.Simulation(grid=grid or eng.Grid(N=256), fft_backend=backend,
+                         integrator=integrator, V0=0.0)
+    sim.set_potential(2.0 * np.exp(-((sim.x - sim.barreira_center) / 1.5) ** 2))
+    return sim.evolve_n(sim.psi0, n_steps)
+
+
+@pytest.mark.parametrize("integrator", INTEGRATORS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_agree(backend, integrator):
+    reference = _evolve("numpy", integrator)
+    psi = _evolve(backend, integrator)
+    assert np.max(np.abs(psi - reference)) < 1e-10
+
+
+@pytest.mark.parametrize("integrator", tuple(eng.GLOBAL_PROPAGATORS))
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_agree_mapped(backend, integrator):
+    grid = eng.MappedGrid(N=256, centers=(10.0,), ratio=3.0)
+    reference = _evolve("numpy", integrator, grid, n_steps=5)
+    psi = _evolve(backend, integrator, grid, n_steps=5)
+    assert np.max(np.abs(psi - reference)) < 1e-10
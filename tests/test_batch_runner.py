@@ -0,0 +1,40 @@
+"""run headless: modo 3D_RADIAL no motor radial e retomada de checkpoints."""
+
+import numpy as np
+import pytest
+
+import batch_runner
+import parameter_sweep
+import radial_engine as rad_eng
+
+
+def test_radial_mode_uses_radial_engine():
+    spec = batch_runner.RunSpec(mode="3D_RADIAL", steps=1500, absorber_width=10.0)
+    assert isinstance(batch_runner.build_simulation(spec), rad_eng.RadialSimulation)
+
+    result = batch_runner.run(spec)
+    assert result["x"].min() > 0 and result["x"].max() < spec.L / 2
+    assert result["T"][-1] + result["R"][-1] == pytest.approx(100.0, abs=1.0)
+    assert result["T"][-1] > 90.0
+
+
+def test_radial_mode_rejects_unsupported_paths(tmp_path):
+    spec = batch_runner.RunSpec(mode="3D_RADIAL", steps=10)
+    with pytest.raises(ValueError, match="3D_RADIAL"):
+        batch_runner.run(spec, checkpoint_path=str(tmp_path / "c.npz"))
+    with pytest.raises(ValueError, match="3D_RADIAL"):
+        batch_runner.run_batch([spec])
+    assert not parameter_sweep._batchable(spec)
+
+
+def test_resume_after_convergence_matches_original_run(tmp_path):
+    # steps não é múltiplo de sample_every: o resto não pode rodar depois da convergência
+    spec = batch_runner.RunSpec(steps=3005, absorber_width=10.0, converge_tol=1e-3)
+    path = str(tmp_path / "run.npz")
+    original = batch_runner.run(spec, checkpoint_path=path)
+    assert int(original["steps"]) < spec.steps
+
+    resumed = batch_runner.run(spec, checkpoint_path=path, resume=True)
+    assert int(resumed["steps"]) == int(original["steps"])
+    assert np.array_equal(resumed["psi"], original["psi"])
+    assert np.array_equal(resumed["T"], original["T"])
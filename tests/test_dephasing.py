@@ -0,0 +1,18 @@
+"""Trajetórias com dephasing partem do mesmo pacote que run_batch."""
+
+import numpy as np
+
+import batch_runner
+import dephasing
+
+
+def test_zero_dephasing_matches_run_batch_on_kronig_penney():
+    # A rede alcança o x0 padrão: o pacote recua (batch_runner.packet_x0)
+    spec = batch_runner.RunSpec(mode="BIO_QUANTUM", potential="kronig_penney", cells=4,
+                                gap=12.0, steps=400)
+    sim = batch_runner.build_simulation(spec)
+    assert sim.x0 < spec.x0
+
+    efficiency = dephasing.run_trajectories(spec, 2, 0.0, seed=0)
+    coherent = batch_runner.run_batch([spec])["efficiency"]
+    np.testing.assert_allclose(efficiency, coherent[0], rtol=1e-10)
@@ -0,0 +1,25 @@
+"""Eixos da linha de comando respeitam os tipos de RunSpec."""
+
+import json
+import sqlite3
+
+import pytest
+
+import parameter_sweep
+
+
+def test_integer_axes_are_cast_by_field_type(tmp_path):
+    store = str(tmp_path / "sweep.sqlite")
+    parameter_sweep.main(["--axis", "cells=1,2", "--axis", "record_every=0:10:2",
+                          "--potential", "kronig_penney", "--gap", "3", "--steps", "20",
+                          "--workers", "1", "--store", store])
+    with sqlite3.connect(store) as db:
+        specs = [json.loads(row[0]) for row in db.execute("SELECT spec FROM results")]
+    assert len(specs) == 4
+    for spec in specs:
+        assert type(spec["cells"]) is int and type(spec["record_every"]) is int
+
+
+def test_fractional_integer_axis_is_rejected(tmp_path):
+    with pytest.raises(SystemExit):
+        parameter_sweep.main(["--axis", "cells=2.5", "--store", str(tmp_path / "s.sqlite")])
@@ -0,0 +1,36 @@
+"""Barreiras suaves (sem suporte compacto) conservam T + R e param por convergência."""
+
+import numpy as np
+import pytest
+
+import batch_runner
+
+
+@pytest.mark.parametrize("potential", ("gaussian", "eckart"))
+def test_smooth_barrier_conserves_probability(potential):
+    spec = batch_runner.RunSpec(potential=potential, steps=3000, absorber_width=10.0,
+                                converge_tol=1e-3)
+    result = batch_runner.run(spec)
+    T, R = result["T"][-1], result["R"][-1]
+    assert T > 1.0 and R > 0.01
+    assert T + R == pytest.approx(100.0, abs=1.0)
+    assert result["T_flux"][-1] + result["R_flux"][-1] == pytest.approx(100.0, abs=1.0)
+    assert int(result["steps"]) < spec.steps
+
+
+def test_kronig_penney_packet_starts_outside_lattice():
+    spec = batch_runner.RunSpec(potential="kronig_penney", cells=4, gap=12.0, dt=0.02, steps=8000,
+                                absorber_width=8.0, converge_tol=1e-3)
+    sim = batch_runner.build_simulation(spec)
+    first = sim.potential.centers()[0] - spec.width / 2
+    assert sim.x0 < spec.x0
+    assert sim.x0 + batch_runner.PACKET_SIGMAS * spec.sigma + spec.detector_margin <= first
+
+    result = batch_runner.run(spec)
+    assert result["T"][-1] + result["R"][-1] == pytest.approx(100.0, abs=1.0)
+    assert result["T_flux"][-1] + result["R_flux"][-1] == pytest.approx(100.0, abs=2.0)
+
+
+def test_kronig_penney_too_long_for_grid():
+    with pytest.raises(ValueError, match="Kronig-Penney"):
+        batch_runner.build_simulation(batch_runner.RunSpec(potential="kronig_penney"))
@@ -0,0 +1,38 @@
+"""O limite padrão de passos acompanha o tempo de vida das ressonâncias."""
+
+import numpy as np
+
+import batch_runner
+import spectrum
+import stationary
+
+
+def test_narrow_resonance_converges_with_default_budget():
+    spec = batch_runner.RunSpec(mode="DOUBLE_BARRIER", V0=3.0, gap=5.0, sigma=1.0, dt=0.01)
+    result = spectrum.transmission_spectrum(batch_runner.build_simulation(spec))
+    assert result["converged"]
+    assert result["steps"] > spectrum.MAX_STEPS
+
+
+def test_smooth_potential_skips_resonance_search(monkeypatch):
+    # ~N trechos da malha x 2048 energias custariam dezenas de segundos
+    def fail(*args, **kwargs):
+        raise AssertionError("resonances chamado para um potencial suave")
+
+    monkeypatch.setattr(spectrum.stationary, "resonances", fail)
+    spec = batch_runner.RunSpec(potential="gaussian", V0=2.0, sigma=1.0)
+    result = spectrum.transmission_spectrum(batch_runner.build_simulation(spec))
+    assert result["converged"]
+    assert result["steps"] <= spectrum.MAX_STEPS
+
+
+def test_spectrum_on_mapped_grid_matches_transfer_matrix():
+    # A malha mapeada exige um integrador global; chebyshev vira krylov por causa do CAP
+    spec = batch_runner.RunSpec(N=512, grid_ratio=2.0, integrator="chebyshev", dt=0.1)
+    sim = batch_runner.build_simulation(spec)
+    result = spectrum.transmission_spectrum(sim)
+    assert result["converged"]
+
+    valid = ~np.isnan(result["T"])
+    T, _ = stationary.transmission(stationary.segments_from_potential(sim), result["E"][valid])
+    assert np.max(np.abs(result["T"][valid] - T)) < 0.02
@@ -0,0 +1,359 @@
+"""
+=========================================================
+TRAJECTORY RECORDER (ψ(x, t) EM DISCO)
+---------------------------------------------------------
+Grava quadros de psi durante a evolução, em streaming, para
+analisar depois sem rodar de novo. Uma trajetória é um
+diretório:
+
+    meta.json         formato, N, L, dt, stride, dtype, modo,
+                      parâmetros e quantos quadros estão gravados
+    static.npz        x, V (e o jacobiano numa MappedGrid)
+    times.npy         tempo de cada quadro
+    frames_00000.npy  blocos de chunk_frames quadros (memmap)
+    frames_00001.npy  ...
+
+Só um bloco fica aberto por vez, então a memória não cresce
+com a duração: com N = 65536 em complex64 são 512 kB por
+quadro e ~64 MB por bloco. Com compress=True os blocos viram
+.npz comprimidos (a região ainda vazia de psi comprime bem),
+ao custo de descomprimir um bloco inteiro por leitura.
+
+Leitura com acesso aleatório, sem carregar o arquivo todo:
+    traj = TrajectoryReader("run.traj")
+    psi = traj[120]          # um quadro
+    rho = traj.density(-1)   # |ψ|² do último quadro
+
+TrajectoryPlayer é o relógio de reprodução usado pelas GUIs
+(main.py, quantum_viewer.py --replay): busca qualquer quadro
+direto e pula quadros quando a velocidade passa da tela.
+
+Só NumPy: os blocos .npy são os mesmos que np.load(mmap_mode)
+abre, sem depender de HDF5/Zarr.
+=========================================================
+"""
+
+import json
+import os
+
+import numpy as np
+
+FORMAT = "schrodinger-trajectory"
+VERSION = 1
+DTYPES = ("complex64", "complex128")
+
+# Tamanho alvo de um bloco (bytes) quando chunk_frames não é dado
+CHUNK_BYTES = 64 * 2 ** 20
+
+# Blocos mantidos abertos pelo leitor (acesso sequencial cruza no máximo 2)
+_OPEN_CHUNKS = 2
+
+
+def _chunk_name(index: int, compress: bool) -> str:
+    return f"frames_{index:05d}.{'npz' if compress else 'npy'}"
+
+
+# =========================================================
+# ESCRITA
+# =========================================================
+class TrajectoryWriter:
+    """
+    Anexa quadros de psi a uma trajetória em disco.
+
+    stride só é registrado nos metadados (passos entre quadros); quem
+    decide quando gravar é o laço de evolução (append) ou evolve().
+    O formato do quadro (N,) ou (B, N) é fixado pelo primeiro append.
+    Os metadados são regravados a cada bloco fechado, então uma
+    execução interrompida ainda deixa os blocos completos legíveis.
+    """
+
+    def __init__(self, path: str, sim, mode: str = "1D", stride: int = 1,
+                 dtype: str = "complex64", chunk_frames: int = None,
+                 compress: bool = False, parameters: dict = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype desconhecido: {dtype!r} (opções: {', '.join(DTYPES)})")
+        if stride < 1:
+            raise ValueError("stride deve ser >= 1")
+        if chunk_frames is not None and chunk_frames < 1:
+            raise ValueError("chunk_frames deve ser >= 1")
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            raise FileExistsError(f"{path} já contém uma trajetória")
+
+        self.path = path
+        self.sim = sim
+        self.dtype = np.dtype(dtype)
+        self.compress = compress
+        self.chunk_frames = chunk_frames
+        self.frame_shape = None
+        self.n_frames = 0
+        self.closed = False
+
+        self._chunk = None  # memmap (ou buffer, se compress) do bloco aberto
+        self._chunk_index = 0
+        self._in_chunk = 0
+        self._times = []
+
+        grid = sim.grid
+        self.meta = {
+            "format": FORMAT, "version": VERSION,
+            "N": sim.N, "L": sim.L, "mapped": grid.is_mapped,
+            "dt": sim.dt, "stride": int(stride), "mode": mode,
+            "dtype": dtype, "compress": bool(compress),
+            "parameters": parameters or {},
+            "frame_shape": None, "chunk_frames": None,
+            "n_frames": 0, "n_chunks": 0,
+        }
+        static = {"x": np.asarray(sim.x), "V": np.asarray(sim.V)}
+        if grid.is_mapped:
+            static["jacobian"] = grid.jacobian
+        np.savez(os.path.join(path, "static.npz"), **static)
+        self._write_meta()
+
+    # ---------------------------------------------------------
+    def append(self, psi: np.ndarray, t: float = None):
+        """Grava um quadro (convertido para self.dtype) no tempo t (padrão: sim.time)."""
+        if self.closed:
+            raise ValueError("trajetória já fechada")
+        psi = np.asarray(psi)
+        if self.frame_shape is None:
+            self._start(psi.shape)
+        elif psi.shape != self.frame_shape:
+            raise ValueError(f"quadro {psi.shape} difere dos anteriores {self.frame_shape}")
+
+        if self._chunk is None:
+            self._open_chunk()
+        self._chunk[self._in_chunk] = psi
+        self._in_chunk += 1
+        self._times.append(self.sim.time if t is None else float(t))
+        if self._in_chunk == self.chunk_frames:
+            self._close_chunk()
+
+    def evolve(self, psi: np.ndarray, n_steps: int, mode: str = None,
+               absorbed: np.ndarray = None) -> np.ndarray:
+        """
+        Evolui psi in-place por n_steps passos com sim.evolve_n, gravando
+        um quadro a cada stride passos (e o inicial, se a trajetória
+        está vazia). Avança sim.time.
+        """
+        mode = mode or self.meta["mode"]
+        stride = self.meta["stride"]
+        if self.n_frames == 0:
+            self.append(psi)
+        done = 0
+        while done < n_steps:
+            n = min(stride, n_steps - done)
+            self.sim.evolve_n(psi, n, mode=mode, out=psi, absorbed=absorbed)
+            self.sim.time += n * self.sim.dt
+            done += n
+            if n == stride:
+                self.append(psi)
+        return psi
+
+    def close(self):
+        """Fecha o bloco parcial (encolhido ao número de quadros) e os metadados."""
+        if self.closed:
+            return
+        if self._chunk is not None:
+            self._close_chunk()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------------------------------------
+    def _start(self, shape):
+        self.frame_shape = tuple(shape)
+        if self.chunk_frames is None:
+            frame_bytes = self.dtype.itemsize * int(np.prod(shape))
+            self.chunk_frames = max(1, CHUNK_BYTES // frame_bytes)
+        self.meta["frame_shape"] = list(self.frame_shape)
+        self.meta["chunk_frames"] = self.chunk_frames
+
+    def _open_chunk(self):
+        shape = (self.chunk_frames,) + self.frame_shape
+        if self.compress:
+            self._chunk = np.empty(shape, dtype=self.dtype)
+        else:
+            name = os.path.join(self.path, _chunk_name(self._chunk_index, False))
+            self._chunk = np.lib.format.open_memmap(name, mode="w+", dtype=self.dtype, shape=shape)
+        self._in_chunk = 0
+
+    def _close_chunk(self):
+        name = os.path.join(self.path, _chunk_name(self._chunk_index, self.compress))
+        used = self._chunk[:self._in_chunk]
+        if self.compress:
+            np.savez_compressed(name, frames=used)
+        elif self._in_chunk < self.chunk_frames:
+            # Bloco parcial: copia as linhas usadas para um .npy do tamanho certo
+            partial = name + ".part"
+            trimmed = np.lib.format.open_memmap(partial, mode="w+", dtype=self.dtype,
+                                                shape=used.shape)
+            trimmed[:] = used
+            trimmed.flush()
+            del trimmed
+            self._chunk = used = None
+            os.replace(partial, name)
+        else:
+            self._chunk.flush()
+        self._chunk = None
+
+        self.n_frames += self._in_chunk
+        self._chunk_index += 1
+        self._in_chunk = 0
+        self.meta["n_frames"] = self.n_frames
+        self.meta["n_chunks"] = self._chunk_index
+        np.save(os.path.join(self.path, "times.npy"), np.array(self._times))
+        self._write_meta()
+
+    def _write_meta(self):
+        # Troca atômica: um leitor nunca vê um meta.json pela metade
+        name = os.path.join(self.path, "meta.json")
+        with open(name + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(self.meta, fh, indent=2, sort_keys=True)
+        os.replace(name + ".tmp", name)
+
+
+# =========================================================
+# LEITURA
+# =========================================================
+class TrajectoryReader:
+    """
+    Trajetória gravada por TrajectoryWriter, com acesso aleatório.
+
+    traj[i] devolve o quadro i (cópia, no dtype gravado); traj[a:b:c]
+    empilha vários. Blocos .npy são abertos com mmap e só as linhas
+    lidas saem do disco; blocos .npz são descomprimidos inteiros e
+    ficam em cache (_OPEN_CHUNKS).
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("format") != FORMAT:
+            raise ValueError(f"{path} não é uma trajetória ({FORMAT})")
+        if meta["version"] > VERSION:
+            raise ValueError(f"versão {meta['version']} da trajetória é mais nova que a suportada ({VERSION})")
+
+        self.path = path
+        self.meta = meta
+        self.dt = meta["dt"]
+        self.stride = meta["stride"]
+        self.mode = meta["mode"]
+        self.parameters = meta["parameters"]
+        self.frame_shape = tuple(meta["frame_shape"] or ())
+        self.chunk_frames = meta["chunk_frames"]
+        self.n_frames = meta["n_frames"]
+
+        with np.load(os.path.join(path, "static.npz")) as static:
+            self.x = static["x"]
+            self.V = static["V"]
+            self.jacobian = static["jacobian"] if "jacobian" in static else None
+        times = os.path.join(path, "times.npy")
+        self.times = np.load(times)[:self.n_frames] if os.path.exists(times) else np.empty(0)
+
+        self._chunks = {}
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            index = range(*key.indices(self.n_frames))
+            out = np.empty((len(index),) + self.frame_shape, dtype=self.meta["dtype"])
+            for j, i in enumerate(index):
+                out[j] = self._frame(i)
+            return out
+        i = int(key)
+        if i < 0:
+            i += self.n_frames
+        if not 0 <= i < self.n_frames:
+            raise IndexError(f"quadro {key} fora de [0, {self.n_frames})")
+        return np.array(self._frame(i))
+
+    def __iter__(self):
+        for i in range(self.n_frames):
+            yield self[i]
+
+    def density(self, i: int) -> np.ndarray:
+        """|ψ|² do quadro i (float64)."""
+        frame = self[i]
+        return frame.real.astype(float) ** 2 + frame.imag.astype(float) ** 2
+
+    def close(self):
+        self._chunks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------------------------------------
+    def _frame(self, i: int) -> np.ndarray:
+        chunk, row = divmod(i, self.chunk_frames)
+        return self._chunk(chunk)[row]
+
+    def _chunk(self, index: int) -> np.ndarray:
+        frames = self._chunks.pop(index, None)
+        if frames is None:
+            name = os.path.join(self.path, _chunk_name(index, self.meta["compress"]))
+            if self.meta["compress"]:
+                with np.load(name) as data:
+                    frames = data["frames"]
+            else:
+                frames = np.load(name, mmap_mode="r")
+            if len(self._chunks) >= _OPEN_CHUNKS:
+                self._chunks.pop(next(iter(self._chunks)))
+        self._chunks[index] = frames  # reinserido no fim: LRU
+        return frames
+
+
+# =========================================================
+# REPRODUÇÃO
+# =========================================================
+class TrajectoryPlayer:
+    """
+    Relógio de reprodução de um TrajectoryReader, sem Qt.
+
+    A velocidade segue a do simulador ao vivo: a 1× passam
+    steps_per_second passos simulados por segundo, ou seja,
+    steps_per_second / stride quadros. tick(elapsed) só move a posição;
+    quem desenha lê o quadro de index uma vez por atualização da tela,
+    então em velocidades altas os quadros intermediários são pulados e
+    nunca se acumula atraso.
+    """
+
+    def __init__(self, reader: TrajectoryReader, steps_per_second: float = 1000.0 / 30.0):
+        if len(reader) == 0:
+            raise ValueError(f"{reader.path} não tem quadros")
+        self.reader = reader
+        self.steps_per_second = steps_per_second
+        self.speed = 1.0
+        self.playing = True
+        self.position = 0.0  # em quadros (fracionária entre dois quadros)
+
+    @property
+    def index(self) -> int:
+        return int(self.position)
+
+    @property
+    def last(self) -> int:
+        return len(self.reader) - 1
+
+    def seek(self, index: int):
+        self.position = float(min(max(index, 0), self.last))
+
+    def tick(self, elapsed: float) -> bool:
+        """Avança elapsed segundos reais; devolve True se o quadro mudou."""
+        if not self.playing:
+            return False
+        before = self.index
+        self.position += elapsed * self.speed * self.steps_per_second / self.reader.stride
+        if self.position >= self.last:
+            self.position = float(self.last)
+            self.playing = False
+        return self.index != before
@@ -92,6 +92,7 @@ class ExplainerPanel(QGroupBox):
                 <p>Aqui simulamos a equação de Schrödinger em coordenadas radiais. Imagine um átomo emitindo uma partícula.</p>
                 <p>Observe que a amplitude da onda diminui à medida que ela se afasta do centro. Isso obedece à <b>Lei do Inverso do Quadrado</b>: como a mesma energia total deve se espalhar por uma casca esférica cada vez maior, a densidade de probabilidade em cada ponto deve diminuir.</p>
                 <p>A barreira aqui atua como uma "casca" esférica envolvendo a partícula.</p>
+                <p><i>No gráfico:</i> o eixo horizontal é o raio r ≥ 0 e a curva é |u|² = r²|ψ|², a probabilidade de achar a partícula a uma distância r do centro. A parede em r = 0 não é um truque numérico: a função u(r) sempre se anula na origem.</p>
                 """
             },
             "3D_SURFACE": {
@@ -101,6 +102,7 @@ class ExplainerPanel(QGroupBox):
                 <p>Este gráfico converte a probabilidade em altura (Eixo Z). É a melhor forma de visualizar a <b>Interferência de Ondas</b>.</p>
                 <p>Note a região 'agitada' antes da barreira (lado esquerdo). Isso ocorre porque a onda incidente (indo para a direita) colide com a onda refletida (voltando da barreira).</p>
                 <p>Onde os picos se encontram, eles somam (interferência construtiva). Onde pico encontra vale, eles se anulam. Isso cria o padrão de <b>Onda Estacionária</b> que você vê.</p>
+                <p>Aqui a onda é simulada de verdade em duas dimensões: além de atravessar a barreira, o pacote também se espalha lateralmente (eixo y).</p>
                 """
             },
             "DOUBLE_BARRIER": {